@@ -0,0 +1,22 @@
+from dezero.core import Variable
+from dezero.core import Constant
+from dezero.core import Function
+from dezero.core import using_config
+from dezero.core import no_grad
+from dezero.core import as_array
+from dezero.core import as_variable
+from dezero.core import Config
+
+import dezero.backend
+import dezero.functions
+import dezero.utils
+import dezero.tape
+import dezero.functional
+import dezero.checkpoint
+import dezero.amp
+import dezero.scheduler
+import dezero.parallel
+import dezero.storage
+import dezero.datasets
+import dezero.dataloaders
+import dezero.profiler
@@ -0,0 +1,54 @@
+import numpy as np
+from dezero.core import using_config
+
+
+# =============================================================================
+# 혼합 정밀도 (mixed precision)
+# =============================================================================
+def autocast(dtype=np.float16):
+    """with autocast(np.float16): 안에서는 함수의 순전파를 dtype으로 계산합니다.
+
+    실수형 입력만 dtype으로 바꾸며, 파라미터의 data(마스터 가중치)는 바꾸지 않습니다.
+    역전파에서 파라미터(creator가 없는 변수)의 기울기는 파라미터와 같은 dtype(예: float32)으로 구합니다.
+    """
+    return using_config('compute_dtype', None if dtype is None else np.dtype(dtype))
+
+
+def loss_scaling(scaler):
+    """with loss_scaling(scaler): 안에서 호출한 backward는 scaler로 손실 스케일링을 합니다."""
+    return using_config('loss_scaler', scaler)
+
+
+class DynamicLossScaler:
+    """동적 손실 스케일링.
+
+    float16의 기울기는 작은 값이 0이 되기 쉬우므로, 역전파의 시작값에 scale을 곱해 키워서 전달하고
+    파라미터의 기울기를 구할 때 다시 나눕니다. 파라미터의 기울기에 inf/nan이 생기면(오버플로)
+    found_inf를 True로 하고 scale을 backoff_factor배로 줄입니다. 이때 학습 루프는 파라미터 갱신을 건너뛰어야 합니다.
+    (backward는 시작할 때 found_inf를 False로 하고, Checkpoint 안의 역전파까지 포함해 기록한 뒤 update를 한 번 호출합니다.)
+    growth_interval번 연속으로 오버플로가 없으면 scale을 growth_factor배로 키웁니다.
+    """
+
+    def __init__(self, init_scale=2.0 ** 15, growth_factor=2.0, backoff_factor=0.5,
+                 growth_interval=2000, min_scale=1.0, max_scale=2.0 ** 24):
+        self.scale = init_scale
+        self.growth_factor = growth_factor
+        self.backoff_factor = backoff_factor
+        self.growth_interval = growth_interval
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.found_inf = False
+        self.overflows = 0
+        self._good_steps = 0
+
+    def update(self, found_inf):
+        self.found_inf = found_inf
+        if found_inf:
+            self.overflows += 1
+            self.scale = max(self.scale * self.backoff_factor, self.min_scale)
+            self._good_steps = 0
+        else:
+            self._good_steps += 1
+            if self._good_steps >= self.growth_interval:
+                self.scale = min(self.scale * self.growth_factor, self.max_scale)
+                self._good_steps = 0
@@ -0,0 +1,288 @@
+import sys
+import weakref
+import numpy as np
+gpu_enable = True
+try:
+    import cupy as cp
+    cupy = cp
+except ImportError:
+    gpu_enable = False
+from dezero.core import Config, Variable
+
+
+# =============================================================================
+# 배열 모듈 (backend)
+# =============================================================================
+# 배열의 타입 -> 그 배열을 계산하는 모듈(numpy와 같은 함수를 가진 모듈)
+_array_modules = {np.ndarray: np}
+if gpu_enable:
+    _array_modules[cp.ndarray] = cp
+array_types = tuple(_array_modules)
+
+
+def register_array_module(array_type, module):
+    """새로운 배열 라이브러리를 등록합니다. module은 numpy와 같은 이름의 함수(exp, ones_like 등)를 제공해야 합니다."""
+    global array_types
+    _array_modules[array_type] = module
+    array_types = tuple(_array_modules)
+
+
+def get_array_module(x):
+    """x를 계산할 모듈(numpy, cupy 등)을 반환합니다.
+
+    Config.array_arena가 설정되어 있으면 그 Arena를, Config.use_array_pool이 True이면
+    버퍼를 재사용하는 numpy_pool을 numpy 대신 반환합니다.
+    """
+    if isinstance(x, Variable):
+        x = x.data
+
+    xp = _array_modules.get(type(x))
+    if xp is None:
+        xp = np
+        for array_type, module in _array_modules.items():
+            if isinstance(x, array_type): # np.memmap 같은 하위 클래스
+                xp = module
+                break
+    if xp is np:
+        if Config.array_arena is not None:
+            return Config.array_arena
+        if Config.use_array_pool:
+            return numpy_pool
+    return xp
+
+
+def scatter_add(a, slices, b):
+    """a[slices] += b와 같지만, 같은 원소가 여러 번 선택되면 모두 더합니다."""
+    xp = get_array_module(a)
+    if gpu_enable and xp is cp:
+        import cupyx
+        return cupyx.scatter_add(a, slices, b)
+    np.add.at(a, slices, b)
+
+
+def as_numpy(x):
+    if isinstance(x, Variable):
+        x = x.data
+
+    if np.isscalar(x):
+        return np.array(x)
+    elif isinstance(x, np.ndarray):
+        return x
+    return cp.asnumpy(x)
+
+
+def as_cupy(x):
+    if isinstance(x, Variable):
+        x = x.data
+
+    if not gpu_enable:
+        raise Exception('CuPy cannot be loaded. Install CuPy!')
+    return cp.asarray(x)
+
+
+# =============================================================================
+# 버퍼를 재사용하는 NumPy (numpy_pool)
+# =============================================================================
+class _PooledUfunc:
+    __slots__ = ('ufunc', 'pool')
+
+    def __init__(self, ufunc, pool):
+        self.ufunc = ufunc
+        self.pool = pool
+
+    def __call__(self, *args, out=None, **kwargs):
+        ufunc = self.ufunc
+        if out is not None or kwargs or ufunc.nout != 1 or ufunc.signature is not None:
+            return ufunc(*args, out=out, **kwargs)
+        try:
+            dtypes = ufunc.resolve_dtypes(tuple(a.dtype if hasattr(a, 'dtype') else type(a) for a in args) + (None,))
+            shape = np.broadcast_shapes(*[np.shape(a) for a in args])
+        except (TypeError, ValueError, AttributeError):
+            return ufunc(*args)
+        if shape == (): # 0차원 결과는 NumPy도 스칼라로 돌려주므로 풀을 쓰지 않습니다.
+            return ufunc(*args)
+        return ufunc(*args, out=self.pool.empty(shape, dtypes[-1]))
+
+    def __getattr__(self, name): # add.at 등은 원래 ufunc의 것을 사용합니다.
+        return getattr(self.ufunc, name)
+
+
+class ArrayPool:
+    """numpy 대신 사용할 수 있는, 버퍼를 재사용하는 배열 모듈입니다.
+
+    empty/zeros/ones(_like)와 ufunc(exp, multiply 등)의 결과 배열을 (shape, dtype)별 버퍼 목록에서 꺼냅니다.
+    풀 말고는 아무도 참조하지 않는 버퍼(참조 카운트로 확인)만 다시 내주므로,
+    이전 반복의 계산 그래프가 해제되면 그 버퍼들이 다음 반복에서 재사용됩니다.
+    나머지 이름(reshape, broadcast_to 등)은 numpy의 것을 그대로 사용합니다.
+    """
+    __name__ = 'numpy_pool'
+
+    def __init__(self):
+        self.buffers = {}
+        self.hits = 0
+        self.misses = 0
+        self._ufuncs = {}
+
+    def empty(self, shape, dtype=np.float64):
+        shape = tuple(shape) if isinstance(shape, (tuple, list)) else (shape,)
+        key = (shape, np.dtype(dtype))
+        bufs = self.buffers.get(key)
+        if bufs is None:
+            bufs = self.buffers[key] = []
+        for i in range(len(bufs)):
+            if sys.getrefcount(bufs[i]) == 2: # 리스트와 getrefcount의 인수만 참조하고 있으면 사용 중이 아닙니다.
+                self.hits += 1
+                return bufs[i]
+        self.misses += 1
+        buf = np.empty(shape, dtype)
+        bufs.append(buf)
+        return buf
+
+    def zeros(self, shape, dtype=np.float64):
+        buf = self.empty(shape, dtype)
+        buf.fill(0)
+        return buf
+
+    def ones(self, shape, dtype=np.float64):
+        buf = self.empty(shape, dtype)
+        buf.fill(1)
+        return buf
+
+    def empty_like(self, a, dtype=None):
+        return self.empty(np.shape(a), dtype or np.result_type(a))
+
+    def zeros_like(self, a, dtype=None):
+        return self.zeros(np.shape(a), dtype or np.result_type(a))
+
+    def ones_like(self, a, dtype=None):
+        return self.ones(np.shape(a), dtype or np.result_type(a))
+
+    def matmul(self, a, b):
+        # matmul은 일반화 ufunc라 출력 모양을 브로드캐스트로 구할 수 없으므로 2차원 행렬곱만 풀을 사용합니다.
+        if np.ndim(a) != 2 or np.ndim(b) != 2:
+            return np.matmul(a, b)
+        out = self.empty((a.shape[0], b.shape[1]), np.result_type(a, b))
+        return np.matmul(a, b, out=out)
+
+    def stats(self):
+        nbytes = 0
+        for bufs in self.buffers.values():
+            for b in bufs:
+                nbytes += b.nbytes
+        return {'hits': self.hits, 'misses': self.misses, 'nbytes': nbytes}
+
+    def clear(self):
+        self.buffers.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name):
+        attr = getattr(np, name)
+        if isinstance(attr, np.ufunc):
+            wrapped = self._ufuncs.get(name)
+            if wrapped is None:
+                wrapped = self._ufuncs[name] = _PooledUfunc(attr, self)
+            return wrapped
+        return attr
+
+
+numpy_pool = ArrayPool()
+
+
+# =============================================================================
+# Arena (Variable이 사라지면 버퍼를 회수하는 할당기)
+# =============================================================================
+class _BufferRef(weakref.ref):
+    __slots__ = ('key', 'nbytes') # 버퍼가 해제된 뒤에도 사용할 id와 크기
+
+
+class Arena(ArrayPool):
+    """(shape, dtype)별 빈 버퍼 목록에서 배열을 꺼내 주는 할당기입니다.
+
+    numpy_pool은 버퍼를 꺼낼 때마다 목록 전체의 참조 카운트를 살피지만,
+    Arena는 내준 버퍼를 가진 Variable이 사라질 때(또는 역전파에서 기울기를 버릴 때) 버퍼를 빈 목록에 돌려받습니다.
+    그때도 다른 곳에서 참조하고 있을 수 있으므로, 다시 내주기 직전에 참조 카운트를 확인해 아직 쓰이는 버퍼는 Arena에서 뗍니다.
+    using_config('array_arena', arena)로 사용하며, reserve()로 버퍼를 미리 만들어 둘 수 있습니다.
+    """
+    __name__ = 'arena'
+
+    def __init__(self):
+        super().__init__()
+        self.free = {} # (shape, dtype) -> 빈 버퍼 목록
+        self.outstanding = {} # id(내준 버퍼) -> _BufferRef
+        self.owners = {} # Variable의 weakref -> 그 Variable의 data 버퍼의 _BufferRef
+        self.free_bytes = 0
+        self.used_bytes = 0
+        self.peak_bytes = 0
+
+    def _hand_out(self, buf):
+        ref = _BufferRef(buf, self._lost)
+        ref.key = id(buf)
+        ref.nbytes = buf.nbytes
+        self.outstanding[id(buf)] = ref
+        self.used_bytes += buf.nbytes
+        total = self.used_bytes + self.free_bytes
+        if total > self.peak_bytes:
+            self.peak_bytes = total
+        return buf
+
+    def _lost(self, ref): # 돌려받지 못한 버퍼가 그냥 해제되었습니다.
+        if self.outstanding.get(ref.key) is ref:
+            del self.outstanding[ref.key]
+            self.used_bytes -= ref.nbytes
+
+    def empty(self, shape, dtype=np.float64):
+        shape = tuple(shape) if isinstance(shape, (tuple, list)) else (shape,)
+        key = (shape, np.dtype(dtype))
+        free = self.free.get(key)
+        while free:
+            buf = free.pop()
+            self.free_bytes -= buf.nbytes
+            if sys.getrefcount(buf) == 2: # 지역 변수와 getrefcount의 인수뿐이면 아무도 쓰지 않습니다.
+                self.hits += 1
+                return self._hand_out(buf)
+            # 돌려받은 뒤에도 다른 곳에서 쓰고 있는 버퍼는 Arena에서 뗍니다.
+        self.misses += 1
+        return self._hand_out(np.empty(shape, dtype))
+
+    def reserve(self, shape, dtype=np.float64, n=1):
+        """shape, dtype의 버퍼 n개를 미리 만들어 빈 목록에 넣습니다."""
+        for _ in range(n):
+            self.release(self._hand_out(np.empty(shape, dtype)))
+
+    def release(self, buf):
+        """Arena가 내준 버퍼를 빈 목록에 돌려놓습니다. Arena의 버퍼가 아니면 아무것도 하지 않습니다."""
+        ref = self.outstanding.pop(id(buf), None)
+        if ref is None:
+            return
+        self.used_bytes -= ref.nbytes
+        self.free_bytes += ref.nbytes
+        key = (buf.shape, buf.dtype)
+        free = self.free.get(key)
+        if free is None:
+            free = self.free[key] = []
+        free.append(buf)
+
+    def adopt(self, v):
+        """Variable v의 data가 Arena의 버퍼이면, v가 사라질 때 버퍼를 돌려받습니다."""
+        ref = self.outstanding.get(id(v.data))
+        if ref is not None:
+            self.owners[weakref.ref(v, self._reclaim)] = ref # 버퍼를 직접 가지면 다른 곳에서 회수한 뒤에도 사용 중으로 보입니다.
+
+    def _reclaim(self, vref):
+        ref = self.owners.pop(vref)
+        buf = ref() # 콜백이 불릴 때는 아직 Variable의 data가 버퍼를 참조하고 있습니다.
+        if buf is not None and self.outstanding.get(ref.key) is ref:
+            self.release(buf)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'used_bytes': self.used_bytes,
+                'free_bytes': self.free_bytes, 'peak_bytes': self.peak_bytes}
+
+    def clear(self):
+        for bufs in self.free.values():
+            bufs.clear()
+        self.free_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.peak_bytes = self.used_bytes
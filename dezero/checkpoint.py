@@ -0,0 +1,94 @@
+import math
+from dezero.core import Config, Function, Variable, Constant, no_grad, using_config
+from dezero import backend
+
+
+# =============================================================================
+# 그래디언트 체크포인팅 (재계산)
+# =============================================================================
+class Checkpoint(Function):
+    """fn(*inputs)를 계산 그래프 없이 계산하고, 역전파할 때 fn을 다시 계산해 기울기를 구합니다.
+
+    순전파에서는 구간(fn)의 입력만 남기고 중간 결과는 모두 버리므로, 그만큼의 메모리를 재계산과 맞바꿉니다.
+    fn 안에서 입력 이외에 사용하는 Variable(파라미터 등)은 creator가 없는 변수여야 하며,
+    그 기울기는 재계산한 그래프의 역전파에서 더해집니다.
+    """
+    __slots__ = ('fn',)
+    retain_outputs = ()
+    thread_safe = False # backward에서 enable_backprop을 바꿔 재계산합니다. (Config는 프로세스 전체에서 공유됩니다.)
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def forward(self, *xs):
+        with no_grad():
+            y = self.fn(*[Variable(x) for x in xs])
+        if not isinstance(y, Variable):
+            raise TypeError('checkpointed fn must return a single Variable')
+        return y.data
+
+    def backward(self, gy):
+        if Config.enable_backprop:
+            raise NotImplementedError('checkpoint does not support create_graph=True')
+        xs = [Constant(x.data) if isinstance(x, Constant) else Variable(x.data) for x in self.inputs]
+        with using_config('enable_backprop', True):
+            y = self.fn(*xs)
+        y.grad = gy
+        y._seed(None, False) # gy는 이미 스케일되어 있으므로 다시 곱하지 않습니다.
+        y._backward(False, False, Config.loss_scaler, xs) # 구간 안의 파라미터의 기울기만 스케일을 되돌립니다.
+
+        gxs = []
+        for x in xs:
+            if isinstance(x, Constant):
+                gxs.append(None)
+            elif x.grad is None: # 출력과 관계없는 입력
+                gxs.append(backend.get_array_module(x.data).zeros(gy.shape[:gy.ndim - y.ndim] + x.shape, x.dtype))
+            else:
+                gxs.append(x.grad)
+        return tuple(gxs)
+
+    def jvp(self, xs, ys, *txs):
+        vs = [Variable(x) for x in xs]
+        for v, tx in zip(vs, txs):
+            v.tangent = tx
+        with no_grad():
+            y = self.fn(*vs)
+        return y.tangent
+
+
+def checkpoint(fn, *inputs):
+    return Checkpoint(fn)(*inputs)
+
+
+def checkpoint_sequential(functions, x, segments='sqrt'):
+    """층(함수)의 리스트 functions를 차례로 적용합니다. 층을 segments개의 구간으로 나누어 각 구간을 checkpoint로 감쌉니다.
+
+    마지막 구간은 역전파가 곧바로 시작되므로 checkpoint로 감싸지 않습니다.
+    segments='sqrt'이면 층 수 N에 대해 약 sqrt(N)개의 구간을 사용합니다.
+    이때 순전파 후에 남는 활성값은 구간 경계의 sqrt(N)개이고, 역전파에서 한 번에 재계산하는 구간의 길이도 sqrt(N)이므로
+    메모리는 O(N)에서 O(sqrt(N))으로 줄고, 순전파를 한 번 더 하는 만큼 계산이 늘어납니다.
+    """
+    functions = list(functions)
+    n = len(functions)
+    if segments == 'sqrt':
+        segments = max(1, round(math.sqrt(n)))
+    if segments < 1:
+        raise ValueError('segments must be >= 1, got {}'.format(segments))
+    if n == 0:
+        return x
+    segments = min(segments, n)
+    size = math.ceil(n / segments)
+
+    def run(funcs):
+        def segment(x):
+            for f in funcs:
+                x = f(x)
+            return x
+        return segment
+
+    for start in range(0, n, size):
+        segment = run(functions[start:start + size])
+        if start + size >= n: # 마지막 구간은 곧바로 역전파하므로 재계산하지 않습니다.
+            return segment(x)
+        x = checkpoint(segment, x)
+    return x
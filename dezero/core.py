@@ -0,0 +1,684 @@
+import math
+import weakref
+import contextlib
+import numpy as np
+import dezero
+
+
+# =============================================================================
+# Config
+# =============================================================================
+class _ConfigType(type):
+    """Config의 설정이 바뀔 때마다 Config.extended를 다시 계산합니다.
+
+    extended는 autocast, 훅, Arena, 순전파 모드 자동 미분 중 하나라도 켜져 있으면 True이며,
+    Function.__call__은 이 값 하나만 확인하고 모두 꺼져 있으면 각 설정을 살피지 않습니다.
+    """
+
+    def __setattr__(cls, name, value):
+        type.__setattr__(cls, name, value)
+        type.__setattr__(cls, 'extended', cls.compute_dtype is not None or bool(cls.function_hooks)
+                         or cls.array_arena is not None or cls.enable_forward_ad)
+
+
+class Config(metaclass=_ConfigType):
+    enable_backprop = True
+    enable_forward_ad = False
+    use_array_pool = False # True이면 NumPy 배열 대신 버퍼를 재사용하는 dezero.backend.numpy_pool을 사용합니다.
+    array_arena = None # dezero.backend.Arena를 설정하면 NumPy 배열을 Arena에서 할당하고 회수합니다.
+    compute_dtype = None # 실수형 입력을 이 dtype(예: float16)으로 바꿔 순전파합니다. (dezero.amp.autocast)
+    loss_scaler = None # backward에서 손실 스케일링을 합니다. (dezero.amp.DynamicLossScaler)
+    function_hooks = () # Function의 forward/backward 앞뒤에 호출할 훅들입니다. (dezero.profiler.FunctionHook)
+    extended = False # 위의 설정으로 계산됩니다. (_ConfigType)
+
+
+@contextlib.contextmanager
+def using_config(name, value):
+    old_value = getattr(Config, name)
+    setattr(Config, name, value)
+    try:
+        yield
+    finally:
+        setattr(Config, name, old_value)
+
+
+def no_grad():
+    return using_config('enable_backprop', False)
+
+
+# =============================================================================
+# Variable / Function
+# =============================================================================
+# Variable과 Function은 계산 그래프의 노드로 대량 생성되므로 __slots__로 인스턴스별 __dict__를 없앱니다.
+# 하위 클래스도 __slots__를 선언해야 __dict__가 다시 생기지 않습니다.
+class Variable:
+    __slots__ = ('data', 'name', 'grad', 'tangent', 'creator', 'generation', 'node', '__weakref__')
+    __array_priority__ = 200
+
+    def __init__(self, data, name=None):
+        if data is not None:
+            if not isinstance(data, dezero.backend.array_types):
+                raise TypeError('{} is not supported'.format(type(data)))
+
+        self.data = data
+        self.name = name
+        self.grad = None
+        self.tangent = None # 순전파 모드 자동 미분(jvp)에서 입력 방향으로의 미분값
+        self.creator = None
+        self.generation = 0
+        self.node = None # 계산 그래프에서 이 변수 대신 쓰이는 변수 (_graph_node 참고)
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def ndim(self):
+        return self.data.ndim
+
+    @property
+    def size(self):
+        return self.data.size
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        if self.data is None:
+            return 'variable(None)'
+        p = str(self.data).replace('\n', '\n' + ' ' * 9)
+        return 'variable(' + p + ')'
+
+    def __add__(self, other):
+        return add(self, other)
+
+    def __radd__(self, other):
+        return add(self, other)
+
+    def __mul__(self, other):
+        return mul(self, other)
+
+    def __rmul__(self, other):
+        return mul(self, other)
+
+    def __neg__(self):
+        return neg(self)
+
+    def __sub__(self, other):
+        return sub(self, other)
+
+    def __rsub__(self, other):
+        return rsub(self, other)
+
+    def __truediv__(self, other):
+        return div(self, other)
+
+    def __rtruediv__(self, other):
+        return rdiv(self, other)
+
+    def __pow__(self, other):
+        return pow(self, other)
+
+    def __rpow__(self, other):
+        return rpow(self, other)
+
+    def __matmul__(self, other):
+        return dezero.functions.matmul(self, other)
+
+    def __rmatmul__(self, other):
+        return dezero.functions.matmul(other, self)
+
+    def __getitem__(self, slices):
+        return dezero.functions.get_item(self, slices)
+
+    def reshape(self, *shape):
+        return dezero.functions.reshape(self, *shape)
+
+    def transpose(self, *axes):
+        if len(axes) == 0:
+            axes = None
+        elif len(axes) == 1:
+            if isinstance(axes[0], (tuple, list)) or axes[0] is None:
+                axes = axes[0]
+        return dezero.functions.transpose(self, axes)
+
+    @property
+    def T(self):
+        return dezero.functions.transpose(self)
+
+    def sum(self, axis=None, keepdims=False):
+        return dezero.functions.sum(self, axis, keepdims)
+
+    def set_creator(self, func):
+        self.creator = func
+        self.generation = func.generation + 1
+
+    def cleargrad(self):
+        if Config.array_arena is not None:
+            Config.array_arena.release(self.grad)
+        self.grad = None
+
+    def _seed(self, scaler, create_graph):
+        """역전파의 시작값을 준비합니다."""
+        if self.grad is None:
+            xp = dezero.backend.get_array_module(self.data)
+            self.grad = xp.ones_like(self.data)
+        if scaler is not None:
+            self.grad = self.grad * scaler.scale # 파라미터의 기울기를 구할 때 다시 나눕니다.
+        if create_graph and not isinstance(self.grad, Variable):
+            self.grad = Variable(self.grad) # 역전파 계산도 계산 그래프로 만들기 위해 미분값을 Variable로 다룹니다.
+        if isinstance(self.node, Variable): # 그래프에서는 self.node가 self를 대신합니다.
+            self.node.grad = self.grad
+            self.grad = None
+
+    def backward(self, retain_grad=False, create_graph=False, workers=None):
+        """workers를 정하면 그 수의 스레드로 독립된 가지의 역전파를 동시에 계산합니다. (dezero.scheduler)"""
+        if workers is not None and not create_graph:
+            return dezero.scheduler.parallel_backward(self, workers, retain_grad)
+        scaler = Config.loss_scaler if not create_graph else None
+        self._seed(scaler, create_graph)
+        if scaler is not None:
+            scaler.found_inf = False # 이번 역전파에서 파라미터의 기울기에 inf/nan이 생겼는지 기록합니다.
+        self._backward(retain_grad, create_graph, scaler)
+        if scaler is not None:
+            scaler.update(scaler.found_inf)
+
+    def _backward(self, retain_grad, create_graph, scaler, inputs=()):
+        """시작값(self.grad)을 준비한 뒤의 역전파입니다. scaler의 update는 호출하지 않습니다.
+
+        Checkpoint.backward는 구간을 다시 계산한 그래프를 이 함수로 역전파합니다. 그 그래프의 입력(inputs)은
+        creator가 없지만 파라미터가 아니므로, 기울기를 스케일된 그대로 바깥의 역전파에 돌려줍니다.
+        """
+        skip = {id(x) for x in inputs}
+        funcs = []
+        seen_set = set()
+
+        def add_func(f):
+            if f not in seen_set:
+                funcs.append(f)
+                seen_set.add(f)
+                funcs.sort(key=lambda x: x.generation)
+
+        add_func(self.creator)
+        arena = Config.array_arena
+        hooks = Config.function_hooks
+        owned = set() # 이번 역전파에서 기울기를 더하며 새로 만든, 다른 곳에서 참조하지 않는 배열의 id
+
+        with using_config('enable_backprop', create_graph):
+            while funcs:
+                f = funcs.pop()
+                gys = [output().grad for output in f.outputs]
+                for gy in gys:
+                    owned.discard(id(gy)) # backward에 넘긴 기울기는 입력의 기울기로 그대로 전달될 수 있습니다.
+                gxs = f.backward(*gys) if not hooks else _hooked_backward(hooks, f, gys)
+                if not isinstance(gxs, tuple):
+                    gxs = (gxs,)
+
+                for x, gx in zip(f.inputs, gxs):
+                    if isinstance(x, Constant):
+                        continue
+
+                    if x.creator is None and not create_graph and id(x) not in skip:
+                        gx = _master_grad(x, gx, scaler)
+                        if scaler is not None and not scaler.found_inf:
+                            scaler.found_inf = not dezero.backend.get_array_module(gx).isfinite(gx).all()
+
+                    if x.grad is None:
+                        x.grad = gx
+                    elif create_graph:
+                        x.grad = x.grad + gx
+                    else:
+                        x.grad = _accumulate_grad(x.grad, gx, owned)
+
+                    if x.creator is not None:
+                        add_func(x.creator)
+
+                _finish_outputs(f, retain_grad, arena)
+
+
+class Constant(Variable):
+    __slots__ = ()
+
+
+def _finish_outputs(f, retain_grad, arena):
+    """f의 backward가 끝난 뒤 출력의 기울기를 버리거나, retain_grad=True이면 대신 쓰인 변수의 원래 변수에도 남깁니다."""
+    if not retain_grad:
+        for y in f.outputs:
+            if arena is not None:
+                arena.release(y().grad) # 다른 곳에서 쓰고 있으면 다시 내주기 전에 걸러집니다.
+            y().grad = None
+    else:
+        for y in f.outputs:
+            y = y()
+            if isinstance(y.node, weakref.ref):
+                handle = y.node()
+                if handle is not None:
+                    handle.grad = y.grad
+
+
+def _hooked_forward(hooks, f, xs):
+    for hook in hooks:
+        hook.forward_preprocess(f, xs)
+    ys = None
+    try:
+        ys = f.forward(*xs)
+    finally: # forward가 예외를 일으켜도 postprocess를 ys=None으로 호출해 훅의 상태를 되돌립니다.
+        for hook in reversed(hooks):
+            hook.forward_postprocess(f, xs, ys)
+    return ys
+
+
+def _hooked_backward(hooks, f, gys):
+    for hook in hooks:
+        hook.backward_preprocess(f, gys)
+    gxs = None
+    try:
+        gxs = f.backward(*gys)
+    finally:
+        for hook in reversed(hooks):
+            hook.backward_postprocess(f, gys, gxs)
+    return gxs
+
+
+def _master_grad(x, gx, scaler):
+    """파라미터 x의 기울기를 x와 같은 dtype(혼합 정밀도에서는 float32의 마스터 가중치)으로 바꾸고 손실 스케일을 되돌립니다."""
+    if x.data.dtype.kind == 'f' and gx.dtype != x.data.dtype:
+        gx = gx.astype(x.data.dtype)
+    if scaler is not None:
+        gx = gx / scaler.scale
+    return gx
+
+
+def _accumulate_grad(grad, gx, owned):
+    """grad + gx를 반환합니다. grad가 owned에 있으면 grad에 제자리(in-place)로 더합니다.
+
+    처음 받은 기울기(gx)는 다른 변수의 기울기, 사용자가 준 배열, 읽기 전용 뷰일 수 있으므로 바꾸지 않고,
+    두 번째로 더할 때 새로 만든 배열만 owned에 넣어 이후의 덧셈에 다시 사용합니다.
+    """
+    if id(grad) in owned and grad.shape == gx.shape and grad.dtype == np.result_type(grad, gx):
+        xp = dezero.backend.get_array_module(grad)
+        xp.add(grad, gx, out=grad)
+        return grad
+    grad = grad + gx
+    if isinstance(grad, dezero.backend.array_types): # 0차원 배열끼리 더하면 스칼라(np.float64)가 됩니다.
+        owned.add(id(grad))
+    return grad
+
+
+def as_array(x, array_module=np):
+    if isinstance(x, np.ndarray): # np.isscalar는 ndarray에 대해 느리므로 (0차원 배열에서 약 1us) 먼저 확인합니다.
+        return x
+    if np.isscalar(x):
+        return array_module.array(x)
+    return x
+
+
+_constant_cache = {}
+_constant_cache_size = 1024
+
+
+def as_variable(obj, like=None):
+    if isinstance(obj, Variable):
+        return obj
+    if isinstance(obj, dezero.backend.array_types):
+        return Constant(obj)
+
+    # 상수는 캐시에 계속 남으므로 풀의 버퍼가 아닌 일반 배열로 만듭니다. (numpy_pool.array는 np.array입니다)
+    xp = dezero.backend.get_array_module(like) if like is not None else np
+    dtype = xp.result_type(like.data, obj) if like is not None else None
+    sign = math.copysign(1, obj) if isinstance(obj, (float, np.floating)) else None # 0.0 == -0.0이므로 부호도 키에 넣습니다.
+    key = (type(obj), obj, sign, dtype, xp)
+    c = _constant_cache.get(key)
+    if c is None:
+        if len(_constant_cache) >= _constant_cache_size:
+            _constant_cache.clear()
+        c = Constant(xp.array(obj, dtype=dtype))
+        _constant_cache[key] = c
+    return c
+
+
+# 함수의 출력 y를 다른 함수 g가 입력으로 받을 때, g.inputs에 y를 그대로 넣으면 그래프가 y.data를 끝까지 붙잡게 됩니다.
+# g.backward도 y의 creator의 backward도 y.data가 필요 없다면, data가 없는 변수(node)를 만들어 그래프에서 y 대신 사용합니다.
+# 그러면 사용자가 y를 버리는 즉시 y.data가 해제됩니다. 두 변수는 x.node로 서로를 가리킵니다.
+# - y.node: 그래프에서 y 대신 쓰이는 변수 (y를 그대로 쓰기로 정했으면 _KEEP. y 자신을 가리키면 순환 참조가 생깁니다)
+# - node.node: 원래 변수 y의 weakref (retain_grad=True일 때 기울기를 y에도 남기는 데 사용합니다)
+_KEEP = object()
+
+
+def _graph_node(x, retained):
+    node = x.node
+    if node is _KEEP or isinstance(node, weakref.ref): # x가 이미 다른 변수를 대신하는 변수인 경우도 그대로 사용합니다.
+        return x
+    if node is None:
+        f = x.creator
+        if f is None: # 사용자가 만든 변수(파라미터 등)는 그대로 사용합니다.
+            return x
+        if retained or f.retain_outputs is None or f.retain_outputs:
+            x.node = _KEEP
+            return x
+        node = Variable(None, x.name)
+        node.creator = f
+        node.generation = x.generation
+        node.node = weakref.ref(x)
+        for i, ref in enumerate(f.outputs):
+            if ref() is x:
+                f.outputs[i] = weakref.ref(node)
+        x.node = node
+    elif retained: # 나중에 data가 필요한 함수가 x를 받았습니다.
+        node.data = x.data
+    return node
+
+
+class Function:
+    """계산 그래프의 함수입니다.
+
+    하위 클래스는 backward에서 사용할 순전파의 입력/출력의 인덱스를 retain_inputs, retain_outputs로 선언합니다.
+    None은 모두를 뜻하며, 선언하지 않은 입력/출력의 data는 순전파가 끝나면 그래프에서 붙잡지 않습니다.
+    backward에서 Config를 바꾸는 함수는 thread_safe = False로 선언하며, 그런 함수가 있는 그래프는 하나의 스레드로 역전파합니다.
+    """
+    __slots__ = ('inputs', 'outputs', 'generation', '__weakref__')
+    retain_inputs = None
+    retain_outputs = None
+    thread_safe = True
+
+    def __call__(self, *inputs):
+        inputs = [x if isinstance(x, Variable) else as_variable(x) for x in inputs]
+
+        xs = [x.data for x in inputs]
+        extended = Config.extended # False이면 autocast, 훅, Arena, 순전파 모드를 확인하지 않습니다.
+        if extended and Config.compute_dtype is not None:
+            dtype = Config.compute_dtype
+            xs = [x.astype(dtype) if x.dtype.kind == 'f' and x.dtype != dtype else x for x in xs]
+        hooks = Config.function_hooks if extended else ()
+        ys = self.forward(*xs) if not hooks else _hooked_forward(hooks, self, xs)
+        if not isinstance(ys, tuple):
+            ys = (ys,)
+        outputs = [Variable(as_array(y)) for y in ys]
+
+        if Config.enable_backprop:
+            self.generation = max([x.generation for x in inputs])
+            for output in outputs:
+                output.set_creator(self)
+            retain = self.retain_inputs
+            self.inputs = [_graph_node(x, retain is None or i in retain) for i, x in enumerate(inputs)]
+            self.outputs = [weakref.ref(output) for output in outputs]
+
+        if not extended:
+            return outputs if len(outputs) > 1 else outputs[0]
+
+        if Config.array_arena is not None:
+            for output in outputs:
+                Config.array_arena.adopt(output) # output이 사라지면 data 버퍼를 회수합니다.
+
+        if Config.enable_forward_ad:
+            txs = [x.tangent for x in inputs]
+            if any(tx is not None for tx in txs):
+                txs = [dezero.backend.get_array_module(x).zeros_like(x) if tx is None else tx for x, tx in zip(xs, txs)]
+                tys = self.jvp(xs, [output.data for output in outputs], *txs)
+                if not isinstance(tys, tuple):
+                    tys = (tys,)
+                for output, ty in zip(outputs, tys):
+                    output.tangent = as_array(ty)
+        return outputs if len(outputs) > 1 else outputs[0]
+
+    # backward에서 순전파의 입력/출력을 꺼낼 때 사용합니다.
+    # 역전파 계산을 그래프로 만드는 중(create_graph=True)이면 Variable을, 아니면 ndarray를 돌려줍니다.
+    # retain_inputs/retain_outputs로 선언하지 않은 위치의 data는 None일 수 있습니다.
+    def retained_inputs(self):
+        if Config.enable_backprop:
+            return self.inputs
+        return [x.data for x in self.inputs]
+
+    def retained_outputs(self):
+        if Config.enable_backprop:
+            return [y() for y in self.outputs]
+        return [y().data for y in self.outputs]
+
+    def forward(self, xs):
+        raise NotImplementedError()
+
+    def backward(self, gys):
+        raise NotImplementedError()
+
+    # 순전파 모드: 입력의 tangent들로부터 출력의 tangent를 구합니다. xs, ys는 순전파의 입력/출력 ndarray입니다.
+    def jvp(self, xs, ys, *txs):
+        raise NotImplementedError()
+
+
+# =============================================================================
+# 사칙연산 / 연산자 오버로드
+# =============================================================================
+# 배치로 묶은 tangent/기울기는 맨 앞에 배치 축이 붙어 있습니다(예: vjp, jacobian).
+# 입력이 브로드캐스트되는 경우, 배치 축 뒤에 1을 채워 출력과 축을 맞춥니다.
+def _expand_batch(t, x, y):
+    nb = t.ndim - x.ndim
+    if nb == 0 or x.ndim == y.ndim:
+        return t
+    return t.reshape(t.shape[:nb] + (1,) * (y.ndim - x.ndim) + x.shape)
+
+
+# 이항 연산의 기울기를 각 입력의 모양으로 합칩니다. (브로드캐스트의 역전파)
+# 두 입력의 모양이 같으면 아무것도 하지 않고, 상수 입력의 기울기(None)는 건너뜁니다.
+def _sum_to_inputs(f, gx0, gx1):
+    if f.x0_shape != f.x1_shape:
+        ndim = max(len(f.x0_shape), len(f.x1_shape))
+        if gx0 is not None:
+            gx0 = dezero.functions.sum_to_grad(gx0, f.x0_shape, ndim)
+        if gx1 is not None:
+            gx1 = dezero.functions.sum_to_grad(gx1, f.x1_shape, ndim)
+    return gx0, gx1
+
+
+def _requires_grad(f, i):
+    return not isinstance(f.inputs[i], Constant)
+
+
+class Add(Function):
+    __slots__ = ('x0_shape', 'x1_shape')
+    retain_inputs = ()
+    retain_outputs = ()
+
+    def forward(self, x0, x1):
+        self.x0_shape, self.x1_shape = x0.shape, x1.shape
+        xp = dezero.backend.get_array_module(x0)
+        y = xp.add(x0, x1)
+        return y
+
+    def backward(self, gy):
+        gx0 = gy if _requires_grad(self, 0) else None
+        gx1 = gy if _requires_grad(self, 1) else None
+        return _sum_to_inputs(self, gx0, gx1)
+
+    def jvp(self, xs, ys, tx0, tx1):
+        x0, x1 = xs
+        y, = ys
+        return _expand_batch(tx0, x0, y) + _expand_batch(tx1, x1, y)
+
+
+def add(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Add()(x0, x1)
+
+
+class Mul(Function):
+    __slots__ = ('x0_shape', 'x1_shape')
+    retain_inputs = (0, 1)
+    retain_outputs = ()
+
+    def forward(self, x0, x1):
+        self.x0_shape, self.x1_shape = x0.shape, x1.shape
+        xp = dezero.backend.get_array_module(x0)
+        y = xp.multiply(x0, x1)
+        return y
+
+    def backward(self, gy):
+        x0, x1 = self.retained_inputs()
+        gx0 = gy * x1 if _requires_grad(self, 0) else None
+        gx1 = gy * x0 if _requires_grad(self, 1) else None
+        return _sum_to_inputs(self, gx0, gx1)
+
+    def jvp(self, xs, ys, tx0, tx1):
+        x0, x1 = xs
+        y, = ys
+        return _expand_batch(tx0, x0, y) * x1 + x0 * _expand_batch(tx1, x1, y)
+
+
+def mul(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Mul()(x0, x1)
+
+
+class Neg(Function):
+    __slots__ = ()
+    retain_inputs = ()
+    retain_outputs = ()
+
+    def forward(self, x):
+        xp = dezero.backend.get_array_module(x)
+        return xp.negative(x)
+
+    def backward(self, gy):
+        return -gy
+
+    def jvp(self, xs, ys, tx):
+        return -tx
+
+
+def neg(x):
+    return Neg()(x)
+
+
+class Sub(Function):
+    __slots__ = ('x0_shape', 'x1_shape')
+    retain_inputs = ()
+    retain_outputs = ()
+
+    def forward(self, x0, x1):
+        self.x0_shape, self.x1_shape = x0.shape, x1.shape
+        xp = dezero.backend.get_array_module(x0)
+        y = xp.subtract(x0, x1)
+        return y
+
+    def backward(self, gy):
+        gx0 = gy if _requires_grad(self, 0) else None
+        gx1 = -gy if _requires_grad(self, 1) else None
+        return _sum_to_inputs(self, gx0, gx1)
+
+    def jvp(self, xs, ys, tx0, tx1):
+        x0, x1 = xs
+        y, = ys
+        return _expand_batch(tx0, x0, y) - _expand_batch(tx1, x1, y)
+
+
+def sub(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Sub()(x0, x1)
+
+
+def rsub(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Sub()(x1, x0)
+
+
+class Div(Function):
+    __slots__ = ('x0_shape', 'x1_shape')
+    retain_inputs = (0, 1)
+    retain_outputs = ()
+
+    def forward(self, x0, x1):
+        self.x0_shape, self.x1_shape = x0.shape, x1.shape
+        xp = dezero.backend.get_array_module(x0)
+        y = xp.divide(x0, x1)
+        return y
+
+    def backward(self, gy):
+        x0, x1 = self.retained_inputs()
+        gx0 = gy / x1 if _requires_grad(self, 0) else None
+        gx1 = gy * (-x0 / x1 ** 2) if _requires_grad(self, 1) else None
+        return _sum_to_inputs(self, gx0, gx1)
+
+    def jvp(self, xs, ys, tx0, tx1):
+        x0, x1 = xs
+        y, = ys
+        return (_expand_batch(tx0, x0, y) - y * _expand_batch(tx1, x1, y)) / x1
+
+
+def div(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Div()(x0, x1)
+
+
+def rdiv(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Div()(x1, x0)
+
+
+class Pow(Function):
+    __slots__ = ('c',)
+    retain_inputs = (0,)
+    retain_outputs = ()
+
+    def __init__(self, c):
+        self.c = c
+
+    def forward(self, x):
+        xp = dezero.backend.get_array_module(x)
+        y = xp.power(x, self.c)
+        return y
+
+    def backward(self, gy):
+        x, = self.retained_inputs()
+        c = self.c
+        gx = c * x ** (c - 1) * gy
+        return gx
+
+    def jvp(self, xs, ys, tx):
+        x, = xs
+        c = self.c
+        return c * x ** (c - 1) * tx
+
+
+class Power(Function):
+    """지수도 변수인 거듭제곱 y = x0 ** x1입니다. 지수가 상수이면 Pow를 사용합니다."""
+    __slots__ = ('x0_shape', 'x1_shape')
+    retain_inputs = (0, 1)
+    retain_outputs = (0,)
+
+    def forward(self, x0, x1):
+        self.x0_shape, self.x1_shape = x0.shape, x1.shape
+        xp = dezero.backend.get_array_module(x0)
+        y = xp.power(x0, x1)
+        return y
+
+    def backward(self, gy):
+        x0, x1 = self.retained_inputs()
+        y, = self.retained_outputs()
+        gx0 = gy * x1 * x0 ** (x1 - 1) if _requires_grad(self, 0) else None
+        gx1 = None
+        if _requires_grad(self, 1):
+            if isinstance(x0, Variable): # create_graph=True
+                gx1 = gy * y * dezero.functions.log(x0)
+            else:
+                gx1 = gy * y * dezero.backend.get_array_module(x0).log(x0)
+        return _sum_to_inputs(self, gx0, gx1)
+
+    def jvp(self, xs, ys, tx0, tx1):
+        x0, x1 = xs
+        y, = ys
+        xp = dezero.backend.get_array_module(x0)
+        return _expand_batch(tx0, x0, y) * x1 * x0 ** (x1 - 1) + _expand_batch(tx1, x1, y) * y * xp.log(x0)
+
+
+def pow(x, c):
+    if isinstance(c, Variable):
+        return Power()(x, c)
+    return Pow(c)(x)
+
+
+def rpow(x, c):
+    c = as_variable(c, x)
+    return Power()(c, x)
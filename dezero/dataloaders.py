@@ -0,0 +1,111 @@
+import math
+import threading
+import numpy as np
+
+
+# =============================================================================
+# 데이터 로더
+# =============================================================================
+class DataLoader:
+    """데이터셋에서 미니배치를 꺼냅니다.
+
+    for x, t in DataLoader(dataset, batch_size=32):
+        loss = loss_fn(Variable(x), t)
+        ...
+
+    배치는 미리 만든 prefetch + 1개의 버퍼(링 버퍼)에 돌아가며 씁니다. prefetch > 0이면 workers개의 스레드가
+    다음 prefetch개의 배치를 미리 채워 두므로, 한 스텝의 시간이 (계산 + 배치 준비)가 아니라 그 중 긴 쪽이 됩니다.
+    반환된 배치는 다음 배치를 꺼낼 때 다시 채워질 수 있으므로, 더 오래 보관하려면 복사해야 합니다.
+    shuffle=True이면 epoch마다 인덱스만 섞습니다. (데이터셋은 복사하지 않습니다.)
+    데이터셋이 get_batch(indices, outs)를 가지면 그것으로 버퍼를 채우고, 없으면 dataset[i]를 하나씩 씁니다.
+    """
+
+    def __init__(self, dataset, batch_size, shuffle=True, prefetch=2, workers=1):
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.prefetch = prefetch
+        self.workers = workers
+        self.data_size = len(dataset)
+        self.max_iter = math.ceil(self.data_size / batch_size)
+        self._buffers = None
+        self._single = False
+
+    def __len__(self):
+        return self.max_iter
+
+    def __iter__(self):
+        n = self.data_size
+        index = np.random.permutation(n) if self.shuffle else np.arange(n)
+        batches = [index[i:i + self.batch_size] for i in range(0, n, self.batch_size)]
+        if self._buffers is None:
+            self._buffers = self._allocate()
+        if self.prefetch == 0:
+            for indices in batches:
+                yield self._fill(indices, self._buffers[0])
+        else:
+            yield from self._prefetch(batches)
+
+    def _allocate(self):
+        sample = self.dataset[0]
+        self._single = not isinstance(sample, tuple)
+        if self._single:
+            sample = (sample,)
+        sample = [np.asarray(v) for v in sample]
+        return [tuple(np.empty((self.batch_size,) + v.shape, v.dtype) for v in sample)
+                for _ in range(self.prefetch + 1)]
+
+    def _fill(self, indices, buffers):
+        outs = tuple(buf[:len(indices)] for buf in buffers) # 마지막 배치는 batch_size보다 작을 수 있습니다.
+        get_batch = getattr(self.dataset, 'get_batch', None)
+        if get_batch is not None:
+            get_batch(indices, outs)
+        else:
+            for k, i in enumerate(indices):
+                item = self.dataset[i]
+                for out, v in zip(outs, item if not self._single else (item,)):
+                    out[k] = v
+        return outs[0] if self._single else outs
+
+    def _prefetch(self, batches):
+        # j번째 배치는 버퍼 j % n_slots에 씁니다. 그 버퍼를 쓰던 (j - n_slots)번째 배치를 사용자가 다 쓴 뒤에 채웁니다.
+        n_slots = len(self._buffers)
+        cond = threading.Condition()
+        ready = {} # 배치 번호 -> 배치 (또는 채우다 생긴 예외)
+        released = 0 # 사용자가 다 쓴 배치의 수
+        stop = False
+
+        def produce(first):
+            for j in range(first, len(batches), self.workers):
+                with cond:
+                    cond.wait_for(lambda: stop or released > j - n_slots)
+                    if stop:
+                        return
+                try:
+                    batch = self._fill(batches[j], self._buffers[j % n_slots])
+                except Exception as e:
+                    batch = e
+                with cond:
+                    ready[j] = batch
+                    cond.notify_all()
+
+        threads = [threading.Thread(target=produce, args=(t,), daemon=True) for t in range(self.workers)]
+        for t in threads:
+            t.start()
+        try:
+            for i in range(len(batches)):
+                with cond:
+                    released = i # 다음 배치를 꺼내면 앞의 배치는 다 쓴 것으로 봅니다.
+                    cond.notify_all()
+                    cond.wait_for(lambda: i in ready)
+                    batch = ready.pop(i)
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            # 끝까지 돌거나, 중간에 break하거나, 예외가 생기면 스레드를 멈춥니다.
+            with cond:
+                stop = True
+                cond.notify_all()
+            for t in threads:
+                t.join()
@@ -0,0 +1,62 @@
+import numpy as np
+from dezero.storage import load_arrays
+
+
+# =============================================================================
+# 데이터셋
+# =============================================================================
+class Dataset:
+    """같은 길이의 배열들을 맨 앞의 축으로 묶은 데이터셋입니다.
+
+    dataset[i]는 (x[i], t[i])처럼 각 배열의 i번째 원소를 반환합니다. (배열이 하나면 그 원소만 반환합니다.)
+    transform을 주면 transform(x[i], t[i])의 결과를 반환합니다.
+    """
+
+    def __init__(self, *arrays, transform=None):
+        if len({len(a) for a in arrays}) != 1:
+            raise ValueError('arrays must have the same length')
+        self.arrays = arrays
+        self.transform = transform
+
+    def __len__(self):
+        return len(self.arrays[0])
+
+    def __getitem__(self, index):
+        item = tuple(a[index] for a in self.arrays)
+        if self.transform is not None:
+            item = self.transform(*item)
+        if isinstance(item, tuple) and len(item) == 1:
+            return item[0]
+        return item
+
+    def get_batch(self, indices, outs):
+        """indices의 샘플들을 outs(배열마다 미리 만든 버퍼)에 씁니다.
+
+        transform이 없으면 np.take로 한 번에 모으므로, 섞을 때도 전체 데이터를 복사하지 않고 배치만큼만 복사합니다.
+        indices는 0 이상 len(self) 미만이어야 하며, 벗어나면 IndexError를 일으킵니다.
+        """
+        indices = np.asarray(indices)
+        if indices.size and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError('indices must be in [0, {}), got min {} and max {}'.format(
+                len(self), indices.min(), indices.max()))
+        if self.transform is None:
+            for a, out in zip(self.arrays, outs):
+                np.take(a, indices, axis=0, out=out, mode='clip') # 위에서 확인했습니다. (mode='raise'는 out을 거치는 임시 버퍼를 만듭니다)
+            return
+        for k, i in enumerate(indices):
+            item = self[i]
+            if not isinstance(item, tuple):
+                item = (item,)
+            for out, v in zip(outs, item):
+                out[k] = v
+
+
+class MemmapDataset(Dataset):
+    """save_arrays/create_arrays로 만든 파일의 배열들(names의 순서)을 읽기 전용 메모리 맵으로 연 데이터셋입니다.
+
+    배치를 만들 때 필요한 샘플의 페이지만 디스크에서 읽으므로, 메모리보다 큰 데이터셋으로도 학습할 수 있습니다.
+    """
+
+    def __init__(self, path, names, transform=None):
+        arrays = load_arrays(path, mode='r')
+        super().__init__(*[arrays[name] for name in names], transform=transform)
@@ -0,0 +1,100 @@
+import numpy as np
+from dezero.core import Variable, as_array, no_grad, using_config
+
+
+# =============================================================================
+# 순전파 모드 자동 미분 / 야코비 행렬
+# =============================================================================
+def jvp(f, x, v, batched=False):
+    """야코비 행렬 J와 벡터 v의 곱 Jv를 순전파 모드로 구합니다.
+
+    순전파 한 번에 각 함수의 jvp로 tangent를 함께 전달하며, 계산 그래프는 만들지 않습니다.
+    batched=True이면 v의 맨 앞 축을 배치 축으로 보고, B개의 tangent를 한 번의 순전파로 전달합니다.
+    (f(x)의 값, Jv)를 반환합니다.
+    """
+    x = Variable(x.data if isinstance(x, Variable) else as_array(x))
+    v = v.data if isinstance(v, Variable) else as_array(v)
+    x.tangent = v
+    with no_grad(), using_config('enable_forward_ad', True):
+        y = f(x)
+    ty = y.tangent
+    if ty is None:
+        ty = np.zeros(v.shape[:1] + y.shape if batched else y.shape, dtype=y.dtype)
+    return y.data, ty
+
+
+def vjp(f, x, v, batched=False):
+    """벡터 v와 야코비 행렬 J의 곱 vJ를 역전파 모드로 구합니다.
+
+    batched=True이면 v의 맨 앞 축을 배치 축으로 보고, B개의 시작값을 쌓은 채로 한 번 역전파합니다.
+    각 함수의 backward는 gy의 앞쪽에 붙은 배치 축을 그대로 유지하므로 그래프를 한 번만 따라갑니다.
+    (f(x)의 값, vJ)를 반환합니다.
+    """
+    x = Variable(x.data if isinstance(x, Variable) else as_array(x))
+    v = v.data if isinstance(v, Variable) else as_array(v)
+    y = f(x)
+    if v.shape != (v.shape[:1] + y.shape if batched else y.shape):
+        raise ValueError('cotangent shape {} does not match output shape {}'.format(v.shape, y.shape))
+    y.grad = v
+    y.backward()
+    gx = x.grad
+    if gx is None:
+        return y.data, np.zeros(v.shape[:1] + x.shape if batched else x.shape, dtype=x.dtype)
+    if batched: # 배치 축이 없는 경로(예: x와 무관한 출력)에서 온 기울기도 배치 모양으로 맞춥니다.
+        gx = np.broadcast_to(gx, v.shape[:1] + x.shape)
+    return y.data, gx
+
+
+def jacobian(f, x, mode='auto'):
+    """f의 야코비 행렬을 y.shape + x.shape 모양으로 구합니다.
+
+    mode='auto'이면 입력 원소 수 N과 출력 원소 수 M을 비교해,
+    N <= M이면 순전파 모드, 아니면 역전파 모드를 사용합니다.
+    어느 쪽이든 단위 벡터 N개(또는 M개)를 배치로 쌓아 그래프를 한 번만 따라갑니다.
+    """
+    x = x.data if isinstance(x, Variable) else as_array(x)
+    if mode == 'auto':
+        with no_grad():
+            y = f(Variable(x))
+        mode = 'forward' if x.size <= y.size else 'reverse'
+
+    if mode == 'forward':
+        seeds = np.eye(x.size, dtype=x.dtype).reshape((x.size,) + x.shape)
+        y, ty = jvp(f, x, seeds, batched=True) # ty: (N,) + y.shape
+        J = np.moveaxis(ty.reshape(x.size, -1), 0, 1)
+    elif mode == 'reverse':
+        with no_grad():
+            y = f(Variable(x)).data
+        seeds = np.eye(y.size, dtype=y.dtype).reshape((y.size,) + y.shape)
+        y, gx = vjp(f, x, seeds, batched=True) # gx: (M,) + x.shape
+        J = gx.reshape(y.size, -1)
+    else:
+        raise ValueError('unknown mode: {}'.format(mode))
+    return J.reshape(y.shape + x.shape)
+
+
+# =============================================================================
+# 고계 미분
+# =============================================================================
+def hvp(f, x, v):
+    """헤세 행렬 H와 벡터 v의 곱 Hv를 구합니다.
+
+    f의 기울기 g를 계산 그래프로 만든 뒤(create_graph=True), g와 v의 내적을 한 번 더 역전파합니다.
+    역전파 두 번으로 끝나므로 N x N 헤세 행렬을 만들지 않습니다.
+    f의 출력이 스칼라가 아니면 출력의 합을 미분합니다.
+    """
+    x = Variable(x.data if isinstance(x, Variable) else as_array(x)) # 호출자의 grad를 건드리지 않도록 새 변수로 계산합니다.
+    v = v.data if isinstance(v, Variable) else as_array(v)
+
+    y = f(x)
+    y.backward(create_graph=True)
+    gx = x.grad
+    if gx is None:
+        return np.zeros_like(x.data)
+    x.cleargrad()
+
+    z = gx * v # 역전파의 시작값이 1이므로 z의 역전파는 sum(g * v)의 미분, 곧 Hv가 됩니다.
+    z.backward()
+    if x.grad is None: # 기울기가 x에 의존하지 않으면(1차 함수) 헤세 행렬은 0입니다.
+        return np.zeros_like(x.data)
+    return x.grad
@@ -0,0 +1,373 @@
+import numpy as np
+from dezero import utils
+from dezero import backend
+from dezero.core import Function, Variable, Constant, as_variable, _expand_batch
+
+
+class Square(Function):
+    __slots__ = ()
+    retain_inputs = (0,)
+    retain_outputs = ()
+
+    def forward(self, x):
+        xp = backend.get_array_module(x)
+        y = xp.square(x)
+        return y
+
+    def backward(self, gy):
+        x, = self.retained_inputs()
+        gx = 2 * x * gy
+        return gx
+
+    def jvp(self, xs, ys, tx):
+        x, = xs
+        return 2 * x * tx
+
+
+def square(x):
+    return Square()(x)
+
+
+class Exp(Function):
+    __slots__ = ()
+    retain_inputs = ()
+    retain_outputs = (0,)
+
+    def forward(self, x):
+        xp = backend.get_array_module(x)
+        y = xp.exp(x)
+        return y
+
+    def backward(self, gy):
+        y, = self.retained_outputs() # 순전파의 출력 exp(x)를 그대로 사용합니다.
+        gx = gy * y
+        return gx
+
+    def jvp(self, xs, ys, tx):
+        y, = ys
+        return y * tx
+
+
+def exp(x):
+    return Exp()(x)
+
+
+class Log(Function):
+    __slots__ = ()
+    retain_inputs = (0,)
+    retain_outputs = ()
+
+    def forward(self, x):
+        xp = backend.get_array_module(x)
+        y = xp.log(x)
+        return y
+
+    def backward(self, gy):
+        x, = self.retained_inputs()
+        gx = gy / x
+        return gx
+
+    def jvp(self, xs, ys, tx):
+        x, = xs
+        return tx / x
+
+
+def log(x):
+    return Log()(x)
+
+
+# =============================================================================
+# Tensor operations: reshape / transpose / get_item
+# =============================================================================
+# 아래 함수들의 순전파/역전파는 가능한 한 NumPy 뷰(view)를 돌려주므로 데이터를 복사하지 않습니다.
+# ndarray 기울기 gy의 앞쪽에는 배치 축(nb = gy.ndim - 출력의 ndim)이 붙어 있을 수 있습니다.
+class Reshape(Function):
+    __slots__ = ('shape', 'x_shape')
+    retain_inputs = ()
+    retain_outputs = ()
+
+    def __init__(self, shape):
+        self.shape = shape
+
+    def forward(self, x):
+        self.x_shape = x.shape
+        y = x.reshape(self.shape)
+        return y
+
+    def backward(self, gy):
+        if isinstance(gy, Variable):
+            return reshape(gy, self.x_shape)
+        nb = gy.ndim - len(self.shape)
+        return gy.reshape(gy.shape[:nb] + self.x_shape)
+
+    def jvp(self, xs, ys, tx):
+        y, = ys
+        nb = tx.ndim - len(self.x_shape)
+        return tx.reshape(tx.shape[:nb] + y.shape)
+
+
+def reshape(x, *shape):
+    if len(shape) == 1 and isinstance(shape[0], (tuple, list)):
+        shape = shape[0]
+    shape = tuple(shape) # reshape(x, 12), reshape(x, 3, 4), reshape(x, [3, 4])를 모두 받습니다.
+    if x.shape == shape:
+        return as_variable(x)
+    return Reshape(shape)(x)
+
+
+class Transpose(Function):
+    __slots__ = ('axes',)
+    retain_inputs = ()
+    retain_outputs = ()
+
+    def __init__(self, axes=None):
+        self.axes = axes
+
+    def forward(self, x):
+        if self.axes is None:
+            self.axes = tuple(range(x.ndim))[::-1]
+        self.axes = tuple(a % x.ndim for a in self.axes)
+        y = x.transpose(self.axes)
+        return y
+
+    def backward(self, gy):
+        inv_axes = tuple(np.argsort(self.axes))
+        if isinstance(gy, Variable):
+            return transpose(gy, inv_axes)
+        nb = gy.ndim - len(self.axes)
+        return gy.transpose(tuple(range(nb)) + tuple(nb + a for a in inv_axes))
+
+    def jvp(self, xs, ys, tx):
+        nb = tx.ndim - len(self.axes)
+        return tx.transpose(tuple(range(nb)) + tuple(nb + a for a in self.axes))
+
+
+def transpose(x, axes=None):
+    return Transpose(axes)(x)
+
+
+class GetItem(Function):
+    __slots__ = ('slices', 'x_shape', 'y_ndim')
+    retain_inputs = ()
+    retain_outputs = ()
+
+    def __init__(self, slices):
+        self.slices = slices
+
+    def forward(self, x):
+        self.x_shape = x.shape
+        y = x[self.slices] # 기본 슬라이싱이면 뷰를 돌려줍니다.
+        self.y_ndim = np.ndim(y)
+        return y
+
+    def backward(self, gy):
+        if isinstance(gy, Variable):
+            return GetItemGrad(self.slices, self.x_shape, self.y_ndim)(gy)
+        return _get_item_grad(gy, self.slices, self.x_shape, self.y_ndim)
+
+    def jvp(self, xs, ys, tx):
+        nb = tx.ndim - len(self.x_shape)
+        return tx[_batch_slices(self.slices, nb)]
+
+
+class GetItemGrad(Function):
+    __slots__ = ('slices', 'in_shape', 'y_ndim')
+    retain_inputs = ()
+    retain_outputs = ()
+
+    def __init__(self, slices, in_shape, y_ndim):
+        self.slices = slices
+        self.in_shape = in_shape
+        self.y_ndim = y_ndim
+
+    def forward(self, gy):
+        return _get_item_grad(gy, self.slices, self.in_shape, self.y_ndim)
+
+    def backward(self, ggx):
+        return get_item(ggx, self.slices)
+
+
+def _batch_slices(slices, nb):
+    if not isinstance(slices, tuple):
+        slices = (slices,)
+    return (slice(None),) * nb + slices
+
+
+def _get_item_grad(gy, slices, in_shape, y_ndim):
+    xp = backend.get_array_module(gy)
+    nb = gy.ndim - y_ndim
+    gx = xp.zeros(gy.shape[:nb] + in_shape, dtype=gy.dtype)
+    backend.scatter_add(gx, _batch_slices(slices, nb), gy) # 같은 원소를 여러 번 꺼낸 경우에도 기울기를 더합니다.
+    return gx
+
+
+def get_item(x, slices):
+    return GetItem(slices)(x)
+
+
+# =============================================================================
+# sum / matmul
+# =============================================================================
+class Sum(Function):
+    __slots__ = ('axis', 'keepdims', 'x_shape')
+    retain_inputs = ()
+    retain_outputs = ()
+
+    def __init__(self, axis, keepdims):
+        self.axis = axis
+        self.keepdims = keepdims
+
+    def forward(self, x):
+        self.x_shape = x.shape
+        if self.axis is None:
+            self.axis = tuple(range(x.ndim))
+        elif not isinstance(self.axis, tuple):
+            self.axis = (self.axis,)
+        self.axis = tuple(sorted(a % x.ndim for a in self.axis))
+        y = x.sum(axis=self.axis, keepdims=self.keepdims)
+        return y
+
+    def _kept_shape(self):
+        return tuple(1 if i in self.axis else s for i, s in enumerate(self.x_shape))
+
+    def backward(self, gy):
+        kept_shape = self._kept_shape()
+        if isinstance(gy, Variable):
+            return broadcast_to(reshape(gy, kept_shape), self.x_shape)
+        nb = gy.ndim - (len(self.x_shape) if self.keepdims else len(self.x_shape) - len(self.axis))
+        gy = gy.reshape(gy.shape[:nb] + kept_shape) # 합친 축을 길이 1로 되돌리는 것은 뷰입니다.
+        xp = backend.get_array_module(gy)
+        return xp.broadcast_to(gy, gy.shape[:nb] + self.x_shape) # 기울기를 복사해 펼치지 않습니다.
+
+    def jvp(self, xs, ys, tx):
+        nb = tx.ndim - len(self.x_shape)
+        return tx.sum(axis=tuple(nb + a for a in self.axis), keepdims=self.keepdims)
+
+
+def sum(x, axis=None, keepdims=False):
+    return Sum(axis, keepdims)(x)
+
+
+class MatMul(Function):
+    __slots__ = ()
+    retain_inputs = (0, 1)
+    retain_outputs = ()
+
+    def forward(self, x, W):
+        if x.ndim == 0 or W.ndim != 2:
+            raise ValueError('matmul expects x with ndim >= 1 and a matrix W, got {} and {}'.format(x.shape, W.shape))
+        xp = backend.get_array_module(x)
+        y = xp.matmul(x, W)
+        return y
+
+    def backward(self, gy):
+        x, W = self.retained_inputs()
+        mm = matmul if isinstance(gy, Variable) else backend.get_array_module(gy).matmul
+        gx = mm(gy, W.T) if not isinstance(self.inputs[0], Constant) else None # W.T는 복사하지 않는 뷰입니다.
+        gW = None
+        if not isinstance(self.inputs[1], Constant):
+            if x.ndim == 1: # 벡터 x: gW는 x와 gy의 외적입니다.
+                gW = x.reshape((x.shape[0], 1)) * gy.reshape(gy.shape[:-1] + (1, gy.shape[-1]))
+            elif x.ndim == 2:
+                gW = mm(x.T, gy)
+            else: # x의 앞쪽 축을 행으로 합쳐 하나의 행렬 곱으로 더합니다. (gy 앞쪽의 배치 축은 유지합니다)
+                nb = gy.ndim - x.ndim
+                gW = mm(x.reshape((-1, x.shape[-1])).T, gy.reshape(gy.shape[:nb] + (-1, gy.shape[-1])))
+        return gx, gW
+
+    def jvp(self, xs, ys, tx, tW):
+        x, W = xs
+        xp = backend.get_array_module(x)
+        tW = _expand_batch(tW, W, ys[0]) # x가 3차원 이상이면 tW의 배치 축 뒤에 x의 앞쪽 축을 맞춰 넣습니다.
+        return xp.matmul(tx, W) + xp.matmul(x, tW)
+
+
+def matmul(x, W):
+    return MatMul()(x, W)
+
+
+# =============================================================================
+# sum_to / broadcast_to
+# =============================================================================
+class SumTo(Function):
+    __slots__ = ('shape', 'x_shape')
+    retain_inputs = ()
+    retain_outputs = ()
+
+    def __init__(self, shape):
+        self.shape = shape
+
+    def forward(self, x):
+        self.x_shape = x.shape
+        y = utils.sum_to(x, self.shape)
+        return y
+
+    def backward(self, gy):
+        gx = broadcast_to_grad(gy, self.x_shape, self.shape)
+        return gx
+
+    def jvp(self, xs, ys, tx):
+        return sum_to_grad(tx, self.shape, len(self.x_shape))
+
+
+def sum_to(x, shape):
+    shape = tuple(shape) if isinstance(shape, (tuple, list)) else (shape,) # sum_to(x, 3)도 받습니다.
+    if x.shape == shape:
+        return as_variable(x)
+    return SumTo(shape)(x)
+
+
+class BroadcastTo(Function):
+    __slots__ = ('shape', 'x_shape')
+    retain_inputs = ()
+    retain_outputs = ()
+
+    def __init__(self, shape):
+        self.shape = shape
+
+    def forward(self, x):
+        self.x_shape = x.shape
+        xp = backend.get_array_module(x)
+        y = xp.broadcast_to(x, self.shape) # 복사하지 않는 읽기 전용 뷰
+        return y
+
+    def backward(self, gy):
+        gx = sum_to_grad(gy, self.x_shape, len(self.shape))
+        return gx
+
+    def jvp(self, xs, ys, tx):
+        return broadcast_to_grad(tx, self.shape, self.x_shape)
+
+
+def broadcast_to(x, shape):
+    shape = tuple(shape) if isinstance(shape, (tuple, list)) else (shape,) # broadcast_to(x, 3)도 받습니다.
+    if x.shape == shape:
+        return as_variable(x)
+    return BroadcastTo(shape)(x)
+
+
+# backward/jvp 안에서 사용하는 도우미 함수입니다.
+# g가 Variable이면(create_graph=True) 위의 함수로 계산 그래프를 만들고, ndarray면 NumPy로 바로 계산합니다.
+# ndarray g는 앞쪽에 배치 축이 붙어 있을 수 있으며(vjp/jvp의 batched=True), 배치 축은 그대로 유지합니다.
+def sum_to_grad(g, shape, ndim):
+    """배치 축을 제외하면 ndim차원인 g를 더해서 shape 모양으로 만듭니다."""
+    if isinstance(g, Variable):
+        return sum_to(g, shape)
+    nb = g.ndim - ndim
+    if g.shape[nb:] == shape:
+        return g
+    if nb == 0:
+        return utils.sum_to(g, shape)
+    padded = g.shape[:nb] + (1,) * (ndim - len(shape)) + shape
+    return utils.sum_to(g, padded).reshape(g.shape[:nb] + shape)
+
+
+def broadcast_to_grad(g, shape, g_shape):
+    """배치 축을 제외하면 g_shape 모양인 g를 shape 모양으로 브로드캐스트합니다. 복사하지 않고 뷰를 돌려줍니다."""
+    if isinstance(g, Variable):
+        return broadcast_to(g, shape)
+    nb = g.ndim - len(g_shape)
+    if nb > 0:
+        g = g.reshape(g.shape[:nb] + (1,) * (len(shape) - len(g_shape)) + g_shape)
+    xp = backend.get_array_module(g)
+    return xp.broadcast_to(g, g.shape[:nb] + shape)
@@ -0,0 +1,155 @@
+import multiprocessing
+from multiprocessing import shared_memory
+from threading import BrokenBarrierError
+import numpy as np
+
+
+# =============================================================================
+# 데이터 병렬 (data parallel)
+# =============================================================================
+def _flat_views(buf, params):
+    """buf 안에 파라미터들을 차례로 배치한 뷰(view)의 리스트를 반환합니다."""
+    views, offset = [], 0
+    for p in params:
+        views.append(buf[offset:offset + p.data.size].reshape(p.data.shape))
+        offset += p.data.size
+    return views
+
+
+def _ring_allreduce(grads, rank, n, bounds, out, barrier):
+    """공유 메모리 위의 grads[r](각 워커의 기울기)를 링(ring) 방식으로 더해 평균을 out에 씁니다.
+
+    기울기를 n개의 조각으로 나누고, s번째 단계에서 워커 r은 왼쪽 워커(r - 1)의 조각 (r - s - 1) % n을 자기 행에 더합니다.
+    같은 단계에서 워커들이 읽고 쓰는 조각이 겹치지 않으므로, 단계 사이에만 barrier로 기다리면 됩니다.
+    n - 1단계가 지나면 워커 r의 행에 조각 (r + 1) % n의 합이 모이고, 이를 n으로 나눠 out에 씁니다.
+    """
+    barrier.wait() # 모든 워커가 자기 행에 기울기를 다 쓸 때까지 기다립니다.
+    for s in range(n - 1):
+        c = (rank - s - 1) % n
+        lo, hi = bounds[c], bounds[c + 1]
+        np.add(grads[rank, lo:hi], grads[rank - 1, lo:hi], out=grads[rank, lo:hi])
+        barrier.wait()
+    c = (rank + 1) % n
+    lo, hi = bounds[c], bounds[c + 1]
+    np.divide(grads[rank, lo:hi], n, out=out[lo:hi])
+    barrier.wait()
+
+
+def _worker(rank, n, conn, loss_fn, params, param_buf, grad_buf, out_buf, barrier):
+    for p, v in zip(params, _flat_views(param_buf, params)):
+        p.data = v # 부모 프로세스가 바꾼 파라미터가 복사 없이 보입니다.
+    bounds = np.linspace(0, grad_buf.shape[1], n + 1).astype(int)
+    row = _flat_views(grad_buf[rank], params)
+
+    while True:
+        batch = conn.recv()
+        if batch is None:
+            break
+        try:
+            for p in params:
+                p.cleargrad()
+            loss = loss_fn(*batch)
+            loss.backward()
+            for p, g in zip(params, row):
+                if p.grad is None:
+                    g[...] = 0
+                else:
+                    g[...] = p.grad
+            _ring_allreduce(grad_buf, rank, n, bounds, out_buf, barrier)
+            conn.send(float(loss.data))
+        except BrokenBarrierError as e:
+            conn.send(e)
+        except Exception as e:
+            barrier.abort() # 다른 워커들이 barrier에서 계속 기다리지 않도록 합니다.
+            conn.send(e)
+    conn.close()
+
+
+class DataParallel:
+    """여러 프로세스로 미니배치를 나눠 순전파/역전파하고 기울기의 평균을 구합니다.
+
+    runner = DataParallel(loss_fn, params, workers=4)
+    loss = runner.step(x, t) # x, t를 맨 앞의 축으로 workers개로 나눠 loss_fn(x_i, t_i)를 계산합니다.
+    for p in params:
+        p.data -= lr * p.grad # 제자리(in-place)로 갱신하면 워커들에게 복사 없이 전달됩니다.
+
+    파라미터의 data는 공유 메모리의 뷰로 바뀌며, 워커들도 같은 메모리를 봅니다. (p.data = ...로 새 배열을 넣으면 전달되지 않습니다.)
+    기울기는 공유 메모리 위에서 링 all-reduce로 평균을 구하며, step() 뒤의 p.grad는 그 결과의 뷰입니다. (다음 step()에서 덮어씁니다.)
+    loss_fn은 조각의 평균 손실을 반환해야 하며, 조각의 크기가 같으면 p.grad는 전체 미니배치의 평균 손실의 기울기와 같습니다.
+    워커는 fork로 만드므로 loss_fn에 람다나 지역 함수도 쓸 수 있습니다. 사용이 끝나면 close()를 호출합니다. (with 문도 됩니다.)
+    """
+
+    def __init__(self, loss_fn, params, workers=None):
+        n = workers or multiprocessing.cpu_count()
+        self.params = list(params)
+        self.workers = n
+        dtype = np.result_type(*[p.data for p in self.params])
+        size = sum(p.data.size for p in self.params)
+        itemsize = np.dtype(dtype).itemsize
+
+        self._shms = [shared_memory.SharedMemory(create=True, size=max(k * size * itemsize, 1)) for k in (1, n, 1)]
+        param_buf = np.ndarray((size,), dtype, buffer=self._shms[0].buf)
+        grad_buf = np.ndarray((n, size), dtype, buffer=self._shms[1].buf)
+        out_buf = np.ndarray((size,), dtype, buffer=self._shms[2].buf)
+        for p, v in zip(self.params, _flat_views(param_buf, self.params)):
+            v[...] = p.data
+            p.data = v
+        self._grads = _flat_views(out_buf, self.params)
+
+        ctx = multiprocessing.get_context('fork')
+        barrier = ctx.Barrier(n)
+        self._conns, self._procs = [], []
+        for rank in range(n):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, daemon=True,
+                               args=(rank, n, child, loss_fn, self.params, param_buf, grad_buf, out_buf, barrier))
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    def step(self, *batch):
+        """batch를 워커들에게 나눠 주고 역전파한 뒤, 평균 기울기를 각 파라미터의 grad에 두고 평균 손실을 반환합니다."""
+        if self._procs is None:
+            raise RuntimeError('DataParallel is closed')
+        n = self.workers
+        if len(batch[0]) < n:
+            raise ValueError('batch size {} is smaller than the number of workers {}'.format(len(batch[0]), n))
+        shards = [np.array_split(np.asarray(a), n) for a in batch]
+        for rank, conn in enumerate(self._conns):
+            conn.send(tuple(s[rank] for s in shards))
+
+        results = [conn.recv() for conn in self._conns]
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            errors.sort(key=lambda e: isinstance(e, BrokenBarrierError)) # 원인이 된 오류를 먼저 보여줍니다.
+            self.close()
+            raise errors[0]
+        for p, g in zip(self.params, self._grads):
+            p.grad = g
+        return sum(results) / n
+
+    def close(self):
+        """워커를 끝내고 공유 메모리를 해제합니다. 파라미터의 data는 보통의 배열로 되돌립니다."""
+        if self._procs is None:
+            return
+        for conn, proc in zip(self._conns, self._procs):
+            if proc.is_alive():
+                conn.send(None)
+            proc.join()
+            conn.close()
+        for p in self.params:
+            p.data = p.data.copy()
+            if p.grad is not None:
+                p.grad = p.grad.copy()
+        self._grads = None
+        self._procs = None
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+import time
+from dezero.core import Config, Variable
+
+
+# =============================================================================
+# 훅 (hook)
+# =============================================================================
+class FunctionHook:
+    """Function의 forward/backward 앞뒤에 호출되는 훅입니다.
+
+    with hook: 안에서 호출한 Function.__call__, Variable.backward, Tape의 재생에서 호출됩니다.
+    xs, ys는 forward의 입력/출력, gys, gxs는 backward의 입력/출력이며, ys와 gxs는 tuple이 아닐 수도 있습니다.
+    forward/backward가 예외를 일으키면 postprocess는 ys, gxs를 None으로 하여 호출됩니다.
+    훅이 없으면 Config.function_hooks가 빈 tuple이므로, 함수마다 그 값을 확인하는 비용만 듭니다.
+    """
+
+    def forward_preprocess(self, function, xs):
+        pass
+
+    def forward_postprocess(self, function, xs, ys):
+        pass
+
+    def backward_preprocess(self, function, gys):
+        pass
+
+    def backward_postprocess(self, function, gys, gxs):
+        pass
+
+    def __enter__(self):
+        self._old_hooks = Config.function_hooks
+        Config.function_hooks = self._old_hooks + (self,)
+        return self
+
+    def __exit__(self, *args):
+        Config.function_hooks = self._old_hooks
+
+
+def _nbytes(outputs, inputs):
+    """outputs 중 inputs를 그대로 전달한 것(Add의 backward 등)을 빼고, 서로 다른 배열의 바이트 수를 더합니다."""
+    if not isinstance(outputs, (tuple, list)):
+        outputs = (outputs,)
+    seen = {id(v.data if isinstance(v, Variable) else v) for v in inputs}
+    total = 0
+    for v in outputs:
+        if isinstance(v, Variable): # create_graph=True이면 기울기가 Variable입니다.
+            v = v.data
+        if id(v) not in seen:
+            seen.add(id(v))
+            total += getattr(v, 'nbytes', 0)
+    return total
+
+
+# =============================================================================
+# 프로파일러
+# =============================================================================
+class Profiler(FunctionHook):
+    """함수의 종류별로 forward/backward의 호출 수, 시간, 출력 배열의 바이트 수를 모읍니다.
+
+    with Profiler() as prof:
+        loss = model(x)
+        loss.backward()
+    print(prof.report())
+    prof.export_chrome_trace('trace.json') # chrome://tracing 또는 Perfetto에서 엽니다.
+
+    시간은 안에서 호출된 다른 Function의 시간을 뺀 값입니다. (Checkpoint 등) 트레이스에는 포함한 구간으로 기록합니다.
+    바이트 수는 forward의 출력과 backward의 출력(입력의 기울기) 중 입력을 그대로 전달하지 않은 배열의 크기로,
+    그 함수가 새로 만든 배열의 양입니다.
+    Variable.backward(workers=...)의 스레드에서 호출되어도 됩니다.
+    """
+
+    def __init__(self, trace=True):
+        self.records = {} # (함수 이름, 'forward' 또는 'backward') -> [호출 수, 시간(초), 바이트 수]
+        self.events = [] if trace else None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def _push(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append([time.perf_counter(), 0.0]) # [시작 시각, 안에서 호출된 함수의 시간]
+
+    def _pop(self, function, phase, inputs, outputs):
+        end = time.perf_counter()
+        stack = self._local.stack
+        start, inner = stack.pop()
+        elapsed = end - start
+        if stack:
+            stack[-1][1] += elapsed
+        if outputs is None: # 예외로 끝난 호출은 기록하지 않습니다.
+            return
+        name = type(function).__name__
+        nbytes = _nbytes(outputs, inputs)
+        with self._lock:
+            record = self.records.get((name, phase))
+            if record is None:
+                record = self.records[(name, phase)] = [0, 0.0, 0]
+            record[0] += 1
+            record[1] += elapsed - inner
+            record[2] += nbytes
+            if self.events is not None:
+                self.events.append({'name': name, 'cat': phase, 'ph': 'X',
+                                    'ts': (start - self._origin) * 1e6, 'dur': elapsed * 1e6,
+                                    'pid': os.getpid(), 'tid': threading.get_ident(), 'args': {'bytes': nbytes}})
+
+    def forward_preprocess(self, function, xs):
+        self._push()
+
+    def forward_postprocess(self, function, xs, ys):
+        self._pop(function, 'forward', xs, ys)
+
+    def backward_preprocess(self, function, gys):
+        self._push()
+
+    def backward_postprocess(self, function, gys, gxs):
+        self._pop(function, 'backward', gys, gxs)
+
+    def report(self, sort_by='time'):
+        """모은 결과를 표(문자열)로 반환합니다. sort_by는 'time', 'calls', 'bytes' 중 하나입니다."""
+        key = {'calls': 0, 'time': 1, 'bytes': 2}[sort_by]
+        rows = sorted(self.records.items(), key=lambda item: item[1][key], reverse=True)
+        lines = ['{:20s} {:8s} {:>8s} {:>10s} {:>10s} {:>10s}'.format(
+            'function', 'phase', 'calls', 'total ms', 'mean us', 'MB')]
+        for (name, phase), (calls, seconds, nbytes) in rows:
+            lines.append('{:20s} {:8s} {:8d} {:10.3f} {:10.1f} {:10.2f}'.format(
+                name, phase, calls, seconds * 1e3, seconds / calls * 1e6, nbytes / 2 ** 20))
+        return '\n'.join(lines)
+
+    def export_chrome_trace(self, path):
+        """모은 구간들을 Chrome trace 형식의 JSON 파일로 저장합니다."""
+        if self.events is None:
+            raise RuntimeError('Profiler was created with trace=False')
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
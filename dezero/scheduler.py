@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dezero import backend
+from dezero.core import Config, Constant, using_config, _finish_outputs, _master_grad, _accumulate_grad, _hooked_backward
+
+
+# =============================================================================
+# 멀티스레드 역전파
+# =============================================================================
+def _run_backward(f, hooks):
+    gys = [y().grad for y in f.outputs]
+    gxs = f.backward(*gys) if not hooks else _hooked_backward(hooks, f, gys)
+    return gxs if isinstance(gxs, tuple) else (gxs,)
+
+
+def parallel_backward(y, workers=4, retain_grad=False):
+    """y.backward()와 같은 결과를 workers개의 스레드로 구합니다.
+
+    각 함수가 기다려야 할 기울기의 수(의존 수)를 미리 세어 두고, 0이 된 함수들의 backward를 스레드 풀에서 동시에 계산합니다.
+    NumPy의 계산은 GIL을 놓으므로 서로 독립된 가지(branch)가 많은 그래프에서 빨라집니다.
+    기울기의 덧셈은 메인 스레드가 하며, 한 변수로 모이는 기울기를 모두 받은 뒤 (함수의 순서, 입력의 위치) 순으로 더하므로
+    스레드 수나 실행 순서와 관계없이 결과가 비트 단위로 같습니다.
+    Arena/numpy_pool이나 thread_safe가 아닌 함수(Checkpoint 등)는 스레드에 안전하지 않으므로, 사용 중이면 y.backward()로 계산합니다.
+    """
+    if Config.array_arena is not None or Config.use_array_pool or y.creator is None:
+        return y.backward(retain_grad=retain_grad)
+
+    # 그래프를 한 번 따라가며 함수의 순서(rank)와 의존 수를 셉니다.
+    rank = {y.creator: 0}
+    pending = {} # 함수 -> 기울기가 아직 다 모이지 않은 출력 변수의 수
+    n_grads = {} # 변수 -> 받아야 할 기울기의 수
+    stack = [y.creator]
+    while stack:
+        f = stack.pop()
+        if not f.thread_safe:
+            return y.backward(retain_grad=retain_grad)
+        for x in f.inputs:
+            if isinstance(x, Constant):
+                continue
+            n_grads[x] = n_grads.get(x, 0) + 1
+            g = x.creator
+            if g is not None and n_grads[x] == 1: # 같은 변수가 여러 번 쓰여도 g는 그 변수의 기울기를 한 번 기다립니다.
+                pending[g] = pending.get(g, 0) + 1
+                if g not in rank:
+                    rank[g] = len(rank)
+                    stack.append(g)
+
+    scaler = Config.loss_scaler
+    y._seed(scaler, False)
+    if scaler is not None:
+        scaler.found_inf = False
+    grads = {} # 변수 -> [((함수의 rank, 입력의 위치), 기울기)]
+    hooks = Config.function_hooks
+    with using_config('enable_backprop', False), ThreadPoolExecutor(workers) as pool:
+        running = {pool.submit(_run_backward, y.creator, hooks): y.creator}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                f = running.pop(future)
+                gxs = future.result()
+                for i, (x, gx) in enumerate(zip(f.inputs, gxs)):
+                    if isinstance(x, Constant):
+                        continue
+                    if x.creator is None:
+                        gx = _master_grad(x, gx, scaler)
+                    received = grads.setdefault(x, [])
+                    received.append(((rank[f], i), gx))
+                    if len(received) < n_grads[x]:
+                        continue
+
+                    # 모든 기울기가 모였으므로 정해진 순서로 더합니다.
+                    del grads[x]
+                    received.sort(key=lambda item: item[0])
+                    owned = set()
+                    for _, gx in received:
+                        x.grad = gx if x.grad is None else _accumulate_grad(x.grad, gx, owned)
+                    if x.creator is None:
+                        if scaler is not None and not scaler.found_inf:
+                            scaler.found_inf = not backend.get_array_module(x.grad).isfinite(x.grad).all()
+                    else:
+                        g = x.creator
+                        pending[g] -= 1
+                        if pending[g] == 0:
+                            running[pool.submit(_run_backward, g, hooks)] = g
+                _finish_outputs(f, retain_grad, None)
+
+    if scaler is not None:
+        scaler.update(scaler.found_inf)
@@ -0,0 +1,98 @@
+import json
+import os
+import struct
+import numpy as np
+from dezero.core import Variable
+
+
+# =============================================================================
+# 메모리 맵 파일 (배열 저장/불러오기)
+# =============================================================================
+# 파일 형식
+#   _MAGIC (8바이트) | 헤더 길이 (8바이트, little endian) | 헤더 (JSON) | 배열 데이터 ...
+# 헤더는 {이름: {'dtype': ..., 'shape': [...], 'offset': ...}}이며, 각 배열의 데이터는 파일의 offset 위치에
+# C 순서로 연속해서 저장됩니다. offset은 _ALIGN의 배수이므로 np.memmap으로 복사 없이 열 수 있습니다.
+_MAGIC = b'DZARRAY1'
+_ALIGN = 64
+
+
+def _align(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _write_header(path, specs):
+    index, offset = {}, 0
+    for name, (shape, dtype) in specs.items():
+        dtype = np.dtype(dtype)
+        index[name] = {'dtype': dtype.str, 'shape': list(shape), 'offset': offset}
+        offset = _align(offset + int(np.prod(shape)) * dtype.itemsize)
+    header = json.dumps(index).encode('utf-8')
+    start = _align(len(_MAGIC) + 8 + len(header))
+    with open(path, 'wb') as f:
+        f.write(_MAGIC + struct.pack('<Q', len(header)) + header)
+        f.truncate(start + offset) # 데이터 부분은 실제로 쓰기 전까지 디스크를 차지하지 않습니다. (sparse file)
+    return index, start
+
+
+def _read_header(path):
+    with open(path, 'rb') as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError('{} is not a dezero array file'.format(path))
+        n, = struct.unpack('<Q', f.read(8))
+        index = json.loads(f.read(n).decode('utf-8'))
+    return index, _align(len(_MAGIC) + 8 + n)
+
+
+def _open(path, index, start, mode):
+    arrays = {}
+    for name, spec in index.items():
+        shape = tuple(spec['shape'])
+        dtype = np.dtype(spec['dtype'])
+        if 0 in shape: # 크기가 0인 배열은 메모리 맵을 만들 수 없습니다.
+            arrays[name] = np.empty(shape, dtype)
+        else:
+            arrays[name] = np.memmap(path, dtype, mode, start + spec['offset'], shape)
+    return arrays
+
+
+def create_arrays(path, specs):
+    """specs({이름: (shape, dtype)})의 배열들을 담을 파일을 만들고, 쓰기 가능한 np.memmap의 딕셔너리를 반환합니다.
+
+    메모리보다 큰 데이터셋도 조금씩 채워 넣을 수 있습니다. 다 쓰면 flush()를 호출합니다.
+    """
+    index, start = _write_header(path, specs)
+    return _open(path, index, start, 'r+')
+
+
+def save_arrays(path, arrays):
+    """arrays({이름: ndarray 또는 Variable})를 path에 저장합니다.
+
+    arrays가 path를 load_arrays로 연 배열일 수도 있으므로, 같은 디렉터리의 임시 파일에 쓴 뒤 path로 바꿉니다.
+    (path를 바로 열어 쓰면 읽기 전에 파일이 잘려 데이터가 0이 됩니다.)
+    """
+    arrays = {name: a.data if isinstance(a, Variable) else np.asarray(a) for name, a in arrays.items()}
+    tmp = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        out = create_arrays(tmp, {name: (a.shape, a.dtype) for name, a in arrays.items()})
+        for name, a in arrays.items():
+            if a.size:
+                out[name][...] = a
+                out[name].flush()
+        del out
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load_arrays(path, mode='c'):
+    """save_arrays/create_arrays로 만든 파일의 배열들을 {이름: np.memmap}으로 반환합니다.
+
+    헤더만 읽고 데이터는 읽지 않으므로 파일의 크기와 관계없이 바로 반환되며, 배열의 원소에 처음 접근할 때
+    그 부분의 페이지만 디스크에서 읽습니다. mode는 np.memmap과 같습니다.
+    'c'(기본값, copy-on-write)는 제자리로 바꿔도(p.data -= lr * p.grad) 파일은 바뀌지 않고, 'r'은 읽기 전용,
+    'r+'는 바꾼 내용을 파일에 씁니다.
+    """
+    index, start = _read_header(path)
+    return _open(path, index, start, mode)
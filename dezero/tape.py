@@ -0,0 +1,322 @@
+import weakref
+from dezero import backend
+from dezero.core import Config, Variable, Constant, Function, Neg, Pow, as_array, using_config, _accumulate_grad, \
+    _hooked_forward, _hooked_backward, _master_grad
+from dezero.functions import Square, Exp
+
+
+# =============================================================================
+# 원소별 함수 융합 (elementwise fusion)
+# =============================================================================
+# 융합할 수 있는 단항 원소별 함수의 커널입니다. out=으로 미리 만든 버퍼에 결과를 씁니다.
+# forward(xp, f, x, out), backward(xp, f, x, y, gy, out, tmp) 형태입니다.
+# backward의 out은 gy와 같은 버퍼일 수 있으므로, gy를 읽기 전에 out에 쓰지 않도록 주의합니다.
+# xp는 배열 모듈(numpy, cupy 등)입니다.
+def _square_forward(xp, f, x, out):
+    return xp.square(x, out=out)
+
+def _square_backward(xp, f, x, y, gy, out, tmp):
+    out = xp.multiply(gy, x, out=out)
+    return xp.multiply(out, 2, out=out)
+
+def _exp_forward(xp, f, x, out):
+    return xp.exp(x, out=out)
+
+def _exp_backward(xp, f, x, y, gy, out, tmp):
+    return xp.multiply(gy, y, out=out) # exp(x)를 다시 계산하지 않고 저장된 출력을 사용합니다.
+
+def _neg_forward(xp, f, x, out):
+    return xp.negative(x, out=out)
+
+def _neg_backward(xp, f, x, y, gy, out, tmp):
+    return xp.negative(gy, out=out)
+
+def _pow_forward(xp, f, x, out):
+    return xp.power(x, f.c, out=out)
+
+def _pow_backward(xp, f, x, y, gy, out, tmp):
+    xp.power(x, f.c - 1, out=tmp)
+    xp.multiply(tmp, f.c, out=tmp)
+    return xp.multiply(gy, tmp, out=out)
+
+elementwise_kernels = {
+    Square: (_square_forward, _square_backward),
+    Exp: (_exp_forward, _exp_backward),
+    Neg: (_neg_forward, _neg_backward),
+    Pow: (_pow_forward, _pow_backward),
+}
+
+
+class FusedElementwise(Function):
+    """연속된 단항 원소별 함수들을 하나로 합친 함수입니다.
+
+    중간 결과는 기록할 때 만든 버퍼에 덮어쓰므로, 재생할 때마다 새 배열을 만들지 않습니다.
+    체인의 최종 출력과 입력 쪽 기울기는 다음 재생에서 덮어쓰이지 않도록 새 배열에 씁니다.
+    """
+    __slots__ = ('funcs', 'buffers', 'gbuf', 'tmp')
+    retain_inputs = (0,)
+    retain_outputs = (0,)
+
+    def __init__(self, funcs, x, y, intermediates):
+        self.funcs = funcs
+        xp = backend.get_array_module(y.data)
+        self.buffers = [xp.empty_like(v.data) for v in intermediates]
+        self.gbuf = xp.empty_like(y.data)
+        self.tmp = xp.empty_like(y.data)
+        self.generation = funcs[-1].generation
+        self.inputs = [x]
+        self.outputs = [weakref.ref(y)]
+
+    def forward(self, x):
+        xp = backend.get_array_module(x)
+        last = len(self.funcs) - 1
+        for i, f in enumerate(self.funcs):
+            out = self.buffers[i] if i < last else xp.empty_like(self.tmp)
+            x = elementwise_kernels[type(f)][0](xp, f, x, out)
+        return x
+
+    def backward(self, gy):
+        values = [self.inputs[0].data] + self.buffers + [self.outputs[0]().data]
+        xp = backend.get_array_module(gy)
+        g = gy
+        for i in range(len(self.funcs) - 1, -1, -1):
+            f = self.funcs[i]
+            out = self.gbuf if i > 0 else xp.empty_like(self.gbuf)
+            g = elementwise_kernels[type(f)][1](xp, f, values[i], values[i + 1], g, out, self.tmp)
+        return g
+
+
+def fuse_elementwise(entries, output):
+    """(함수, 입력, 출력) 기록에서 중간 결과가 다음 함수에서만 쓰이는 원소별 함수 체인을 찾아 합칩니다."""
+    uses = {id(output): 1}
+    for f, xs, ys in entries:
+        for x in xs:
+            uses[id(x)] = uses.get(id(x), 0) + 1
+
+    chains = []
+    tail = {} # 체인의 마지막 출력 변수 -> 체인
+    for idx, (f, xs, ys) in enumerate(entries):
+        if type(f) not in elementwise_kernels:
+            continue
+        x = xs[0]
+        chain = tail.pop(id(x), None) if uses.get(id(x)) == 1 else None
+        if chain is None:
+            chain = []
+            chains.append(chain)
+        chain.append(idx)
+        tail[id(ys[0])] = chain
+
+    fused = {}
+    skip = set()
+    for chain in chains:
+        if len(chain) < 2:
+            continue
+        funcs = [entries[i][0] for i in chain]
+        x = entries[chain[0]][1][0]
+        y = entries[chain[-1]][2][0]
+        intermediates = [entries[i][2][0] for i in chain[:-1]]
+        fused[chain[-1]] = FusedElementwise(funcs, x, y, intermediates)
+        skip.update(chain[:-1])
+        for v in intermediates:
+            v.data = None # 기록할 때 만든 중간 결과는 더 이상 쓰이지 않습니다.
+
+    new_entries = []
+    for idx, entry in enumerate(entries):
+        if idx in skip:
+            continue
+        if idx in fused:
+            f = fused[idx]
+            new_entries.append((f, f.inputs, [f.outputs[0]()]))
+        else:
+            new_entries.append(entry)
+    return new_entries
+
+
+# =============================================================================
+# Tape (계산 그래프 캡처 & 재생)
+# =============================================================================
+class Tape:
+    """fn의 순전파/역전파를 한 번 기록해 두고, 이후에는 기록을 재생합니다.
+
+    매 반복 같은 모양의 그래프를 만드는 학습 루프에서, 재생은 Variable/Function을
+    새로 만들지 않고 기록된 함수들의 forward/backward만 순서대로 호출합니다.
+    그래프의 모양(함수 종류와 입력의 shape)은 기록할 때와 같아야 합니다.
+    fuse=True이면 연속된 원소별 함수를 FusedElementwise로 합칩니다.
+    """
+
+    def __init__(self, fn, *inputs, fuse=False):
+        inputs = tuple(x if isinstance(x, Variable) else Variable(as_array(x)) for x in inputs)
+        for x in inputs:
+            if x.creator is not None:
+                raise ValueError('tape inputs must be leaf variables')
+        self.inputs = inputs
+        with using_config('enable_backprop', True):
+            self.output = fn(*inputs)
+        if not isinstance(self.output, Variable):
+            raise TypeError('fn must return a single Variable')
+        self.shapes = [x.shape for x in inputs]
+
+        funcs = []
+        seen_set = set()
+        stack = [self.output.creator] if self.output.creator is not None else []
+        while stack:
+            f = stack.pop()
+            if f in seen_set:
+                continue
+            seen_set.add(f)
+            funcs.append(f)
+            stack.extend(x.creator for x in f.inputs if x.creator is not None)
+        funcs.sort(key=lambda f: f.generation) # 세대 순으로 정렬하면 순전파 순서가 됩니다.
+
+        self.variables = [] # 재생 중 중간 변수가 사라지지 않도록 강한 참조로 가집니다.
+        index = {}
+
+        def slot(v):
+            if id(v) not in index:
+                index[id(v)] = len(self.variables)
+                self.variables.append(v)
+            return index[id(v)]
+
+        for x in inputs:
+            slot(x)
+
+        entries = []
+        for f in funcs:
+            outputs = []
+            for i, ref in enumerate(f.outputs):
+                y = ref()
+                if y is None: # 사용되지 않아 이미 사라진 출력은 자리만 만들어 둡니다.
+                    y = Variable(None)
+                    y.set_creator(f)
+                    f.outputs[i] = weakref.ref(y)
+                outputs.append(y)
+            entries.append((f, f.inputs, outputs))
+
+        # 그래프에서 data 없이 쓰인 중간 변수(core._graph_node)가 있으므로, 한 번 재생해 모든 중간 결과를 채웁니다.
+        self.forward_tape = entries
+        self.free = [()] * len(entries)
+        self.forward(*[x.data for x in inputs])
+        if fuse:
+            entries = fuse_elementwise(entries, self.output)
+
+        self.forward_tape = entries
+        for f, xs, ys in entries:
+            for v in xs:
+                slot(v)
+            for v in ys:
+                slot(v)
+
+        # Function.__call__과 같이, 역전파에 필요 없는(retain_inputs/retain_outputs로 선언하지 않은) 중간 결과는
+        # 순전파에서 마지막으로 쓰인 뒤 버립니다. self.free[k]는 k번째 함수 다음에 data를 버릴 변수들입니다.
+        keep = {id(self.output)}
+        for f, xs, ys in entries:
+            keep.update(id(x) for i, x in enumerate(xs) if f.retain_inputs is None or i in f.retain_inputs)
+            keep.update(id(y) for i, y in enumerate(ys) if f.retain_outputs is None or i in f.retain_outputs)
+        last = {}
+        for k, (f, xs, ys) in enumerate(entries):
+            for v in list(xs) + ys:
+                if v.creator is not None and id(v) not in keep:
+                    last[id(v)] = (k, v)
+        self.free = [[] for _ in entries]
+        for k, v in last.values():
+            self.free[k].append(v)
+            v.data = None
+
+        # 역전파 기록: 각 입력의 기울기를 처음 받는 곳은 대입, 이후는 덧셈으로 미리 정해 둡니다.
+        self.backward_tape = []
+        seen = set()
+        for f, xs, ys in reversed(self.forward_tape):
+            gx_ops = []
+            for x in xs:
+                if isinstance(x, Constant):
+                    gx_ops.append(None)
+                    continue
+                i = index[id(x)]
+                gx_ops.append((i, i in seen))
+                seen.add(i)
+            self.backward_tape.append((f, [index[id(y)] for y in ys], gx_ops))
+
+        self.leaves = [(index[id(v)], v) for v in self.variables
+                       if v.creator is None and not isinstance(v, Constant) and index[id(v)] in seen]
+        self.output_index = index[id(self.output)]
+        self.seed = backend.get_array_module(self.output.data).ones_like(self.output.data)
+        self.seed.flags.writeable = False # 기울기로 그대로 전달될 수 있으므로 외부에서 바꾸지 못하게 합니다.
+        self.grads = [None] * len(self.variables)
+
+    def forward(self, *xs):
+        for x, data, shape in zip(self.inputs, xs, self.shapes):
+            data = as_array(data)
+            if data.shape != shape:
+                raise ValueError('input shape {} does not match traced shape {}'.format(data.shape, shape))
+            x.data = data
+
+        arena = Config.array_arena
+        hooks = Config.function_hooks
+        dtype = Config.compute_dtype
+        output = self.output
+        for (f, xs, ys), free in zip(self.forward_tape, self.free):
+            in_data = [x.data for x in xs]
+            if dtype is not None: # Function.__call__과 같이 실수형 입력을 compute_dtype으로 바꿉니다. (autocast)
+                in_data = [x.astype(dtype) if x.dtype.kind == 'f' and x.dtype != dtype else x for x in in_data]
+            for y in ys: # 이전 재생의 결과는 새 출력을 만들기 전에 버립니다. (Arena면 이 함수의 출력에 다시 사용합니다)
+                if y is not output: # 반환한 출력은 아직 사용 중일 수 있으므로 새 출력을 만든 뒤에 돌려놓습니다.
+                    old, y.data = y.data, None
+                    if arena is not None:
+                        arena.release(old)
+                    old = None # 지역 변수가 참조하고 있으면 Arena가 사용 중으로 봅니다.
+            outs = f.forward(*in_data) if not hooks else _hooked_forward(hooks, f, in_data)
+            in_data = None
+            if not isinstance(outs, tuple):
+                outs = (outs,)
+            for y, out in zip(ys, outs):
+                old, y.data = y.data, as_array(out)
+                if arena is not None:
+                    arena.release(old)
+                old = None
+            outs = None
+            for v in free:
+                old, v.data = v.data, None
+                if arena is not None:
+                    arena.release(old)
+                old = None
+        return self.output.data
+
+    def backward(self):
+        grads = self.grads
+        grads[self.output_index] = self.seed
+        arena = Config.array_arena
+        hooks = Config.function_hooks
+        owned = set() # Variable.backward와 같이, 더하며 새로 만든 기울기 배열은 제자리에서 더합니다.
+
+        with using_config('enable_backprop', False):
+            for f, y_idx, gx_ops in self.backward_tape:
+                gys = [grads[i] for i in y_idx]
+                for gy in gys:
+                    owned.discard(id(gy))
+                gxs = f.backward(*gys) if not hooks else _hooked_backward(hooks, f, gys)
+                if not isinstance(gxs, tuple):
+                    gxs = (gxs,)
+                for op, gx in zip(gx_ops, gxs):
+                    if op is None:
+                        continue
+                    i, accumulate = op
+                    grads[i] = _accumulate_grad(grads[i], gx, owned) if accumulate else gx
+                for i in y_idx:
+                    if arena is not None:
+                        arena.release(grads[i])
+                    grads[i] = None
+
+        for i, v in self.leaves:
+            old, v.grad = v.grad, _master_grad(v, grads[i], None) # 파라미터와 같은 dtype의 기울기
+            if arena is not None:
+                arena.release(old)
+            grads[i] = None
+
+    def __call__(self, *xs):
+        y = self.forward(*xs)
+        self.backward()
+        return y
+
+
+def trace(fn, *inputs, fuse=False):
+    return Tape(fn, *inputs, fuse=fuse)
@@ -0,0 +1,237 @@
+import os
+import heapq
+import subprocess
+import numpy as np
+from dezero.core import Variable, no_grad, using_config
+
+
+# =============================================================================
+# Visualize for computational graph
+# =============================================================================
+def _format_bytes(n):
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024:
+            return '{:.0f} {}'.format(n, unit) if unit == 'B' else '{:.1f} {}'.format(n, unit)
+        n /= 1024
+    return '{:.1f} GB'.format(n)
+
+
+def _dot_var(v, verbose=False, largest=False):
+    name = '' if v.name is None else v.name
+    if v.data is None: # 그래프가 data를 붙잡지 않는 변수 (step30의 retain_inputs/retain_outputs)
+        if verbose:
+            name += ': not retained' if v.name is not None else 'not retained'
+        return '{} [label="{}", color=orange, style=dashed]\n'.format(id(v), name)
+    if verbose:
+        if v.name is not None:
+            name += ': '
+        name += '{} {} {}'.format(v.shape, v.dtype, _format_bytes(v.data.nbytes))
+    color = 'red' if largest else 'orange'
+    return '{} [label="{}", color={}, style=filled]\n'.format(id(v), name, color)
+
+
+def _dot_func(f, path_edges=()):
+    dot_func = '{} [label="{}", color=lightblue, style=filled, shape=box]\n'
+    txt = dot_func.format(id(f), f.__class__.__name__)
+
+    dot_edge = '{} -> {}\n'
+    dot_path_edge = '{} -> {} [color=blue, penwidth=2]\n'
+    for x in f.inputs:
+        edge = (id(x), id(f))
+        txt += (dot_path_edge if edge in path_edges else dot_edge).format(*edge)
+    for i, y in enumerate(f.outputs):
+        y = y()
+        if y is None: # 사용되지 않아 이미 사라진 출력
+            txt += '{}_{} [label="freed", color=gray, style=dashed]\n'.format(id(f), i)
+            txt += dot_edge.format(id(f), '{}_{}'.format(id(f), i))
+            continue
+        edge = (id(f), id(y))
+        txt += (dot_path_edge if edge in path_edges else dot_edge).format(*edge)
+    return txt
+
+
+def get_dot_graph(output, verbose=True, top=5):
+    """output까지의 계산 그래프를 DOT 언어의 문자열로 반환합니다.
+
+    verbose=True이면 변수에 shape, dtype, 바이트 수를 적습니다. 그래프가 data를 붙잡고 있는 변수 중
+    가장 큰 top개는 빨간색으로, 가장 긴 경로(함수가 가장 많이 이어진 경로)는 파란 굵은 선으로 표시합니다.
+    재귀 없이 각 함수와 변수를 한 번씩만 방문하므로 노드가 매우 많은 그래프도 내보낼 수 있습니다.
+    """
+    if isinstance(output.node, Variable): # output이 다른 함수의 입력으로 쓰여 그래프에서 다른 변수가 대신하는 경우
+        output = output.node
+    funcs = []
+    seen_set = set()
+    stack = [output.creator] if output.creator is not None else []
+    while stack:
+        f = stack.pop()
+        if f in seen_set:
+            continue
+        seen_set.add(f)
+        funcs.append(f)
+        stack.extend(x.creator for x in f.inputs if x.creator is not None)
+
+    variables = {id(output): output}
+    for f in funcs:
+        for x in f.inputs:
+            variables[id(x)] = x
+        for y in f.outputs:
+            y = y()
+            if y is not None:
+                variables[id(y)] = y
+    retained = [v for v in variables.values() if v.data is not None]
+    largest = {id(v) for v in heapq.nlargest(top, retained, key=lambda v: v.data.nbytes)}
+
+    # 가장 긴 경로: 입력의 creator는 세대가 더 작으므로 세대 순으로 한 번씩 계산합니다.
+    funcs.sort(key=lambda f: f.generation)
+    longest = {} # 함수 -> (그 함수에서 끝나는 가장 긴 경로의 함수 수, 경로의 바로 앞 입력 변수)
+    for f in funcs:
+        best = (1, f.inputs[0])
+        for x in f.inputs:
+            if x.creator is not None and longest[x.creator][0] + 1 > best[0]:
+                best = (longest[x.creator][0] + 1, x)
+        longest[f] = best
+    path_edges = set()
+    f = output.creator
+    if f is not None:
+        path_edges.add((id(f), id(output)))
+    while f is not None:
+        x = longest[f][1]
+        path_edges.add((id(x), id(f)))
+        f = x.creator
+        if f is not None:
+            path_edges.add((id(f), id(x)))
+
+    txt = []
+    for v in variables.values():
+        txt.append(_dot_var(v, verbose, id(v) in largest))
+    for f in funcs:
+        txt.append(_dot_func(f, path_edges))
+    label = 'retained: {} in {} tensors, longest path: {} functions'.format(
+        _format_bytes(sum(v.data.nbytes for v in retained)), len(retained),
+        longest[output.creator][0] if output.creator is not None else 0)
+    return 'digraph g {\nlabel="' + label + '"\n' + ''.join(txt) + '}'
+
+
+def plot_dot_graph(output, verbose=True, to_file='graph.png'):
+    """get_dot_graph의 결과를 Graphviz의 dot 명령으로 이미지 파일로 저장합니다."""
+    dot_graph = get_dot_graph(output, verbose)
+
+    tmp_dir = os.path.join(os.path.expanduser('~'), '.dezero')
+    if not os.path.exists(tmp_dir):
+        os.mkdir(tmp_dir)
+    graph_path = os.path.join(tmp_dir, 'tmp_graph.dot')
+
+    with open(graph_path, 'w') as f:
+        f.write(dot_graph)
+
+    extension = os.path.splitext(to_file)[1][1:] # 확장자(png, pdf 등)
+    subprocess.run(['dot', graph_path, '-T', extension, '-o', to_file], check=True)
+
+
+# =============================================================================
+# Utility functions for numpy (numpy magic)
+# =============================================================================
+def sum_to(x, shape):
+    """x의 원소를 더해 shape 모양으로 만듭니다. (np.broadcast_to(x, ...)의 반대)"""
+    ndim = len(shape)
+    lead = x.ndim - ndim
+    lead_axis = tuple(range(lead))
+
+    axis = tuple([i + lead for i, sx in enumerate(shape) if sx == 1])
+    y = x.sum(lead_axis + axis, keepdims=True)
+    if lead > 0:
+        y = y.squeeze(lead_axis)
+    return y
+
+
+# =============================================================================
+# gradient check
+# =============================================================================
+def numerical_grad(f, inputs, index, eps=1e-4, max_elements=2 ** 22):
+    """inputs[index]의 원소별 수치 미분을 구합니다.
+
+    원소별 섭동 2N개를 맨 앞의 배치 축으로 쌓아 한 번의 순전파로 계산합니다.
+    쌓은 입력과 출력의 원소 수가 max_elements를 넘지 않도록 섭동을 나누어 순전파합니다.
+    f가 배치 축을 유지하지 못하면(예: sum_to) 원소마다 순전파하는 방법으로 돌아갑니다.
+    중앙 차분은 float64의 정밀도를 가정하므로, autocast 안에서 호출해도 원래 dtype으로 순전파합니다.
+    """
+    with using_config('compute_dtype', None):
+        return _numerical_grad(f, inputs, index, eps, max_elements)
+
+
+def _numerical_grad(f, inputs, index, eps, max_elements):
+    x = inputs[index].data.astype(np.float64)
+    n = x.size
+    with no_grad():
+        y_shape = f(*inputs).shape
+    pad = (1,) * max(len(y_shape) - x.ndim, 0) # 브로드캐스트되는 입력은 배치 축 뒤에 1을 채워 출력과 축을 맞춥니다.
+    grad = np.empty(n, dtype=np.float64)
+
+    batch_size = max(1, max_elements // (2 * max(n, int(np.prod(y_shape)), 1)))
+    for start in range(0, n, batch_size):
+        stop = min(start + batch_size, n)
+        b = stop - start
+        rows, cols = np.arange(b), np.arange(start, stop)
+        batch = np.empty((2 * b, n), dtype=np.float64)
+        batch[:] = x.reshape(-1)
+        batch[rows, cols] += eps
+        batch[rows + b, cols] -= eps
+        batch = batch.reshape((2 * b,) + pad + x.shape)
+
+        args = list(inputs)
+        args[index] = Variable(batch)
+        try:
+            with no_grad():
+                y = f(*args)
+        except ValueError: # 배치 축 때문에 모양이 맞지 않는 경우
+            y = None
+        if y is None or y.shape != (2 * b,) + y_shape:
+            return _numerical_grad_loop(f, inputs, index, eps)
+        if start == 0:
+            # 축을 지정하는 함수(sum(axis=1) 등)는 배치 축 때문에 모양은 맞아도 다른 값을 계산할 수 있으므로,
+            # 첫 번째 섭동 하나를 배치 없이 계산해 비교합니다.
+            args[index] = Variable(batch[0].reshape(x.shape))
+            with no_grad():
+                y_check = f(*args).data
+            if not np.allclose(y.data[0], y_check):
+                return _numerical_grad_loop(f, inputs, index, eps)
+
+        y = y.data.reshape(2 * b, -1).sum(axis=1)
+        grad[start:stop] = (y[:b] - y[b:]) / (2 * eps)
+
+    return grad.reshape(x.shape)
+
+
+def _numerical_grad_loop(f, inputs, index, eps):
+    x = inputs[index].data.astype(np.float64)
+    grad = np.empty_like(x)
+    args = list(inputs)
+    it = np.nditer(x, flags=['multi_index'])
+    with no_grad():
+        for _ in it:
+            idx = it.multi_index
+            tmp = x[idx]
+            x[idx] = tmp + eps
+            args[index] = Variable(x.copy())
+            y1 = f(*args).data.sum()
+            x[idx] = tmp - eps
+            args[index] = Variable(x.copy())
+            y0 = f(*args).data.sum()
+            x[idx] = tmp
+            grad[idx] = (y1 - y0) / (2 * eps)
+    return grad
+
+
+def gradient_check(f, *inputs, eps=1e-4, rtol=1e-4, atol=1e-5, max_elements=2 ** 22):
+    """역전파로 구한 기울기가 수치 미분과 rtol/atol 안에서 일치하면 True를 반환합니다."""
+    for x in inputs:
+        x.cleargrad()
+    y = f(*inputs)
+    y.backward()
+
+    for i, x in enumerate(inputs):
+        num_grad = numerical_grad(f, inputs, i, eps, max_elements)
+        bp_grad = x.grad if x.grad is not None else np.zeros_like(num_grad)
+        if bp_grad.shape != num_grad.shape or not np.allclose(bp_grad, num_grad, rtol=rtol, atol=atol):
+            return False
+    return True
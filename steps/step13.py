@@ -0,0 +1,208 @@
+# 가변 길이 인수 (역전파 편), 같은 변수 반복 사용, 복잡한 계산 그래프
+
+# 지금까지의 backward는 f.input, f.output 하나씩만 다루었고, 미분값을 덮어쓰고 있었습니다.
+# 1. 입력과 출력이 여러 개인 함수도 역전파할 수 있도록 수정합니다.
+# 2. 같은 변수를 반복해서 사용하면(예: add(x, x)) 미분값을 덮어쓰지 않고 더해줍니다.
+# 3. 함수에 '세대(generation)'를 부여해, 세대가 큰 함수부터 꺼내 역전파합니다.
+#    이미 리스트에 추가된 함수는 다시 추가하지 않으므로, 각 함수의 backward는 딱 한 번만 호출됩니다.
+
+import numpy as np
+import unittest
+
+def square(x):
+    return Square()(x)
+
+def exp(x):
+    return Exp()(x)
+
+def add(x0, x1):
+    return Add()(x0, x1)
+
+def as_array(x):
+    if np.isscalar(x):
+        return np.array(x)
+    return x
+
+def numerical_diff(f, x, eps=1e-4):
+    x0 = Variable(x.data - eps)
+    x1 = Variable(x.data + eps)
+    y0 = f(x0)
+    y1 = f(x1)
+    return (y1.data - y0.data) / (2 * eps)
+
+class Variable:
+    def __init__(self, data):
+        if data is not None:
+            if not isinstance(data, np.ndarray):
+                raise TypeError('{} is not supported'.format(type(data)))
+
+        self.data = data
+        self.grad = None
+        self.creator = None
+        self.generation = 0 # 세대 수를 기록하는 변수
+
+    def set_creator(self, func):
+        self.creator = func
+        self.generation = func.generation + 1 # 부모 함수의 세대보다 1만큼 큰 값을 설정합니다.
+
+    def cleargrad(self): # 같은 변수를 다른 계산에 재사용할 때 미분값을 초기화합니다.
+        self.grad = None
+
+    def backward(self):
+        if self.grad is None:
+            self.grad = np.ones_like(self.data)
+
+        funcs = []
+        seen_set = set() # 같은 함수를 중복으로 추가하는 일을 막습니다.
+
+        def add_func(f):
+            if f not in seen_set:
+                funcs.append(f)
+                seen_set.add(f)
+                funcs.sort(key=lambda x: x.generation) # 세대 순으로 정렬
+
+        add_func(self.creator)
+
+        while funcs:
+            f = funcs.pop() # 세대가 가장 큰 함수를 꺼냅니다.
+            gys = [output.grad for output in f.outputs] # 출력 변수들의 미분값을 리스트로 모읍니다.
+            gxs = f.backward(*gys)
+            if not isinstance(gxs, tuple):
+                gxs = (gxs,)
+
+            for x, gx in zip(f.inputs, gxs):
+                if x.grad is None:
+                    x.grad = gx
+                else:
+                    x.grad = x.grad + gx # 덮어쓰지 않고 더합니다. (x.grad += gx 는 인플레이스 연산이라 사용하지 않습니다.)
+
+                if x.creator is not None:
+                    add_func(x.creator)
+
+class Function:
+    def __call__(self, *inputs):
+        xs = [x.data for x in inputs]
+        ys = self.forward(*xs)
+        if not isinstance(ys, tuple):
+            ys = (ys,)
+        outputs = [Variable(as_array(y)) for y in ys]
+
+        self.generation = max([x.generation for x in inputs]) # 입력 변수 중 가장 큰 세대를 함수의 세대로 설정합니다.
+        for output in outputs:
+            output.set_creator(self)
+        self.inputs = inputs
+        self.outputs = outputs
+        return outputs if len(outputs) > 1 else outputs[0]
+
+    def forward(self, xs):
+        raise NotImplementedError()
+
+    def backward(self, gys):
+        raise NotImplementedError()
+
+class Square(Function):
+    def forward(self, x):
+        y = x ** 2
+        return y
+
+    def backward(self, gy):
+        x = self.inputs[0].data # 수정 전: x = self.input.data
+        gx = 2 * x * gy
+        return gx
+
+class Exp(Function):
+    def forward(self, x):
+        y = np.exp(x)
+        return y
+
+    def backward(self, gy):
+        x = self.inputs[0].data
+        gx = np.exp(x) * gy
+        return gx
+
+class Add(Function):
+    def forward(self, x0, x1):
+        y = x0 + x1
+        return y
+
+    def backward(self, gy):
+        return gy, gy # 덧셈의 역전파는 출력 쪽 미분값을 그대로 흘려보냅니다.
+
+class SqureTest(unittest.TestCase):
+    def test_forward(self):
+        x = Variable(np.array(2.0))
+        y = square(x)
+        expected = np.array(4.0)
+        self.assertEqual(y.data, expected)
+
+    def test_backward(self):
+        x = Variable(np.array(3.0))
+        y = square(x)
+        y.backward()
+        expected = np.array(6.0)
+        self.assertEqual(x.grad, expected)
+
+    def test_gradient_check(self):
+        x = Variable(np.random.rand(1))
+        y = square(x)
+        y.backward()
+        num_grad = numerical_diff(square, x)
+        flg = np.allclose(x.grad, num_grad)
+        self.assertTrue(flg)
+
+class AddTest(unittest.TestCase):
+    # 같은 변수를 반복 사용: y = x + x 의 미분은 2
+    def test_same_variable(self):
+        x = Variable(np.array(3.0))
+        y = add(x, x)
+        y.backward()
+        self.assertEqual(x.grad, np.array(2.0))
+
+    # 분기가 있는 그래프: y = (x^2)^2 + (x^2)^2 = 2x^4, dy/dx = 8x^3
+    def test_branch(self):
+        x = Variable(np.array(2.0))
+        a = square(x)
+        y = add(square(a), square(a))
+        y.backward()
+        self.assertEqual(y.data, np.array(32.0))
+        self.assertEqual(x.grad, np.array(64.0))
+
+    # 공유된 부분식이 겹겹이 쌓여도 각 함수의 backward는 한 번만 호출되어야 합니다.
+    def test_visit_once(self):
+        calls = []
+
+        class CountingAdd(Add):
+            def backward(self, gy):
+                calls.append(self)
+                return super().backward(gy)
+
+        x = Variable(np.array(1.0))
+        y = x
+        depth = 30
+        for _ in range(depth):
+            y = CountingAdd()(y, y) # y = 2^depth * x
+        y.backward()
+        self.assertEqual(len(calls), depth)
+        self.assertEqual(x.grad, np.array(2.0 ** depth))
+
+# 순전파
+x = Variable(np.array(2.0))
+a = square(x)
+y = add(square(a), square(a))
+# 역전파
+y.backward()
+print(y.data) # 32.0
+print(x.grad) # 64.0
+
+# 같은 변수를 다른 계산에 재사용할 때는 미분값을 초기화합니다.
+x = Variable(np.array(3.0))
+y = add(x, x)
+y.backward()
+print(x.grad) # 2.0
+
+x.cleargrad()
+y = add(add(x, x), x)
+y.backward()
+print(x.grad) # 3.0
+
+# python -m unittest steps/step13.py
@@ -0,0 +1,246 @@
+# 메모리 관리와 순환 참조, 메모리 절약 모드
+
+# Function은 inputs와 outputs를, Variable은 creator를 참조하므로 둘 사이에 순환 참조가 생깁니다.
+# 순환 참조가 있으면 참조 카운트가 0이 되지 않아, 세대별 가비지 컬렉션(GC)이 돌 때까지 계산 그래프와 ndarray가 메모리에 남습니다.
+# 1. Function이 출력 변수를 약한 참조(weakref)로 가리키도록 하여 순환 참조를 끊습니다.
+# 2. backward(retain_grad=False)이면 중간 변수의 미분값을 사용 직후 삭제합니다. (말단 변수의 미분값만 남습니다.)
+
+import weakref
+import gc
+import numpy as np
+import unittest
+
+def square(x):
+    return Square()(x)
+
+def exp(x):
+    return Exp()(x)
+
+def add(x0, x1):
+    return Add()(x0, x1)
+
+def as_array(x):
+    if np.isscalar(x):
+        return np.array(x)
+    return x
+
+def numerical_diff(f, x, eps=1e-4):
+    x0 = Variable(x.data - eps)
+    x1 = Variable(x.data + eps)
+    y0 = f(x0)
+    y1 = f(x1)
+    return (y1.data - y0.data) / (2 * eps)
+
+class Variable:
+    def __init__(self, data):
+        if data is not None:
+            if not isinstance(data, np.ndarray):
+                raise TypeError('{} is not supported'.format(type(data)))
+
+        self.data = data
+        self.grad = None
+        self.creator = None
+        self.generation = 0 # 세대 수를 기록하는 변수
+
+    def set_creator(self, func):
+        self.creator = func
+        self.generation = func.generation + 1 # 부모 함수의 세대보다 1만큼 큰 값을 설정합니다.
+
+    def cleargrad(self): # 같은 변수를 다른 계산에 재사용할 때 미분값을 초기화합니다.
+        self.grad = None
+
+    def backward(self, retain_grad=False):
+        if self.grad is None:
+            self.grad = np.ones_like(self.data)
+
+        funcs = []
+        seen_set = set() # 같은 함수를 중복으로 추가하는 일을 막습니다.
+
+        def add_func(f):
+            if f not in seen_set:
+                funcs.append(f)
+                seen_set.add(f)
+                funcs.sort(key=lambda x: x.generation) # 세대 순으로 정렬
+
+        add_func(self.creator)
+
+        while funcs:
+            f = funcs.pop() # 세대가 가장 큰 함수를 꺼냅니다.
+            gys = [output().grad for output in f.outputs] # output은 약한 참조이므로 output()으로 꺼냅니다.
+            gxs = f.backward(*gys)
+            if not isinstance(gxs, tuple):
+                gxs = (gxs,)
+
+            for x, gx in zip(f.inputs, gxs):
+                if x.grad is None:
+                    x.grad = gx
+                else:
+                    x.grad = x.grad + gx # 덮어쓰지 않고 더합니다. (x.grad += gx 는 인플레이스 연산이라 사용하지 않습니다.)
+
+                if x.creator is not None:
+                    add_func(x.creator)
+
+            if not retain_grad:
+                for y in f.outputs:
+                    y().grad = None # 중간 변수의 미분값은 더 이상 필요 없으므로 삭제합니다.
+
+class Function:
+    def __call__(self, *inputs):
+        xs = [x.data for x in inputs]
+        ys = self.forward(*xs)
+        if not isinstance(ys, tuple):
+            ys = (ys,)
+        outputs = [Variable(as_array(y)) for y in ys]
+
+        self.generation = max([x.generation for x in inputs]) # 입력 변수 중 가장 큰 세대를 함수의 세대로 설정합니다.
+        for output in outputs:
+            output.set_creator(self)
+        self.inputs = inputs
+        self.outputs = [weakref.ref(output) for output in outputs] # 출력 변수는 약한 참조로 가집니다.
+        return outputs if len(outputs) > 1 else outputs[0]
+
+    def forward(self, xs):
+        raise NotImplementedError()
+
+    def backward(self, gys):
+        raise NotImplementedError()
+
+class Square(Function):
+    def forward(self, x):
+        y = x ** 2
+        return y
+
+    def backward(self, gy):
+        x = self.inputs[0].data # 수정 전: x = self.input.data
+        gx = 2 * x * gy
+        return gx
+
+class Exp(Function):
+    def forward(self, x):
+        y = np.exp(x)
+        return y
+
+    def backward(self, gy):
+        x = self.inputs[0].data
+        gx = np.exp(x) * gy
+        return gx
+
+class Add(Function):
+    def forward(self, x0, x1):
+        y = x0 + x1
+        return y
+
+    def backward(self, gy):
+        return gy, gy # 덧셈의 역전파는 출력 쪽 미분값을 그대로 흘려보냅니다.
+
+class SqureTest(unittest.TestCase):
+    def test_forward(self):
+        x = Variable(np.array(2.0))
+        y = square(x)
+        expected = np.array(4.0)
+        self.assertEqual(y.data, expected)
+
+    def test_backward(self):
+        x = Variable(np.array(3.0))
+        y = square(x)
+        y.backward()
+        expected = np.array(6.0)
+        self.assertEqual(x.grad, expected)
+
+    def test_gradient_check(self):
+        x = Variable(np.random.rand(1))
+        y = square(x)
+        y.backward()
+        num_grad = numerical_diff(square, x)
+        flg = np.allclose(x.grad, num_grad)
+        self.assertTrue(flg)
+
+class MemoryTest(unittest.TestCase):
+    # 기본적으로 말단 변수의 미분값만 남기고 중간 변수의 미분값은 삭제합니다.
+    def test_retain_grad(self):
+        x0 = Variable(np.array(1.0))
+        x1 = Variable(np.array(1.0))
+        t = add(x0, x1)
+        y = add(x0, t)
+        y.backward()
+        self.assertIsNone(y.grad)
+        self.assertIsNone(t.grad)
+        self.assertEqual(x0.grad, np.array(2.0))
+        self.assertEqual(x1.grad, np.array(1.0))
+
+    def test_retain_grad_true(self):
+        x = Variable(np.array(2.0))
+        t = square(x)
+        y = exp(t)
+        y.backward(retain_grad=True)
+        self.assertEqual(y.grad, np.array(1.0))
+        self.assertEqual(t.grad, np.exp(4.0))
+
+    # GC가 꺼져 있어도 출력 변수가 사라지면 계산 그래프 전체가 참조 카운트만으로 해제되어야 합니다.
+    def test_no_reference_cycle(self):
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            x = Variable(np.random.randn(100))
+            t = square(x)
+            f = weakref.ref(t.creator)
+            t_ref = t.creator.outputs[0]
+            y = square(square(t))
+            y.backward()
+            del t, y
+            self.assertIsNone(f())
+            self.assertIsNone(t_ref())
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+class AddTest(unittest.TestCase):
+    # 같은 변수를 반복 사용: y = x + x 의 미분은 2
+    def test_same_variable(self):
+        x = Variable(np.array(3.0))
+        y = add(x, x)
+        y.backward()
+        self.assertEqual(x.grad, np.array(2.0))
+
+    # 분기가 있는 그래프: y = (x^2)^2 + (x^2)^2 = 2x^4, dy/dx = 8x^3
+    def test_branch(self):
+        x = Variable(np.array(2.0))
+        a = square(x)
+        y = add(square(a), square(a))
+        y.backward()
+        self.assertEqual(y.data, np.array(32.0))
+        self.assertEqual(x.grad, np.array(64.0))
+
+    # 공유된 부분식이 겹겹이 쌓여도 각 함수의 backward는 한 번만 호출되어야 합니다.
+    def test_visit_once(self):
+        calls = []
+
+        class CountingAdd(Add):
+            def backward(self, gy):
+                calls.append(self)
+                return super().backward(gy)
+
+        x = Variable(np.array(1.0))
+        y = x
+        depth = 30
+        for _ in range(depth):
+            y = CountingAdd()(y, y) # y = 2^depth * x
+        y.backward()
+        self.assertEqual(len(calls), depth)
+        self.assertEqual(x.grad, np.array(2.0 ** depth))
+
+# 순전파, 역전파
+x0 = Variable(np.array(1.0))
+x1 = Variable(np.array(1.0))
+t = add(x0, x1)
+y = add(x0, t)
+y.backward()
+print(y.grad, t.grad) # None None
+print(x0.grad, x1.grad) # 2.0 1.0
+
+# 순환 참조가 없으므로 반복할 때마다 이전 계산 그래프가 즉시 해제됩니다.
+for i in range(10):
+    x = Variable(np.random.randn(10000)) # 거대한 데이터
+    y = square(square(square(x))) # 복잡한 계산 수행
+
+# python -m unittest steps/step14.py
@@ -0,0 +1,353 @@
+# 기울기 확인 (벡터화)
+
+# numerical_diff는 텐서 전체를 같은 eps만큼 한꺼번에 움직이므로, 원소별 미분을 확인할 수 없습니다.
+# 원소별로 확인하려면 원소 수 N에 대해 2N번의 순전파를 파이썬 루프로 돌려야 해 큰 텐서에서는 너무 느립니다.
+# 그래서 원소별 섭동(perturbation) 2N개를 배치 축(axis 0)으로 쌓아, 한 번의 순전파로 모두 계산합니다.
+# 1. numerical_grad: 입력 하나에 대한 원소별 수치 미분을 배치 순전파로 구합니다.
+# 2. gradient_check: 모든 입력에 대해 수치 미분과 역전파 결과를 rtol/atol로 비교합니다.
+# 배치 순전파를 쓰므로 f는 원소별(elementwise) 함수처럼 맨 앞에 추가된 배치 축을 그대로 유지해야 합니다.
+# 쌓은 입력의 원소 수(2 * 배치 크기 * N)가 max_elements를 넘지 않도록 배치 크기를 N에 맞춰 정합니다.
+
+import weakref
+import gc
+import contextlib
+import time
+import tracemalloc
+import numpy as np
+import unittest
+
+class Config:
+    enable_backprop = True # True면 역전파 활성 모드
+
+@contextlib.contextmanager
+def using_config(name, value):
+    old_value = getattr(Config, name)
+    setattr(Config, name, value) # with 블록에 들어갈 때 설정을 바꾸고
+    try:
+        yield
+    finally:
+        setattr(Config, name, old_value) # with 블록을 빠져나오면 원래대로 되돌립니다.
+
+def no_grad():
+    return using_config('enable_backprop', False)
+
+def square(x):
+    return Square()(x)
+
+def exp(x):
+    return Exp()(x)
+
+def add(x0, x1):
+    return Add()(x0, x1)
+
+def as_array(x):
+    if np.isscalar(x):
+        return np.array(x)
+    return x
+
+def numerical_diff(f, x, eps=1e-4):
+    x0 = Variable(x.data - eps)
+    x1 = Variable(x.data + eps)
+    y0 = f(x0)
+    y1 = f(x1)
+    return (y1.data - y0.data) / (2 * eps)
+
+def numerical_grad(f, inputs, index, eps=1e-4, max_elements=2 ** 22):
+    x = inputs[index].data.astype(np.float64)
+    n = x.size
+    grad = np.empty(n, dtype=np.float64)
+
+    batch_size = max(1, max_elements // (2 * max(n, 1))) # 쌓은 입력 (2 * 배치 크기 * N)이 max_elements를 넘지 않게 합니다.
+    for start in range(0, n, batch_size):
+        stop = min(start + batch_size, n)
+        b = stop - start
+        rows, cols = np.arange(b), np.arange(start, stop)
+        batch = np.empty((2 * b, n), dtype=np.float64)
+        batch[:] = x.reshape(-1)
+        batch[rows, cols] += eps # 각 행마다 원소 하나만 eps만큼 움직입니다.
+        batch[rows + b, cols] -= eps
+        batch = batch.reshape((2 * b,) + x.shape)
+
+        args = list(inputs)
+        args[index] = Variable(batch)
+        with no_grad():
+            y = f(*args)
+        if y.data.shape[:1] != (2 * b,):
+            raise ValueError('f must keep the leading batch axis (got shape {})'.format(y.data.shape))
+
+        y = y.data.reshape(2 * b, -1).sum(axis=1) # 역전파의 시작값 np.ones_like(y)에 대응하도록 출력을 모두 더합니다.
+        grad[start:stop] = (y[:b] - y[b:]) / (2 * eps)
+
+    return grad.reshape(x.shape)
+
+def gradient_check(f, *inputs, eps=1e-4, rtol=1e-4, atol=1e-5, max_elements=2 ** 22):
+    for x in inputs:
+        x.cleargrad()
+    y = f(*inputs)
+    y.backward()
+
+    for i, x in enumerate(inputs):
+        num_grad = numerical_grad(f, inputs, i, eps, max_elements)
+        bp_grad = x.grad if x.grad is not None else np.zeros_like(num_grad)
+        if bp_grad.shape != num_grad.shape or not np.allclose(bp_grad, num_grad, rtol=rtol, atol=atol):
+            return False
+    return True
+
+class Variable:
+    def __init__(self, data):
+        if data is not None:
+            if not isinstance(data, np.ndarray):
+                raise TypeError('{} is not supported'.format(type(data)))
+
+        self.data = data
+        self.grad = None
+        self.creator = None
+        self.generation = 0 # 세대 수를 기록하는 변수
+
+    def set_creator(self, func):
+        self.creator = func
+        self.generation = func.generation + 1 # 부모 함수의 세대보다 1만큼 큰 값을 설정합니다.
+
+    def cleargrad(self): # 같은 변수를 다른 계산에 재사용할 때 미분값을 초기화합니다.
+        self.grad = None
+
+    def backward(self, retain_grad=False):
+        if self.grad is None:
+            self.grad = np.ones_like(self.data)
+
+        funcs = []
+        seen_set = set() # 같은 함수를 중복으로 추가하는 일을 막습니다.
+
+        def add_func(f):
+            if f not in seen_set:
+                funcs.append(f)
+                seen_set.add(f)
+                funcs.sort(key=lambda x: x.generation) # 세대 순으로 정렬
+
+        add_func(self.creator)
+
+        while funcs:
+            f = funcs.pop() # 세대가 가장 큰 함수를 꺼냅니다.
+            gys = [output().grad for output in f.outputs] # output은 약한 참조이므로 output()으로 꺼냅니다.
+            gxs = f.backward(*gys)
+            if not isinstance(gxs, tuple):
+                gxs = (gxs,)
+
+            for x, gx in zip(f.inputs, gxs):
+                if x.grad is None:
+                    x.grad = gx
+                else:
+                    x.grad = x.grad + gx # 덮어쓰지 않고 더합니다. (x.grad += gx 는 인플레이스 연산이라 사용하지 않습니다.)
+
+                if x.creator is not None:
+                    add_func(x.creator)
+
+            if not retain_grad:
+                for y in f.outputs:
+                    y().grad = None # 중간 변수의 미분값은 더 이상 필요 없으므로 삭제합니다.
+
+class Function:
+    def __call__(self, *inputs):
+        xs = [x.data for x in inputs]
+        ys = self.forward(*xs)
+        if not isinstance(ys, tuple):
+            ys = (ys,)
+        outputs = [Variable(as_array(y)) for y in ys]
+
+        if Config.enable_backprop: # 역전파 비활성 모드에서는 계산 그래프의 연결을 만들지 않습니다.
+            self.generation = max([x.generation for x in inputs])
+            for output in outputs:
+                output.set_creator(self)
+            self.inputs = inputs
+            self.outputs = [weakref.ref(output) for output in outputs]
+        return outputs if len(outputs) > 1 else outputs[0]
+
+    def forward(self, xs):
+        raise NotImplementedError()
+
+    def backward(self, gys):
+        raise NotImplementedError()
+
+class Square(Function):
+    def forward(self, x):
+        y = x ** 2
+        return y
+
+    def backward(self, gy):
+        x = self.inputs[0].data # 수정 전: x = self.input.data
+        gx = 2 * x * gy
+        return gx
+
+class Exp(Function):
+    def forward(self, x):
+        y = np.exp(x)
+        return y
+
+    def backward(self, gy):
+        x = self.inputs[0].data
+        gx = np.exp(x) * gy
+        return gx
+
+class Add(Function):
+    def forward(self, x0, x1):
+        y = x0 + x1
+        return y
+
+    def backward(self, gy):
+        return gy, gy # 덧셈의 역전파는 출력 쪽 미분값을 그대로 흘려보냅니다.
+
+class SqureTest(unittest.TestCase):
+    def test_forward(self):
+        x = Variable(np.array(2.0))
+        y = square(x)
+        expected = np.array(4.0)
+        self.assertEqual(y.data, expected)
+
+    def test_backward(self):
+        x = Variable(np.array(3.0))
+        y = square(x)
+        y.backward()
+        expected = np.array(6.0)
+        self.assertEqual(x.grad, expected)
+
+    def test_gradient_check(self):
+        x = Variable(np.random.rand(1))
+        self.assertTrue(gradient_check(square, x))
+
+class GradientCheckTest(unittest.TestCase):
+    def test_large_tensor(self):
+        x = Variable(np.random.rand(50, 60))
+        self.assertTrue(gradient_check(lambda x: exp(square(x)), x))
+
+    def test_memory(self):
+        x = Variable(np.random.rand(4000))
+        tracemalloc.start()
+        grad = numerical_grad(lambda x: exp(x), [x], 0, max_elements=2 ** 16)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertLess(peak, 4 * 2 ** 16 * 8) # 쌓은 입력과 출력 몇 개 분량 (N에 비례하지 않습니다)
+        self.assertTrue(np.allclose(grad, np.exp(x.data)))
+
+    def test_multiple_inputs(self):
+        x0 = Variable(np.random.rand(3, 4))
+        x1 = Variable(np.random.rand(3, 4))
+        f = lambda x0, x1: add(square(x0), exp(x1))
+        self.assertTrue(gradient_check(f, x0, x1, max_elements=2 * 5 * 12)) # 5개씩 나누어 순전파
+
+    def test_same_input_twice(self):
+        x = Variable(np.random.rand(10))
+        self.assertTrue(gradient_check(lambda x: add(x, square(x)), x))
+
+    # 역전파가 틀리면 기울기 확인이 실패해야 합니다.
+    def test_detect_wrong_backward(self):
+        class WrongSquare(Square):
+            def backward(self, gy):
+                return 3 * self.inputs[0].data * gy
+
+        x = Variable(np.random.rand(5))
+        self.assertFalse(gradient_check(lambda x: WrongSquare()(x), x))
+
+class MemoryTest(unittest.TestCase):
+    # 기본적으로 말단 변수의 미분값만 남기고 중간 변수의 미분값은 삭제합니다.
+    def test_retain_grad(self):
+        x0 = Variable(np.array(1.0))
+        x1 = Variable(np.array(1.0))
+        t = add(x0, x1)
+        y = add(x0, t)
+        y.backward()
+        self.assertIsNone(y.grad)
+        self.assertIsNone(t.grad)
+        self.assertEqual(x0.grad, np.array(2.0))
+        self.assertEqual(x1.grad, np.array(1.0))
+
+    def test_retain_grad_true(self):
+        x = Variable(np.array(2.0))
+        t = square(x)
+        y = exp(t)
+        y.backward(retain_grad=True)
+        self.assertEqual(y.grad, np.array(1.0))
+        self.assertEqual(t.grad, np.exp(4.0))
+
+    # GC가 꺼져 있어도 출력 변수가 사라지면 계산 그래프 전체가 참조 카운트만으로 해제되어야 합니다.
+    def test_no_reference_cycle(self):
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            x = Variable(np.random.randn(100))
+            t = square(x)
+            f = weakref.ref(t.creator)
+            t_ref = t.creator.outputs[0]
+            y = square(square(t))
+            y.backward()
+            del t, y
+            self.assertIsNone(f())
+            self.assertIsNone(t_ref())
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+class NoGradTest(unittest.TestCase):
+    def test_no_grad(self):
+        x = Variable(np.array(2.0))
+        with no_grad():
+            y = add(square(x), exp(x))
+        self.assertIsNone(y.creator)
+        self.assertEqual(y.data, np.array(4.0) + np.exp(2.0))
+        self.assertTrue(Config.enable_backprop) # with 블록을 벗어나면 원래 설정으로 돌아옵니다.
+
+    def test_restore_on_error(self):
+        with self.assertRaises(ValueError):
+            with no_grad():
+                raise ValueError()
+        self.assertTrue(Config.enable_backprop)
+
+    def test_using_config(self):
+        with using_config('enable_backprop', False):
+            with using_config('enable_backprop', True):
+                y = square(Variable(np.array(1.0)))
+                self.assertIsNotNone(y.creator)
+            y = square(Variable(np.array(1.0)))
+            self.assertIsNone(y.creator)
+
+class AddTest(unittest.TestCase):
+    # 같은 변수를 반복 사용: y = x + x 의 미분은 2
+    def test_same_variable(self):
+        x = Variable(np.array(3.0))
+        y = add(x, x)
+        y.backward()
+        self.assertEqual(x.grad, np.array(2.0))
+
+    # 분기가 있는 그래프: y = (x^2)^2 + (x^2)^2 = 2x^4, dy/dx = 8x^3
+    def test_branch(self):
+        x = Variable(np.array(2.0))
+        a = square(x)
+        y = add(square(a), square(a))
+        y.backward()
+        self.assertEqual(y.data, np.array(32.0))
+        self.assertEqual(x.grad, np.array(64.0))
+
+    # 공유된 부분식이 겹겹이 쌓여도 각 함수의 backward는 한 번만 호출되어야 합니다.
+    def test_visit_once(self):
+        calls = []
+
+        class CountingAdd(Add):
+            def backward(self, gy):
+                calls.append(self)
+                return super().backward(gy)
+
+        x = Variable(np.array(1.0))
+        y = x
+        depth = 30
+        for _ in range(depth):
+            y = CountingAdd()(y, y) # y = 2^depth * x
+        y.backward()
+        self.assertEqual(len(calls), depth)
+        self.assertEqual(x.grad, np.array(2.0 ** depth))
+
+# 원소 3000개짜리 텐서의 기울기 확인 (배치 순전파 6번)
+x = Variable(np.random.rand(30, 100))
+start = time.perf_counter()
+print(gradient_check(lambda x: exp(square(x)), x, max_elements=2 * 1000 * 3000)) # True
+print('{:.1f} ms'.format((time.perf_counter() - start) * 1e3))
+
+# python -m unittest steps/step16.py
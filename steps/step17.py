@@ -0,0 +1,566 @@
+# 연산자 오버로드
+
+# 지금까지는 add(x0, x1)처럼 함수를 호출하고, 상수도 매번 Variable(np.array(...))로 감싸야 했습니다.
+# 1. Variable에 +, -, *, /, **, 단항 - 연산자와 우항(reflected) 연산자(__radd__ 등)를 오버로드합니다.
+# 2. 파이썬 스칼라와 ndarray를 자동으로 Variable(Constant)로 변환합니다.
+#    스칼라 상수는 (타입, 값, dtype)을 키로 캐시해, 학습 루프에서 매번 새로 감싸지 않습니다.
+#    dtype은 np.result_type으로 상대 피연산자에 맞추므로 float32 변수에 2.0을 곱해도 float64로 승격되지 않습니다.
+# 3. __array_priority__를 설정해 ndarray + Variable도 Variable의 __radd__가 처리하도록 합니다.
+
+import math
+import weakref
+import gc
+import contextlib
+import numpy as np
+import unittest
+
+class Config:
+    enable_backprop = True # True면 역전파 활성 모드
+
+@contextlib.contextmanager
+def using_config(name, value):
+    old_value = getattr(Config, name)
+    setattr(Config, name, value) # with 블록에 들어갈 때 설정을 바꾸고
+    try:
+        yield
+    finally:
+        setattr(Config, name, old_value) # with 블록을 빠져나오면 원래대로 되돌립니다.
+
+def no_grad():
+    return using_config('enable_backprop', False)
+
+def square(x):
+    return Square()(x)
+
+def exp(x):
+    return Exp()(x)
+
+def as_array(x):
+    if np.isscalar(x):
+        return np.array(x)
+    return x
+
+_constant_cache = {}
+_constant_cache_size = 1024
+
+def as_variable(obj, like=None):
+    if isinstance(obj, Variable):
+        return obj
+    if isinstance(obj, np.ndarray):
+        return Constant(obj) # ndarray는 복사하지 않고 그대로 감쌉니다.
+
+    dtype = np.result_type(like.data, obj) if like is not None else None # 상대 피연산자의 dtype을 따릅니다.
+    sign = math.copysign(1, obj) if isinstance(obj, (float, np.floating)) else None # 0.0 == -0.0이므로 부호도 구별합니다.
+    key = (type(obj), obj, sign, dtype) # 1과 True, 1.0을 구별하기 위해 타입도 키에 넣습니다.
+    c = _constant_cache.get(key)
+    if c is None:
+        if len(_constant_cache) >= _constant_cache_size:
+            _constant_cache.clear()
+        c = Constant(np.array(obj, dtype=dtype))
+        _constant_cache[key] = c
+    return c
+
+def numerical_diff(f, x, eps=1e-4):
+    x0 = Variable(x.data - eps)
+    x1 = Variable(x.data + eps)
+    y0 = f(x0)
+    y1 = f(x1)
+    return (y1.data - y0.data) / (2 * eps)
+
+def numerical_grad(f, inputs, index, eps=1e-4, max_elements=2 ** 22):
+    x = inputs[index].data.astype(np.float64)
+    n = x.size
+    grad = np.empty(n, dtype=np.float64)
+
+    batch_size = max(1, max_elements // (2 * max(n, 1))) # 쌓은 입력 (2 * 배치 크기 * N)이 max_elements를 넘지 않게 합니다.
+    for start in range(0, n, batch_size):
+        stop = min(start + batch_size, n)
+        b = stop - start
+        rows, cols = np.arange(b), np.arange(start, stop)
+        batch = np.empty((2 * b, n), dtype=np.float64)
+        batch[:] = x.reshape(-1)
+        batch[rows, cols] += eps # 각 행마다 원소 하나만 eps만큼 움직입니다.
+        batch[rows + b, cols] -= eps
+        batch = batch.reshape((2 * b,) + x.shape)
+
+        args = list(inputs)
+        args[index] = Variable(batch)
+        with no_grad():
+            y = f(*args)
+        if y.data.shape[:1] != (2 * b,):
+            raise ValueError('f must keep the leading batch axis (got shape {})'.format(y.data.shape))
+
+        y = y.data.reshape(2 * b, -1).sum(axis=1) # 역전파의 시작값 np.ones_like(y)에 대응하도록 출력을 모두 더합니다.
+        grad[start:stop] = (y[:b] - y[b:]) / (2 * eps)
+
+    return grad.reshape(x.shape)
+
+def gradient_check(f, *inputs, eps=1e-4, rtol=1e-4, atol=1e-5, max_elements=2 ** 22):
+    for x in inputs:
+        x.cleargrad()
+    y = f(*inputs)
+    y.backward()
+
+    for i, x in enumerate(inputs):
+        num_grad = numerical_grad(f, inputs, i, eps, max_elements)
+        bp_grad = x.grad if x.grad is not None else np.zeros_like(num_grad)
+        if bp_grad.shape != num_grad.shape or not np.allclose(bp_grad, num_grad, rtol=rtol, atol=atol):
+            return False
+    return True
+
+class Variable:
+    def __init__(self, data):
+        if data is not None:
+            if not isinstance(data, np.ndarray):
+                raise TypeError('{} is not supported'.format(type(data)))
+
+        self.data = data
+        self.grad = None
+        self.creator = None
+        self.generation = 0 # 세대 수를 기록하는 변수
+
+    def set_creator(self, func):
+        self.creator = func
+        self.generation = func.generation + 1 # 부모 함수의 세대보다 1만큼 큰 값을 설정합니다.
+
+    __array_priority__ = 200 # ndarray보다 우선순위를 높여 ndarray + Variable에서 Variable의 연산자가 호출되도록 합니다.
+
+    def __add__(self, other):
+        return add(self, other)
+
+    def __radd__(self, other):
+        return add(self, other)
+
+    def __mul__(self, other):
+        return mul(self, other)
+
+    def __rmul__(self, other):
+        return mul(self, other)
+
+    def __neg__(self):
+        return neg(self)
+
+    def __sub__(self, other):
+        return sub(self, other)
+
+    def __rsub__(self, other):
+        return rsub(self, other)
+
+    def __truediv__(self, other):
+        return div(self, other)
+
+    def __rtruediv__(self, other):
+        return rdiv(self, other)
+
+    def __pow__(self, other):
+        return pow(self, other)
+
+    def __rpow__(self, other):
+        return rpow(self, other)
+
+    def cleargrad(self): # 같은 변수를 다른 계산에 재사용할 때 미분값을 초기화합니다.
+        self.grad = None
+
+    def backward(self, retain_grad=False):
+        if self.grad is None:
+            self.grad = np.ones_like(self.data)
+
+        funcs = []
+        seen_set = set() # 같은 함수를 중복으로 추가하는 일을 막습니다.
+
+        def add_func(f):
+            if f not in seen_set:
+                funcs.append(f)
+                seen_set.add(f)
+                funcs.sort(key=lambda x: x.generation) # 세대 순으로 정렬
+
+        add_func(self.creator)
+
+        while funcs:
+            f = funcs.pop() # 세대가 가장 큰 함수를 꺼냅니다.
+            gys = [output().grad for output in f.outputs] # output은 약한 참조이므로 output()으로 꺼냅니다.
+            gxs = f.backward(*gys)
+            if not isinstance(gxs, tuple):
+                gxs = (gxs,)
+
+            for x, gx in zip(f.inputs, gxs):
+                if isinstance(x, Constant):
+                    continue
+
+                if x.grad is None:
+                    x.grad = gx
+                else:
+                    x.grad = x.grad + gx # 덮어쓰지 않고 더합니다. (x.grad += gx 는 인플레이스 연산이라 사용하지 않습니다.)
+
+                if x.creator is not None:
+                    add_func(x.creator)
+
+            if not retain_grad:
+                for y in f.outputs:
+                    y().grad = None # 중간 변수의 미분값은 더 이상 필요 없으므로 삭제합니다.
+
+# 연산 도중 자동으로 만들어진 상수. 미분값이 필요 없으므로 역전파에서 grad를 저장하지 않습니다.
+# 캐시된 상수는 여러 계산 그래프가 공유하므로, grad를 쌓으면 그래프끼리 값이 섞이게 됩니다.
+class Constant(Variable):
+    pass
+
+class Function:
+    def __call__(self, *inputs):
+        inputs = [as_variable(x) for x in inputs]
+        xs = [x.data for x in inputs]
+        ys = self.forward(*xs)
+        if not isinstance(ys, tuple):
+            ys = (ys,)
+        outputs = [Variable(as_array(y)) for y in ys]
+
+        if Config.enable_backprop: # 역전파 비활성 모드에서는 계산 그래프의 연결을 만들지 않습니다.
+            self.generation = max([x.generation for x in inputs])
+            for output in outputs:
+                output.set_creator(self)
+            self.inputs = inputs
+            self.outputs = [weakref.ref(output) for output in outputs]
+        return outputs if len(outputs) > 1 else outputs[0]
+
+    def forward(self, xs):
+        raise NotImplementedError()
+
+    def backward(self, gys):
+        raise NotImplementedError()
+
+class Square(Function):
+    def forward(self, x):
+        y = x ** 2
+        return y
+
+    def backward(self, gy):
+        x = self.inputs[0].data # 수정 전: x = self.input.data
+        gx = 2 * x * gy
+        return gx
+
+class Exp(Function):
+    def forward(self, x):
+        y = np.exp(x)
+        return y
+
+    def backward(self, gy):
+        x = self.inputs[0].data
+        gx = np.exp(x) * gy
+        return gx
+
+class Add(Function):
+    def forward(self, x0, x1):
+        y = x0 + x1
+        return y
+
+    def backward(self, gy):
+        return gy, gy # 덧셈의 역전파는 출력 쪽 미분값을 그대로 흘려보냅니다.
+
+def add(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Add()(x0, x1)
+
+class Mul(Function):
+    def forward(self, x0, x1):
+        y = x0 * x1
+        return y
+
+    def backward(self, gy):
+        x0, x1 = self.inputs[0].data, self.inputs[1].data
+        return gy * x1, gy * x0
+
+def mul(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Mul()(x0, x1)
+
+class Neg(Function):
+    def forward(self, x):
+        return -x
+
+    def backward(self, gy):
+        return -gy
+
+def neg(x):
+    return Neg()(x)
+
+class Sub(Function):
+    def forward(self, x0, x1):
+        y = x0 - x1
+        return y
+
+    def backward(self, gy):
+        return gy, -gy
+
+def sub(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Sub()(x0, x1)
+
+def rsub(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Sub()(x1, x0) # x0과 x1의 순서를 바꿉니다.
+
+class Div(Function):
+    def forward(self, x0, x1):
+        y = x0 / x1
+        return y
+
+    def backward(self, gy):
+        x0, x1 = self.inputs[0].data, self.inputs[1].data
+        gx0 = gy / x1
+        gx1 = gy * (-x0 / x1 ** 2)
+        return gx0, gx1
+
+def div(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Div()(x0, x1)
+
+def rdiv(x0, x1):
+    x1 = as_variable(x1, x0)
+    return Div()(x1, x0)
+
+class Pow(Function):
+    def __init__(self, c):
+        self.c = c # 지수가 상수인 경우
+
+    def forward(self, x):
+        y = x ** self.c
+        return y
+
+    def backward(self, gy):
+        x = self.inputs[0].data
+        c = self.c
+        gx = c * x ** (c - 1) * gy
+        return gx
+
+class Power(Function): # 지수도 변수인 경우: y = x0 ** x1
+    def forward(self, x0, x1):
+        y = x0 ** x1
+        return y
+
+    def backward(self, gy):
+        x0, x1 = self.inputs[0].data, self.inputs[1].data
+        gx0 = gy * x1 * x0 ** (x1 - 1)
+        gx1 = gy * x0 ** x1 * np.log(x0)
+        return gx0, gx1
+
+def pow(x, c):
+    if isinstance(c, Variable):
+        return Power()(x, c)
+    return Pow(c)(x)
+
+def rpow(x, c):
+    c = as_variable(c, x)
+    return Power()(c, x) # 2.0 ** x처럼 밑이 상수인 경우
+
+class SqureTest(unittest.TestCase):
+    def test_forward(self):
+        x = Variable(np.array(2.0))
+        y = square(x)
+        expected = np.array(4.0)
+        self.assertEqual(y.data, expected)
+
+    def test_backward(self):
+        x = Variable(np.array(3.0))
+        y = square(x)
+        y.backward()
+        expected = np.array(6.0)
+        self.assertEqual(x.grad, expected)
+
+    def test_gradient_check(self):
+        x = Variable(np.random.rand(1))
+        self.assertTrue(gradient_check(square, x))
+
+class OverloadTest(unittest.TestCase):
+    def test_operators(self):
+        a = Variable(np.array(3.0))
+        b = Variable(np.array(2.0))
+        y = -(a * b + a / b - b) ** 2
+        y.backward()
+        self.assertAlmostEqual(float(y.data), -(6.0 + 1.5 - 2.0) ** 2)
+        # dy/da = -2u(b + 1/b), dy/db = -2u(a - a/b^2 - 1), u = ab + a/b - b
+        u = 5.5
+        self.assertAlmostEqual(float(a.grad), -2 * u * (2.0 + 0.5))
+        self.assertAlmostEqual(float(b.grad), -2 * u * (3.0 - 0.75 - 1))
+
+    def test_scalar_and_ndarray(self):
+        x = Variable(np.array(2.0))
+        y = 3.0 - x
+        self.assertEqual(y.data, np.array(1.0))
+        y = 1.0 / x
+        self.assertEqual(y.data, np.array(0.5))
+        y = np.array([1.0, 2.0]) + x # __array_priority__ 덕분에 Variable.__radd__가 호출됩니다.
+        self.assertIsInstance(y, Variable)
+        self.assertTrue(np.array_equal(y.data, [3.0, 4.0]))
+
+    def test_constant_cache(self):
+        x = Variable(np.array(2.0))
+        self.assertIs(as_variable(3.0, x), as_variable(3.0, x))
+        self.assertIsNot(as_variable(1, x), as_variable(True, x))
+        y = x * 3.0
+        y.backward()
+        self.assertIsNone(as_variable(3.0, x).grad) # 공유 상수에는 미분값이 쌓이지 않습니다.
+        as_variable(0.0, x)
+        with np.errstate(divide='ignore'):
+            self.assertEqual((Variable(np.array(1.0)) / -0.0).data, -np.inf)
+        self.assertTrue(np.signbit((x * -0.0).data))
+
+    def test_keep_dtype(self):
+        x = Variable(np.array([1.0, 2.0], dtype=np.float32))
+        self.assertEqual((x * 2.0 + 1).data.dtype, np.float32)
+
+    def test_pow(self):
+        x = Variable(np.array(3.0))
+        y = 2.0 ** x # __rpow__
+        y.backward()
+        self.assertAlmostEqual(float(y.data), 8.0)
+        self.assertAlmostEqual(float(x.grad), 8.0 * np.log(2.0))
+        self.assertIsInstance(np.array(2.0) ** x, Variable)
+
+        x0, x1 = Variable(np.random.rand(3) + 0.5), Variable(np.random.rand(3))
+        self.assertTrue(gradient_check(lambda x0, x1: x0 ** x1, x0, x1))
+
+    def test_gradient_check(self):
+        x0 = Variable(np.random.rand(3, 4) + 1.0)
+        x1 = Variable(np.random.rand(3, 4) + 1.0)
+        f = lambda x0, x1: (x0 - 2.0 * x1) / x1 + x0 ** 3
+        self.assertTrue(gradient_check(f, x0, x1))
+
+class GradientCheckTest(unittest.TestCase):
+    def test_large_tensor(self):
+        x = Variable(np.random.rand(50, 60))
+        self.assertTrue(gradient_check(lambda x: exp(square(x)), x))
+
+    def test_multiple_inputs(self):
+        x0 = Variable(np.random.rand(3, 4))
+        x1 = Variable(np.random.rand(3, 4))
+        f = lambda x0, x1: square(x0) + exp(x1)
+        self.assertTrue(gradient_check(f, x0, x1, max_elements=2 * 5 * 12)) # 5개씩 나누어 순전파
+
+    def test_same_input_twice(self):
+        x = Variable(np.random.rand(10))
+        self.assertTrue(gradient_check(lambda x: x + square(x), x))
+
+    # 역전파가 틀리면 기울기 확인이 실패해야 합니다.
+    def test_detect_wrong_backward(self):
+        class WrongSquare(Square):
+            def backward(self, gy):
+                return 3 * self.inputs[0].data * gy
+
+        x = Variable(np.random.rand(5))
+        self.assertFalse(gradient_check(lambda x: WrongSquare()(x), x))
+
+class MemoryTest(unittest.TestCase):
+    # 기본적으로 말단 변수의 미분값만 남기고 중간 변수의 미분값은 삭제합니다.
+    def test_retain_grad(self):
+        x0 = Variable(np.array(1.0))
+        x1 = Variable(np.array(1.0))
+        t = add(x0, x1)
+        y = add(x0, t)
+        y.backward()
+        self.assertIsNone(y.grad)
+        self.assertIsNone(t.grad)
+        self.assertEqual(x0.grad, np.array(2.0))
+        self.assertEqual(x1.grad, np.array(1.0))
+
+    def test_retain_grad_true(self):
+        x = Variable(np.array(2.0))
+        t = square(x)
+        y = exp(t)
+        y.backward(retain_grad=True)
+        self.assertEqual(y.grad, np.array(1.0))
+        self.assertEqual(t.grad, np.exp(4.0))
+
+    # GC가 꺼져 있어도 출력 변수가 사라지면 계산 그래프 전체가 참조 카운트만으로 해제되어야 합니다.
+    def test_no_reference_cycle(self):
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            x = Variable(np.random.randn(100))
+            t = square(x)
+            f = weakref.ref(t.creator)
+            t_ref = t.creator.outputs[0]
+            y = square(square(t))
+            y.backward()
+            del t, y
+            self.assertIsNone(f())
+            self.assertIsNone(t_ref())
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+class NoGradTest(unittest.TestCase):
+    def test_no_grad(self):
+        x = Variable(np.array(2.0))
+        with no_grad():
+            y = add(square(x), exp(x))
+        self.assertIsNone(y.creator)
+        self.assertEqual(y.data, np.array(4.0) + np.exp(2.0))
+        self.assertTrue(Config.enable_backprop) # with 블록을 벗어나면 원래 설정으로 돌아옵니다.
+
+    def test_restore_on_error(self):
+        with self.assertRaises(ValueError):
+            with no_grad():
+                raise ValueError()
+        self.assertTrue(Config.enable_backprop)
+
+    def test_using_config(self):
+        with using_config('enable_backprop', False):
+            with using_config('enable_backprop', True):
+                y = square(Variable(np.array(1.0)))
+                self.assertIsNotNone(y.creator)
+            y = square(Variable(np.array(1.0)))
+            self.assertIsNone(y.creator)
+
+class AddTest(unittest.TestCase):
+    # 같은 변수를 반복 사용: y = x + x 의 미분은 2
+    def test_same_variable(self):
+        x = Variable(np.array(3.0))
+        y = add(x, x)
+        y.backward()
+        self.assertEqual(x.grad, np.array(2.0))
+
+    # 분기가 있는 그래프: y = (x^2)^2 + (x^2)^2 = 2x^4, dy/dx = 8x^3
+    def test_branch(self):
+        x = Variable(np.array(2.0))
+        a = square(x)
+        y = add(square(a), square(a))
+        y.backward()
+        self.assertEqual(y.data, np.array(32.0))
+        self.assertEqual(x.grad, np.array(64.0))
+
+    # 공유된 부분식이 겹겹이 쌓여도 각 함수의 backward는 한 번만 호출되어야 합니다.
+    def test_visit_once(self):
+        calls = []
+
+        class CountingAdd(Add):
+            def backward(self, gy):
+                calls.append(self)
+                return super().backward(gy)
+
+        x = Variable(np.array(1.0))
+        y = x
+        depth = 30
+        for _ in range(depth):
+            y = CountingAdd()(y, y) # y = 2^depth * x
+        y.backward()
+        self.assertEqual(len(calls), depth)
+        self.assertEqual(x.grad, np.array(2.0 ** depth))
+
+a = Variable(np.array(3.0))
+b = Variable(np.array(2.0))
+c = Variable(np.array(1.0))
+
+y = a * b + c # y = add(mul(a, b), c)
+y.backward()
+print(y.data) # 7.0
+print(a.grad) # 2.0
+print(b.grad) # 3.0
+
+x = Variable(np.array(2.0))
+y = np.array([2.0]) + x # ndarray와 함께 사용
+print(y.data) # [4.]
+y = 3.0 * x + 1.0 # 스칼라와 함께 사용
+print(y.data) # 7.0
+y = 2.0 - x ** 3 / 4.0
+print(y.data) # 0.0
+
+# python -m unittest steps/step17.py
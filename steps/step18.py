@@ -0,0 +1,166 @@
+# 패키지로 정리, __slots__로 노드 경량화
+
+# 지금까지 파일 하나에 모든 코드를 적었지만, 이제 재사용할 수 있도록 dezero 패키지로 옮깁니다.
+# dezero/core.py      : Config, Variable, Function, 사칙연산
+# dezero/functions.py : Square, Exp 등 함수
+# dezero/utils.py     : gradient_check 등 유틸리티
+
+# 계산 그래프가 커지면 Variable과 Function 인스턴스가 수백만 개씩 만들어집니다.
+# 파이썬 객체는 기본적으로 인스턴스마다 속성을 담는 딕셔너리(__dict__)를 가지므로, 이것만으로도 메모리와 생성 시간이 듭니다.
+# __slots__로 속성 이름을 미리 선언하면 __dict__ 없이 고정된 자리에 속성을 저장합니다.
+# 약한 참조(weakref)를 쓰기 위해 '__weakref__'도 함께 선언합니다.
+# 주의: 하위 클래스에서 __slots__를 선언하지 않으면 __dict__가 다시 생기므로, Square, Exp 등에도 __slots__ = ()를 선언합니다.
+
+if '__file__' in globals(): # 터미널에서 python 명령으로 실행할 때 부모 디렉터리(dezero 패키지 위치)를 모듈 검색 경로에 추가합니다.
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import contextlib
+import gc
+import importlib.util
+import io
+import os
+import time
+import tracemalloc
+import unittest
+import numpy as np
+from dezero import Variable, Config, using_config
+from dezero.functions import square, exp
+from dezero.utils import gradient_check, numerical_grad
+
+class SlotsTest(unittest.TestCase):
+    def test_no_dict(self):
+        x = Variable(np.array(1.0))
+        y = exp(square(x))
+        for obj in (x, y, y.creator, x * 2.0):
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+    def test_backward(self):
+        x = Variable(np.array(0.5))
+        y = square(exp(square(x)))
+        y.backward()
+        self.assertAlmostEqual(float(x.grad), 3.297442541400256)
+
+    def test_gradient_check(self):
+        x = Variable(np.random.rand(10))
+        self.assertTrue(gradient_check(lambda x: exp(square(x)) / 2.0 - x ** 3, x))
+
+    def test_config_extended(self):
+        # Function.__call__은 Config.extended 하나로 autocast, 훅, Arena, 순전파 모드를 모두 건너뜁니다.
+        self.assertFalse(Config.extended)
+        for name, value in (('compute_dtype', np.float32), ('function_hooks', (object(),)),
+                            ('array_arena', object()), ('enable_forward_ad', True)):
+            with using_config(name, value):
+                self.assertTrue(Config.extended)
+            self.assertFalse(Config.extended)
+
+    def test_numerical_grad_memory(self):
+        x = Variable(np.random.rand(4000))
+        tracemalloc.start()
+        grad = numerical_grad(lambda x: exp(x), [x], 0, max_elements=2 ** 16)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertLess(peak, 4 * 2 ** 16 * 8) # 섭동을 쌓은 입력과 출력 몇 개 분량 (N에 비례하지 않습니다)
+        self.assertTrue(np.allclose(grad, np.exp(x.data)))
+
+    def test_pow(self):
+        x = Variable(np.array(3.0))
+        y = 2.0 ** x
+        y.backward()
+        self.assertAlmostEqual(float(x.grad), 8.0 * np.log(2.0))
+        self.assertIsInstance(np.array(2.0) ** x, Variable)
+        x0, x1 = Variable(np.random.rand(3, 4) + 0.5), Variable(np.random.rand(4))
+        self.assertTrue(gradient_check(lambda x0, x1: x0 ** x1, x0, x1)) # 지수도 변수 (브로드캐스트)
+
+    def test_negative_zero(self):
+        x = Variable(np.array(2.0))
+        x * 0.0 # 0.0의 상수가 캐시된 뒤에도 -0.0과 구별합니다.
+        self.assertTrue(np.signbit((x * -0.0).data))
+        with np.errstate(divide='ignore'):
+            self.assertEqual((x / -0.0).data, -np.inf)
+
+x = Variable(np.array(0.5), name='x')
+y = square(exp(square(x)))
+y.backward()
+print(x.grad) # 3.297442541400256
+print(x.shape, x.ndim, x.dtype) # () 0 float64
+print(x) # variable(0.5)
+
+# 마이크로벤치마크: 노드(Function 하나 + 출력 Variable 하나)당 메모리와 초당 생성 노드 수
+# 비교 대상(before)은 __dict__를 가진 step17의 구현입니다.
+# 이후 단계에서 dezero 패키지의 노드는 더 많은 일을 합니다. (배열 모듈 선택, 그래프에서 data를 붙잡지 않는 대리 변수,
+# Config의 설정 확인 등) 그래서 step17과의 속도 차이에는 __slots__ 이외의 비용도 섞이므로,
+# __slots__만의 효과는 같은 속성을 가진 두 클래스(_DictNode, _SlotNode)의 생성으로 따로 측정합니다.
+def load_step17():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'step17.py')
+    spec = importlib.util.spec_from_file_location('step17', path)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()): # step17 실행 시의 출력은 숨깁니다.
+        spec.loader.exec_module(module)
+    return module
+
+def bench(Variable, square, n=100000):
+    x = Variable(np.array(1.0))
+    tracemalloc.start()
+    y = x
+    for _ in range(n):
+        y = square(y)
+    size, _ = tracemalloc.get_traced_memory() # 그래프가 살아 있는 상태에서 측정합니다.
+    tracemalloc.stop()
+    del y
+
+    # tracemalloc의 추적 비용을 빼기 위해 생성 속도는 따로 측정합니다. (GC를 끄고 5번 중 가장 빠른 값)
+    best = float('inf')
+    for _ in range(5):
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        y = x
+        for _ in range(n):
+            y = square(y)
+        best = min(best, time.perf_counter() - start)
+        gc.enable()
+        del y
+    return size / n, n / best
+
+class _DictNode:
+    def __init__(self, data):
+        self.data = data
+        self.grad = None
+        self.creator = None
+        self.generation = 0
+
+class _SlotNode:
+    __slots__ = ('data', 'grad', 'creator', 'generation')
+
+    def __init__(self, data):
+        self.data = data
+        self.grad = None
+        self.creator = None
+        self.generation = 0
+
+def bench_objects(cls, n=100000):
+    tracemalloc.start()
+    nodes = [cls(None) for _ in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del nodes
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        nodes = [cls(None) for _ in range(n)]
+        best = min(best, time.perf_counter() - start)
+        del nodes
+    return size / n, n / best
+
+if __name__ == '__main__':
+    step17 = load_step17()
+    for label, (V, f) in [('before (__dict__)', (step17.Variable, step17.square)),
+                          ('after (__slots__)', (Variable, square))]:
+        bytes_per_node, nodes_per_sec = bench(V, f)
+        print('{:18s}: {:6.1f} bytes/node, {:9.0f} nodes/sec'.format(label, bytes_per_node, nodes_per_sec))
+    for label, cls in [('__dict__ object', _DictNode), ('__slots__ object', _SlotNode)]:
+        bytes_per_obj, objs_per_sec = bench_objects(cls)
+        print('{:18s}: {:6.1f} bytes/obj,  {:9.0f} objs/sec'.format(label, bytes_per_obj, objs_per_sec))
+
+# python -m unittest steps/step18.py
@@ -0,0 +1,140 @@
+# 계산 그래프 캡처와 재생 (테이프)
+
+# 학습 루프는 반복할 때마다 Function.__call__로 똑같은 모양의 계산 그래프를 다시 만들고,
+# Variable.backward는 그 그래프를 다시 정렬하며 따라갑니다.
+# 그래프의 모양이 바뀌지 않는다면, 한 번만 만들어 기록(trace)해 두고 이후에는 기록을 재생하면 됩니다.
+# dezero/tape.py의 Tape는
+# 1. 순전파 순서(세대 순)대로 (함수, 입력 변수, 출력 변수)를 평평한 리스트로 기록하고,
+# 2. 역전파에서 각 기울기를 대입할지 더할지를 미리 정해 둡니다.
+# 재생할 때는 기록된 변수의 data만 바꿔 끼우고 forward/backward를 차례로 호출하므로,
+# Variable/Function 객체를 새로 만들지 않고 세대 정렬도 하지 않습니다.
+# 역전파에 필요 없는 중간 결과는 Function.__call__과 같이 마지막으로 쓰인 뒤 버리고, 이전 재생의 결과도
+# 새 출력을 만들기 전에 버리므로 최대 메모리가 매번 그래프를 만드는 방식보다 크지 않습니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import tracemalloc
+import unittest
+import numpy as np
+from dezero import Variable, Function
+from dezero.functions import square, exp
+from dezero.tape import trace
+
+def rosenbrock(x0, x1):
+    y = 100 * (x1 - x0 ** 2) ** 2 + (1 - x0) ** 2
+    return y
+
+class TapeTest(unittest.TestCase):
+    def test_same_as_backward(self):
+        x = Variable(np.random.rand(3, 4))
+        w = Variable(np.random.rand(3, 4))
+        f = lambda x: exp(square(x * w)) + x / w - x
+
+        y = f(x)
+        y.backward()
+        expected_gx, expected_gw = x.grad, w.grad
+
+        tape = trace(f, Variable(np.zeros((3, 4))))
+        out = tape(x.data)
+        self.assertTrue(np.allclose(out, y.data))
+        self.assertTrue(np.allclose(tape.inputs[0].grad, expected_gx))
+        self.assertTrue(np.allclose(w.grad, expected_gw)) # 함수 밖의 변수(파라미터)의 기울기도 구합니다.
+
+    def test_replay_creates_no_nodes(self):
+        calls = []
+        call = Function.__call__
+
+        def counting_call(self, *inputs):
+            calls.append(self)
+            return call(self, *inputs)
+
+        x0 = Variable(np.array(0.0))
+        x1 = Variable(np.array(2.0))
+        tape = trace(rosenbrock, x0, x1)
+        Function.__call__ = counting_call
+        try:
+            for _ in range(3):
+                tape(x0.data, x1.data)
+        finally:
+            Function.__call__ = call
+        self.assertEqual(len(calls), 0)
+        self.assertEqual(float(x0.grad), -2.0)
+        self.assertEqual(float(x1.grad), 400.0)
+
+    def test_peak_memory(self):
+        # 재생도 역전파에 필요 없는 중간 결과를 버리므로, 최대 메모리가 매번 그래프를 만드는 방식보다 크지 않습니다.
+        x0 = Variable(np.random.rand(200, 200))
+        x1 = Variable(np.random.rand(200, 200))
+        def peak(step):
+            step()
+            tracemalloc.start()
+            step()
+            size = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return size
+        def eager():
+            x0.cleargrad()
+            x1.cleargrad()
+            rosenbrock(x0, x1).backward()
+        tape = trace(rosenbrock, x0, x1)
+        self.assertLessEqual(peak(lambda: tape(x0.data, x1.data)), peak(eager))
+
+    def test_shape_mismatch(self):
+        tape = trace(square, Variable(np.zeros(3)))
+        with self.assertRaises(ValueError):
+            tape(np.zeros(4))
+
+x0 = Variable(np.array(0.0))
+x1 = Variable(np.array(2.0))
+lr = 0.001
+iters = 10000
+
+# 기존 방식: 매 반복 계산 그래프를 새로 만듭니다.
+start = time.perf_counter()
+for i in range(iters):
+    y = rosenbrock(x0, x1)
+    x0.cleargrad()
+    x1.cleargrad()
+    y.backward()
+    x0.data = x0.data - lr * x0.grad
+    x1.data = x1.data - lr * x1.grad
+t_eager = time.perf_counter() - start
+print(x0, x1) # variable(0.9944984367782456) variable(0.9890050527419593)
+
+# 테이프: 처음 한 번만 기록하고 이후에는 재생합니다.
+x0 = Variable(np.array(0.0))
+x1 = Variable(np.array(2.0))
+start = time.perf_counter()
+tape = trace(rosenbrock, x0, x1)
+for i in range(iters):
+    tape(x0.data, x1.data)
+    x0.data = x0.data - lr * x0.grad
+    x1.data = x1.data - lr * x1.grad
+t_tape = time.perf_counter() - start
+print(x0, x1) # 같은 결과
+
+print('eager: {:.1f} us/step, tape: {:.1f} us/step'.format(t_eager / iters * 1e6, t_tape / iters * 1e6))
+
+# 큰 배열: 함수 호출의 비용보다 계산과 메모리가 중요합니다.
+x0 = Variable(np.random.rand(1000, 1000))
+x1 = Variable(np.random.rand(1000, 1000))
+def eager():
+    x0.cleargrad()
+    x1.cleargrad()
+    rosenbrock(x0, x1).backward()
+tape = trace(rosenbrock, x0, x1)
+for name, step in (('eager', eager), ('tape', lambda: tape(x0.data, x1.data))):
+    step()
+    tracemalloc.start()
+    step()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for i in range(20):
+        step()
+    print('{}: {:.1f} ms/step, peak {:.1f} MB'.format(name, (time.perf_counter() - start) / 20 * 1e3, peak / 1e6))
+
+# python -m unittest steps/step19.py
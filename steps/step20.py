@@ -0,0 +1,90 @@
+# 원소별 함수 융합 (elementwise fusion)
+
+# step10의 square(exp(square(x)))는 순전파에서 함수마다 임시 ndarray를 새로 만들고, 역전파에서도 또 만듭니다.
+# 게다가 Exp.backward는 순전파에서 이미 구한 exp(x)를 다시 계산하고 있었습니다.
+# 1. Exp.backward가 저장된 출력(self.outputs[0]())을 재사용하도록 수정합니다. (dezero/functions.py)
+# 2. 기록한 테이프에서, 중간 결과가 바로 다음 함수에서만 쓰이는 원소별 함수의 체인을 찾아 하나의 함수(FusedElementwise)로 합칩니다.
+#    합친 함수는 np.square(x, out=buf)처럼 ufunc의 out= 인수로 미리 만든 버퍼에 결과를 쓰고,
+#    역전파에서도 기울기를 하나의 버퍼에서 제자리(in-place)로 갱신합니다.
+# trace(fn, x, fuse=True)로 사용합니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import tracemalloc
+import unittest
+import numpy as np
+from dezero import Variable
+from dezero.functions import square, exp
+from dezero.tape import trace, FusedElementwise
+
+class FusionTest(unittest.TestCase):
+    def check(self, f, x, n_entries):
+        tape = trace(f, Variable(x.copy()))
+        fused = trace(f, Variable(x.copy()), fuse=True)
+        self.assertEqual(len(fused.forward_tape), n_entries)
+        for _ in range(2): # 버퍼를 재사용하는 두 번째 재생도 같은 결과여야 합니다.
+            self.assertTrue(np.allclose(tape(x), fused(x)))
+            self.assertTrue(np.allclose(tape.inputs[0].grad, fused.inputs[0].grad))
+
+    def test_chain(self):
+        x = np.random.rand(10, 10)
+        self.check(lambda x: square(exp(square(x))), x, 1)
+        self.assertIsInstance(trace(lambda x: square(exp(square(x))), Variable(x), fuse=True).forward_tape[0][0],
+                              FusedElementwise)
+
+    def test_pow_neg(self):
+        x = np.random.rand(10) + 0.5
+        self.check(lambda x: exp(-(x ** 3)) ** 2, x, 1)
+
+    # 중간 결과를 두 곳에서 쓰면 그 지점에서 체인을 끊습니다.
+    def test_shared_intermediate(self):
+        x = np.random.rand(10)
+        def f(x):
+            a = exp(square(x))
+            return square(a) * a
+        self.check(f, x, 3) # Fused(square, exp), square, mul
+
+    def test_exp_backward(self):
+        x = Variable(np.array(2.0))
+        y = exp(x)
+        y.backward()
+        self.assertEqual(x.grad, np.exp(2.0))
+
+def f(x):
+    return square(exp(square(x)))
+
+def bench(step, x, n=50):
+    step(x)
+    tracemalloc.start()
+    step(x)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(n):
+        step(x)
+    return (time.perf_counter() - start) / n, peak
+
+if __name__ == '__main__':
+    x = np.random.rand(1000, 1000) * 0.5
+
+    def eager(x):
+        v = Variable(x)
+        y = f(v)
+        y.backward()
+        return y.data
+
+    for label, step in [('eager', eager),
+                        ('tape', trace(f, Variable(x))),
+                        ('tape + fusion', trace(f, Variable(x), fuse=True))]:
+        t, peak = bench(step, x)
+        print('{:14s}: {:6.2f} ms/step, peak {:5.1f} MB'.format(label, t * 1e3, peak / 2 ** 20))
+
+x = Variable(np.array(0.5))
+tape = trace(f, x, fuse=True)
+print(tape(x.data)) # 1.648721270700128
+print(x.grad) # 3.297442541400256
+
+# python -m unittest steps/step20.py
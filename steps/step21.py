@@ -0,0 +1,93 @@
+# 고계 미분 (create_graph)
+
+# 지금까지의 backward는 ndarray로 계산하므로, 구한 미분값을 다시 미분할 수 없었습니다.
+# 1. Variable.backward(create_graph=True)이면 역전파를 역전파 활성 모드에서 수행해, 역전파 계산도 계산 그래프로 만듭니다.
+#    이때 미분값(grad)은 ndarray가 아니라 Variable이 됩니다.
+# 2. 각 함수의 backward는 self.retained_inputs(), self.retained_outputs()로 순전파의 입력/출력을 꺼냅니다.
+#    create_graph=True면 Variable을, 아니면 ndarray를 돌려주므로 같은 backward 코드로 두 경우를 모두 처리합니다.
+#    (기본 모드는 지금까지처럼 ndarray로만 계산하므로 추가 비용이 없고, 테이프 재생도 그대로 동작합니다.)
+# 3. dezero.functional.hvp(f, x, v)는 헤세 행렬을 만들지 않고 헤세 행렬-벡터 곱을 역전파 두 번으로 구합니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+import numpy as np
+from dezero import Variable
+from dezero.functions import square, exp
+from dezero.functional import hvp
+from dezero.utils import gradient_check
+
+def f(x):
+    y = x ** 4 - 2 * x ** 2
+    return y
+
+class HigherOrderTest(unittest.TestCase):
+    def test_second_derivative(self):
+        x = Variable(np.array(2.0))
+        y = f(x)
+        y.backward(create_graph=True)
+        gx = x.grad
+        self.assertIsInstance(gx, Variable)
+        self.assertEqual(gx.data, 24.0) # 4x^3 - 4x
+        x.cleargrad()
+        gx.backward()
+        self.assertEqual(x.grad, 44.0) # 12x^2 - 4
+
+    def test_exp_third_derivative(self):
+        x = Variable(np.array(1.0))
+        y = exp(square(x)) # y''' = (12x + 8x^3) exp(x^2)
+        y.backward(create_graph=True)
+        for _ in range(2):
+            gx = x.grad
+            x.cleargrad()
+            gx.backward(create_graph=True)
+        self.assertAlmostEqual(float(x.grad.data), 20 * np.e)
+
+    def test_default_grad_is_ndarray(self):
+        x = Variable(np.array([1.0, 2.0]))
+        f(x).backward()
+        self.assertIsInstance(x.grad, np.ndarray)
+
+    def test_hvp(self):
+        x = np.random.rand(5) + 0.5
+        v = np.random.rand(5)
+        # 원소별 함수의 헤세 행렬은 대각 행렬 diag(f''(x))입니다.
+        hv = hvp(lambda x: x ** 3 + exp(x), x, v)
+        self.assertTrue(np.allclose(hv, (6 * x + np.exp(x)) * v))
+        self.assertTrue(np.allclose(hvp(lambda x: 3 * x, x, v), 0))
+
+    def test_gradient_check(self):
+        x = Variable(np.random.rand(10))
+        self.assertTrue(gradient_check(lambda x: exp(-x) / (1 + x ** 2), x))
+
+    def test_power(self):
+        x = np.random.rand(4) + 0.5
+        v = np.random.rand(4)
+        self.assertTrue(np.allclose(hvp(lambda x: 2.0 ** x, x, v), 2.0 ** x * np.log(2.0) ** 2 * v))
+        self.assertTrue(np.allclose(hvp(lambda x: x ** Variable(np.array(3.0)), x, v), 6 * x * v))
+
+# 뉴턴 방법으로 최적화: x <- x - f'(x) / f''(x)
+x = Variable(np.array(2.0))
+iters = 10
+
+for i in range(iters):
+    print(i, x)
+
+    y = f(x)
+    x.cleargrad()
+    y.backward(create_graph=True)
+
+    gx = x.grad
+    x.cleargrad()
+    gx.backward()
+    gx2 = x.grad
+
+    x.data = x.data - gx.data / gx2
+# 0 variable(2.0)
+# 1 variable(1.4545454545454546)
+# ...
+# 9 variable(1.0)
+
+# python -m unittest steps/step21.py
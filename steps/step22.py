@@ -0,0 +1,79 @@
+# 순전파 모드 자동 미분 (JVP)
+
+# 역전파(역방향 모드)는 출력 하나에 대한 모든 입력의 미분을 한 번에 구하므로, 입력이 많고 출력이 적을 때 유리합니다.
+# 반대로 입력이 적고 출력이 많으면, 입력 방향의 미분(tangent)을 순전파와 함께 흘려보내는 순전파 모드가 유리합니다.
+# 1. 각 함수에 jvp(xs, ys, *txs) 메서드를 추가합니다. 입력의 tangent로부터 출력의 tangent를 구합니다.
+#    예) Square: 2x * tx, Exp: y * tx, Add: tx0 + tx1
+# 2. Config.enable_forward_ad가 True면 Function.__call__에서 출력의 tangent를 함께 계산합니다.
+# 3. dezero.functional.jvp(f, x, v)는 계산 그래프 없이(no_grad) 순전파 한 번으로 Jv를 구합니다.
+# 4. dezero.functional.jacobian(f, x)은 입력 원소 수 N과 출력 원소 수 M을 비교해
+#    N <= M이면 순전파 모드(N번), 아니면 역전파 모드(M번)로 야코비 행렬을 구합니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+import numpy as np
+from dezero import Variable, Config
+from dezero.functions import square, exp
+from dezero.functional import jvp, jacobian
+
+def f(x):
+    return exp(-square(x)) * x / (1 + x ** 2) - x
+
+class JvpTest(unittest.TestCase):
+    def test_jvp(self):
+        x = np.random.rand(4)
+        v = np.random.rand(4)
+        y, ty = jvp(f, x, v)
+        J = jacobian(f, x, mode='reverse')
+        self.assertTrue(np.allclose(y, f(Variable(x)).data))
+        self.assertTrue(np.allclose(ty, J @ v))
+        self.assertFalse(Config.enable_forward_ad)
+
+    def test_power(self):
+        x = np.random.rand(3) + 0.5
+        v = np.random.rand(3)
+        _, t = jvp(lambda x: x ** x, x, v) # d(x^x) = x^x (log x + 1)
+        self.assertTrue(np.allclose(t, x ** x * (np.log(x) + 1) * v))
+
+    # 입력 (4,) -> 출력 (3, 4): 순전파 모드는 브로드캐스트되는 출력도 그대로 다룹니다.
+    def test_broadcast_output(self):
+        w = np.random.rand(3, 4)
+        g = lambda x: square(x * w) + exp(x)
+        x = np.random.rand(4)
+        J_fwd = jacobian(g, x)
+        self.assertEqual(J_fwd.shape, (3, 4, 4))
+        expected = np.zeros((3, 4, 4))
+        for i in range(3):
+            expected[i] = np.diag(2 * x * w[i] ** 2 + np.exp(x))
+        self.assertTrue(np.allclose(J_fwd, expected))
+
+    def test_auto_mode(self):
+        x = np.random.rand(5)
+        self.assertTrue(np.allclose(jacobian(f, x), jacobian(f, x, mode='forward')))
+        self.assertTrue(np.allclose(jacobian(f, x, mode='forward'), jacobian(f, x, mode='reverse')))
+
+    def test_no_graph(self):
+        x = Variable(np.array(1.0))
+        x.tangent = np.array(1.0)
+        Config.enable_forward_ad = True
+        try:
+            y = square(x)
+        finally:
+            Config.enable_forward_ad = False
+        self.assertEqual(y.tangent, 2.0)
+
+# 입력 1개, 출력 1000개인 함수: 순전파 모드는 순전파 한 번으로 모든 출력의 미분을 구합니다.
+t = np.linspace(0, 1, 1000)
+g = lambda x: exp(-x * t) * x
+
+y, ty = jvp(g, np.array(0.5), np.array(1.0))
+print(ty[:3]) # [1.         0.99899937 0.9979995 ]
+print(jacobian(g, np.array(0.5)).shape) # (1000,) 자동으로 순전파 모드를 선택합니다.
+
+x = np.random.rand(3)
+print(np.allclose(jacobian(f, x, mode='forward'), jacobian(f, x, mode='reverse'))) # True
+
+# python -m unittest steps/step22.py
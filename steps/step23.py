@@ -0,0 +1,79 @@
+# 배치로 묶은 야코비 행렬 계산 (vmap 스타일)
+
+# 야코비 행렬을 역전파로 구하려면 출력 원소마다 시작값을 바꿔 backward를 한 번씩 호출해야 했습니다.
+# 그때마다 파이썬으로 계산 그래프를 다시 따라가고, grad도 직접 초기화해야 합니다.
+# 대신 시작값 B개를 맨 앞 축으로 쌓아 (B,) + y.shape 모양의 기울기 하나로 만들어 한 번만 역전파합니다.
+# 각 함수의 backward/jvp는 gy(또는 tangent) 앞쪽에 붙은 배치 축을 그대로 유지합니다.
+# 원소별 함수는 브로드캐스트 덕분에 그대로 동작하고, 입력이 브로드캐스트되는 경우만 축을 맞춰 줍니다.
+# 1. dezero.functional.vjp(f, x, v, batched=True): B개의 vJ를 한 번의 역전파로 구합니다.
+# 2. dezero.functional.jvp(f, x, v, batched=True): B개의 Jv를 한 번의 순전파로 구합니다.
+# 3. jacobian은 두 모드 모두 단위 벡터를 배치로 쌓아 그래프를 한 번만 따라갑니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import unittest
+import numpy as np
+from dezero import Variable
+from dezero.functions import square, exp
+from dezero.functional import jvp, vjp, jacobian
+
+def f(x):
+    return exp(-square(x)) * x / (1 + x ** 2) - x
+
+class BatchedTest(unittest.TestCase):
+    def test_vjp_batched(self):
+        x = np.random.rand(6)
+        vs = np.random.rand(4, 6)
+        _, gx = vjp(f, x, vs, batched=True)
+        for v, g in zip(vs, gx):
+            self.assertTrue(np.allclose(vjp(f, x, v)[1], g))
+
+    def test_jvp_batched(self):
+        w = np.random.rand(3, 5)
+        g = lambda x: x * w + exp(x) / w
+        x = np.random.rand(5)
+        vs = np.random.rand(2, 5)
+        _, ty = jvp(g, x, vs, batched=True)
+        self.assertEqual(ty.shape, (2, 3, 5))
+        for v, t in zip(vs, ty):
+            self.assertTrue(np.allclose(jvp(g, x, v)[1], t))
+
+    def test_jacobian(self):
+        x = np.random.rand(5)
+        J_rev = jacobian(f, x, mode='reverse')
+        J_fwd = jacobian(f, x, mode='forward')
+        self.assertTrue(np.allclose(J_rev, J_fwd))
+        self.assertTrue(np.allclose(J_rev, np.diag(np.diag(J_rev)))) # 원소별 함수의 야코비 행렬은 대각 행렬입니다.
+
+    def test_shape_error(self):
+        with self.assertRaises(ValueError):
+            vjp(f, np.zeros(3), np.zeros((2, 4)), batched=True)
+
+# 야코비 행렬 (N = 500): 출력마다 backward를 호출하는 방법과 배치로 한 번 호출하는 방법의 비교
+def jacobian_loop(f, x):
+    x = Variable(x)
+    y = f(x)
+    rows = []
+    for i in range(y.size):
+        seed = np.zeros(y.size)
+        seed[i] = 1
+        x.cleargrad()
+        y.grad = seed.reshape(y.shape)
+        y.backward()
+        rows.append(x.grad.reshape(-1))
+    return np.stack(rows)
+
+x = np.random.rand(500)
+start = time.perf_counter()
+J0 = jacobian_loop(f, x)
+t_loop = time.perf_counter() - start
+start = time.perf_counter()
+J1 = jacobian(f, x, mode='reverse')
+t_batch = time.perf_counter() - start
+print(np.allclose(J0, J1)) # True
+print('loop: {:.1f} ms, batched: {:.1f} ms'.format(t_loop * 1e3, t_batch * 1e3))
+
+# python -m unittest steps/step23.py
@@ -0,0 +1,100 @@
+# 브로드캐스트 대응
+
+# Add.forward는 NumPy의 브로드캐스트 덕분에 (N, D) + (D,) 같은 계산을 할 수 있지만,
+# 역전파에서 기울기를 입력의 모양으로 되돌리지 않아 편향(bias)처럼 브로드캐스트되는 변수는 학습할 수 없었습니다.
+# 1. sum_to(x, shape): x의 원소를 더해 shape 모양으로 만듭니다. 역전파는 broadcast_to입니다.
+# 2. broadcast_to(x, shape): x를 shape 모양으로 브로드캐스트합니다. 역전파는 sum_to입니다.
+#    np.broadcast_to는 복사하지 않는 뷰를 돌려주므로, sum_to의 역전파는 기울기를 실제로 펼쳐 만들지 않습니다.
+# 3. Add, Sub, Mul, Div는 순전파에서 입력의 모양을 기억해 두고, 모양이 다를 때만 역전파에서 sum_to로 되돌립니다.
+#    상수 입력(Constant)의 기울기는 어차피 버려지므로 아예 계산하지 않습니다. (예: x * 2.0)
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+import numpy as np
+from dezero import Variable
+from dezero.functions import square, exp, sum_to, broadcast_to
+from dezero.functional import jacobian
+from dezero.utils import gradient_check
+
+class BroadcastTest(unittest.TestCase):
+    def test_add_bias(self):
+        x = Variable(np.random.rand(4, 3))
+        b = Variable(np.random.rand(3))
+        y = x + b
+        y.backward()
+        self.assertEqual(b.grad.shape, (3,))
+        self.assertTrue(np.allclose(b.grad, 4))
+
+    def test_gradient_check(self):
+        x0 = Variable(np.random.rand(4, 3) + 0.5)
+        x1 = Variable(np.random.rand(3) + 0.5)
+        x2 = Variable(np.random.rand(4, 1) + 0.5)
+        f = lambda x0, x1, x2: (x0 * x1 - x2) / x1 + x2 / (x0 + x1)
+        self.assertTrue(gradient_check(f, x0, x1, x2))
+
+    def test_sum_to_broadcast_to(self):
+        x = Variable(np.random.rand(2, 3))
+        self.assertTrue(gradient_check(lambda x: sum_to(x, (1, 3)) * 2.0, x))
+        x = Variable(np.random.rand(3))
+        self.assertTrue(gradient_check(lambda x: square(broadcast_to(x, (2, 3))), x))
+
+    def test_int_shape(self):
+        x = Variable(np.ones(3))
+        self.assertIs(broadcast_to(x, 3), x)
+        x = Variable(np.ones(1))
+        broadcast_to(x, 3).backward()
+        self.assertTrue(np.array_equal(x.grad, [3.0]))
+        x = Variable(np.ones(()))
+        broadcast_to(x, 4).backward()
+        self.assertEqual(x.grad, 4.0)
+        x = Variable(np.ones((2, 3)))
+        sum_to(x, [3]).backward()
+        self.assertTrue(np.array_equal(x.grad, np.ones((2, 3))))
+
+    def test_constant_grad_skipped(self):
+        x = Variable(np.random.rand(4, 3))
+        y = x * np.ones(3) - 1.0
+        y.backward()
+        self.assertEqual(x.grad.shape, (4, 3))
+
+    def test_batched_vjp(self):
+        w = np.random.rand(4, 3)
+        f = lambda b: exp(w * b) + b
+        b = np.random.rand(3)
+        J = jacobian(f, b, mode='reverse')
+        self.assertEqual(J.shape, (4, 3, 3))
+        self.assertTrue(np.allclose(J, jacobian(f, b, mode='forward')))
+
+    def test_create_graph(self):
+        x = Variable(np.random.rand(3))
+        y = square(x * np.ones((2, 3)))
+        y.backward(create_graph=True)
+        gx = x.grad
+        x.cleargrad()
+        gx.backward()
+        self.assertTrue(np.allclose(x.grad, 4)) # d/dx sum(2 * 2x) = 4
+
+# (N, 1) * (1,) + (1,) 브로드캐스트를 이용한 선형 회귀
+np.random.seed(0)
+x = np.random.rand(100, 1)
+t = 5 + 2 * x + np.random.rand(100, 1)
+
+W = Variable(np.zeros(1))
+b = Variable(np.zeros(1))
+lr = 0.1
+
+for i in range(1000):
+    y = x * W + b
+    loss = (y - t) ** 2 / len(x) # 역전파의 시작값이 1이므로 loss의 합(평균 제곱 오차)을 미분합니다.
+    W.cleargrad()
+    b.cleargrad()
+    loss.backward()
+    W.data -= lr * W.grad
+    b.data -= lr * b.grad
+
+print(W, b) # variable([1.93655202]) variable([5.55807954])
+
+# python -m unittest steps/step24.py
@@ -0,0 +1,156 @@
+# 텐서를 다루는 함수: reshape, transpose, sum, get_item, matmul
+
+# 지금까지는 원소별 계산(Square, Exp, Add 등)만 가능했습니다. 신경망을 만들려면 텐서의 모양을 바꾸고 합치는 함수가 필요합니다.
+# dezero/functions.py에 다음 함수를 추가하고, Variable에서도 x.reshape(), x.T, x.sum(), x[1:], x @ W로 쓸 수 있게 합니다.
+# - reshape / transpose : 순전파와 역전파 모두 NumPy 뷰를 돌려주므로 데이터를 복사하지 않습니다.
+# - sum                 : 역전파는 합친 축을 길이 1로 되돌린 뒤(뷰) np.broadcast_to(뷰)로 펼칩니다.
+# - get_item            : 순전파는 슬라이싱(기본 슬라이싱이면 뷰), 역전파는 np.add.at으로 기울기를 더해 넣습니다.
+# - matmul              : 역전파의 W.T, x.T도 뷰이며, 상수 입력(예: 학습 데이터 x)의 기울기는 계산하지 않습니다.
+# 모든 역전파는 앞쪽의 배치 축을 유지하므로 vjp(batched=True)와 jacobian에서도 그대로 사용할 수 있습니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import tracemalloc
+import unittest
+import numpy as np
+from dezero import Variable
+import dezero.functions as F
+from dezero.functional import jacobian
+from dezero.utils import gradient_check
+
+class TensorOpsTest(unittest.TestCase):
+    def test_gradient_check(self):
+        x = Variable(np.random.rand(2, 3, 4))
+        self.assertTrue(gradient_check(lambda x: F.exp(x.reshape(4, 6)), x))
+        self.assertTrue(gradient_check(lambda x: F.square(x.transpose(2, 0, 1)), x))
+        self.assertTrue(gradient_check(lambda x: x.sum(axis=1, keepdims=True) * x.sum(axis=(0, 2), keepdims=True), x))
+        self.assertTrue(gradient_check(lambda x: F.exp(x[1, :, [0, 0, 2]]), x))
+
+    def test_matmul_vector(self):
+        for K, M in ((3, 4), (3, 3)): # K == M이어도 잘못된 스칼라가 아닌 (K, M)의 기울기를 구합니다.
+            x = Variable(np.random.rand(K))
+            W = Variable(np.random.rand(K, M))
+            self.assertTrue(gradient_check(lambda x, W: F.matmul(x, W), x, W))
+            self.assertEqual(W.grad.shape, (K, M))
+        with self.assertRaises(ValueError):
+            F.matmul(Variable(np.random.rand(2, 3)), Variable(np.random.rand(3)))
+        with self.assertRaises(ValueError):
+            F.matmul(Variable(np.random.rand(2, 3)), Variable(np.random.rand(2, 3, 4)))
+
+    def test_matmul_batched(self):
+        x = Variable(np.random.rand(2, 5, 3))
+        W = Variable(np.random.rand(3, 4))
+        self.assertTrue(gradient_check(lambda x, W: F.matmul(x, W), x, W))
+        self.assertEqual(W.grad.shape, (3, 4))
+        f = lambda W: F.exp(x.data @ W / 4)
+        self.assertTrue(np.allclose(jacobian(f, W.data, mode='reverse'), jacobian(f, W.data, mode='forward')))
+
+    def test_reshape_int(self):
+        x = Variable(np.random.rand(3, 4))
+        for shape in (12, (12,), [12]):
+            x.cleargrad()
+            F.reshape(x, shape).backward()
+            self.assertEqual(x.grad.shape, (3, 4))
+        self.assertEqual(F.reshape(x, 4, 3).shape, (4, 3))
+        self.assertEqual(x.reshape(12).shape, (12,))
+
+    def test_matmul(self):
+        x = Variable(np.random.rand(5, 3))
+        W = Variable(np.random.rand(3, 4))
+        self.assertTrue(gradient_check(lambda x, W: F.matmul(x, W), x, W))
+        x.cleargrad()
+        W.cleargrad()
+        y = (x @ W).sum()
+        y.backward()
+        self.assertEqual(W.grad.shape, (3, 4))
+        self.assertTrue(np.allclose(x.grad, np.ones((5, 4)) @ W.data.T))
+
+    def test_views(self):
+        x = Variable(np.random.rand(3, 4))
+        for f in (lambda x: x.reshape(2, 6), lambda x: x.T):
+            x.cleargrad()
+            y = f(x)
+            self.assertTrue(np.shares_memory(y.data, x.data))
+            y.grad = np.random.rand(*y.shape)
+            y.backward(retain_grad=True)
+            self.assertTrue(np.shares_memory(x.grad, y.grad)) # 역전파도 복사하지 않습니다.
+        self.assertTrue(np.shares_memory(x[1:].data, x.data))
+
+        x.cleargrad()
+        y = x.sum(axis=0)
+        y.backward()
+        self.assertEqual(x.grad.strides[0], 0) # 펼치지 않은 브로드캐스트 뷰
+
+    def test_jacobian(self):
+        W = np.random.rand(3, 4)
+        f = lambda x: F.exp(x @ W).sum(axis=0)
+        x = np.random.rand(2, 3)
+        self.assertTrue(np.allclose(jacobian(f, x, mode='reverse'), jacobian(f, x, mode='forward')))
+
+    def test_create_graph(self):
+        x = Variable(np.random.rand(2, 3))
+        y = (x ** 3).sum()
+        y.backward(create_graph=True)
+        gx = x.grad
+        x.cleargrad()
+        gx[0].sum().backward()
+        expected = np.zeros((2, 3))
+        expected[0] = 6 * x.data[0]
+        self.assertTrue(np.allclose(x.grad, expected))
+
+def sigmoid(x):
+    return 1 / (1 + F.exp(-x))
+
+def predict(x, W1, b1, W2, b2, views=False):
+    h = sigmoid(x @ W1 + b1)
+    if views: # 모양만 바꾸는 연산을 끼워 넣어도 메모리 사용량이 늘지 않는지 확인합니다.
+        h = h.reshape(-1).reshape(h.shape).T.T
+    return h @ W2 + b2
+
+# 2층 신경망으로 sin 함수 회귀
+np.random.seed(0)
+x = np.random.rand(100, 1)
+t = np.sin(2 * np.pi * x) + np.random.rand(100, 1)
+
+I, H, O = 1, 10, 1
+W1 = Variable(0.01 * np.random.randn(I, H))
+b1 = Variable(np.zeros(H))
+W2 = Variable(0.01 * np.random.randn(H, O))
+b2 = Variable(np.zeros(O))
+params = [W1, b1, W2, b2]
+lr = 0.2
+
+def step(views=False):
+    y = predict(x, *params, views=views)
+    loss = ((y - t) ** 2).sum() / len(x)
+    for p in params:
+        p.cleargrad()
+    loss.backward()
+    for p in params:
+        p.data -= lr * p.grad
+    return loss
+
+for i in range(10000):
+    loss = step()
+    if i % 1000 == 0:
+        print(loss) # variable(0.8473...)에서 시작해 variable(0.07...) 근처까지 줄어듭니다.
+
+if __name__ == '__main__':
+    x = np.random.rand(10000, 1)
+    t = np.sin(2 * np.pi * x)
+    for views in (False, True):
+        step(views)
+        tracemalloc.start()
+        step(views)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        start = time.perf_counter()
+        for _ in range(100):
+            step(views)
+        elapsed = (time.perf_counter() - start) / 100
+        print('views={!s:5}: peak {:6.2f} MB/step, {:.2f} ms/step'.format(views, peak / 2 ** 20, elapsed * 1e3))
+
+# python -m unittest steps/step25.py
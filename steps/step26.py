@@ -0,0 +1,145 @@
+# 배열 모듈(backend)과 버퍼를 재사용하는 NumPy
+
+# 지금까지 Variable은 np.ndarray만 받았고, 함수들은 np.exp, np.ones_like처럼 NumPy를 직접 불렀습니다.
+# dezero/backend.py의 get_array_module(x)는 x를 계산할 모듈(numpy, cupy 등)을 돌려주고,
+# Variable, Function, as_array와 모든 함수의 순전파는 이 모듈(xp)의 함수를 사용합니다.
+# - CuPy가 설치되어 있으면 cupy.ndarray는 cupy로 계산합니다.
+# - register_array_module(배열 타입, 모듈)로 NumPy와 같은 이름의 함수를 가진 다른 라이브러리를 추가할 수 있습니다.
+# - Config.use_array_pool = True이면 numpy 대신 numpy_pool을 사용합니다.
+#   numpy_pool은 결과 배열을 (shape, dtype)별 버퍼 목록에서 꺼내고, 아무도 참조하지 않는 버퍼를 다시 사용하므로
+#   학습 루프처럼 같은 모양의 배열을 반복해서 만들 때 메모리 할당/해제를 줄입니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import unittest
+import numpy as np
+from dezero import Variable, using_config
+import dezero.functions as F
+from dezero.backend import get_array_module, register_array_module, numpy_pool
+
+class MyArray(np.ndarray):
+    pass
+
+class CountingNumpy:
+    """NumPy 함수를 호출한 횟수를 셉니다."""
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        self.calls.append(name)
+        return getattr(np, name)
+
+class BackendTest(unittest.TestCase):
+    def test_reuse(self):
+        x = Variable(np.random.rand(100))
+        with using_config('use_array_pool', True):
+            y = F.exp(x)
+            data = y.data
+            del y
+            self.assertIsNot(F.exp(x).data, data) # data가 아직 참조하고 있으므로 다른 버퍼
+            del data
+            y = F.exp(x)
+            z = F.exp(x)
+            self.assertIsNot(y.data, z.data)
+        self.assertTrue(np.allclose(y.data, np.exp(x.data)))
+        self.assertTrue(np.allclose(z.data, np.exp(x.data)))
+
+    def test_reuse_after_graph_freed(self):
+        x = Variable(np.random.rand(10, 10))
+        with using_config('use_array_pool', True):
+            F.square(F.exp(x)).sum().backward()
+            misses = numpy_pool.misses
+            for _ in range(3):
+                x.cleargrad()
+                F.square(F.exp(x)).sum().backward()
+        self.assertEqual(numpy_pool.misses, misses) # 두 번째 반복부터는 새 배열을 만들지 않습니다.
+        self.assertTrue(np.allclose(x.grad, 2 * np.exp(2 * x.data)))
+
+    def test_same_result(self):
+        x = np.random.rand(5, 3)
+        W = np.random.rand(3, 4)
+        f = lambda x, W: (F.exp(x @ W) * 2 - x.sum(axis=1, keepdims=True) / W.sum()).sum()
+        results = []
+        for use_pool in (False, True):
+            with using_config('use_array_pool', use_pool):
+                vx, vW = Variable(x.copy()), Variable(W.copy())
+                y = f(vx, vW)
+                y.backward()
+                results.append((y.data, vx.grad, vW.grad))
+        for a, b in zip(*results):
+            self.assertTrue(np.allclose(a, b))
+
+    def test_register(self):
+        self.assertIs(get_array_module(np.zeros(3).view(MyArray)), np) # 하위 클래스는 numpy로 계산합니다.
+        xp = CountingNumpy()
+        register_array_module(MyArray, xp)
+        x = Variable(np.random.rand(3).view(MyArray))
+        self.assertIs(get_array_module(x), xp)
+        y = F.exp(x)
+        y.backward()
+        self.assertIn('exp', xp.calls)
+        self.assertIn('ones_like', xp.calls)
+        self.assertTrue(np.allclose(x.grad, np.exp(x.data)))
+
+    def test_unsupported_type(self):
+        with self.assertRaises(TypeError):
+            Variable([1.0, 2.0])
+
+def sigmoid(x):
+    return 1 / (1 + F.exp(-x))
+
+def predict(x, W1, b1, W2, b2):
+    h = sigmoid(x @ W1 + b1)
+    return h @ W2 + b2
+
+# step25의 2층 신경망을 numpy_pool로 학습합니다.
+np.random.seed(0)
+x = np.random.rand(100, 1)
+t = np.sin(2 * np.pi * x) + np.random.rand(100, 1)
+
+I, H, O = 1, 10, 1
+W1 = Variable(0.01 * np.random.randn(I, H))
+b1 = Variable(np.zeros(H))
+W2 = Variable(0.01 * np.random.randn(H, O))
+b2 = Variable(np.zeros(O))
+params = [W1, b1, W2, b2]
+lr = 0.2
+
+def step(x, t):
+    y = predict(x, *params)
+    loss = ((y - t) ** 2).sum() / len(x)
+    for p in params:
+        p.cleargrad()
+    loss.backward()
+    for p in params:
+        p.data -= lr * p.grad
+    return loss
+
+with using_config('use_array_pool', True):
+    for i in range(10000):
+        loss = step(x, t)
+        if i % 1000 == 0:
+            print(loss) # step25와 같은 값: variable(0.8473...)에서 시작해 variable(0.07...) 근처까지 줄어듭니다.
+print(numpy_pool.stats())
+
+if __name__ == '__main__':
+    x = np.random.rand(10000, 1)
+    t = np.sin(2 * np.pi * x)
+    I, H, O = 1, 100, 1
+    for use_pool in (False, True):
+        np.random.seed(0)
+        params[:] = [Variable(0.01 * np.random.randn(I, H)), Variable(np.zeros(H)),
+                     Variable(0.01 * np.random.randn(H, O)), Variable(np.zeros(O))]
+        numpy_pool.clear()
+        with using_config('use_array_pool', use_pool):
+            step(x, t)
+            start = time.perf_counter()
+            for _ in range(100):
+                step(x, t)
+            elapsed = (time.perf_counter() - start) / 100
+        print('use_array_pool={!s:5}: {:.2f} ms/step, {}'.format(use_pool, elapsed * 1e3, numpy_pool.stats()))
+
+# python -m unittest steps/step26.py
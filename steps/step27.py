@@ -0,0 +1,118 @@
+# 버퍼 아레나 (Arena)
+
+# step26의 numpy_pool은 버퍼를 꺼낼 때마다 같은 모양의 버퍼 목록 전체를 훑으며 참조 카운트를 확인합니다.
+# dezero/backend.py의 Arena는 버퍼를 돌려받는 시점을 직접 알아냅니다.
+# 1. Function.__call__에서 출력 Variable의 data가 Arena의 버퍼이면, 그 Variable이 사라질 때 버퍼를 빈 목록에 돌려받습니다.
+# 2. Variable.backward에서 중간 변수의 기울기를 버릴 때, Tape를 재생하며 이전 결과를 덮어쓸 때도 돌려받습니다.
+# 3. 돌려받은 버퍼를 다른 곳에서 아직 참조하고 있을 수 있으므로, 다시 내주기 직전에 참조 카운트를 확인합니다.
+# hits(재사용), misses(새로 할당), peak_bytes(Arena가 가졌던 버퍼 크기의 최댓값)를 stats()로 확인할 수 있습니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import unittest
+import numpy as np
+from dezero import Variable, using_config
+import dezero.functions as F
+from dezero.backend import Arena
+from dezero.tape import trace
+
+class ArenaTest(unittest.TestCase):
+    def test_reclaim(self):
+        arena = Arena()
+        x = Variable(np.random.rand(100))
+        with using_config('array_arena', arena):
+            y = F.exp(x)
+            data_id = id(y.data)
+            del y # y가 사라지면 버퍼를 돌려받습니다.
+            self.assertEqual(arena.stats()['free_bytes'], 800)
+            y = F.exp(x)
+        self.assertEqual(id(y.data), data_id)
+        self.assertEqual((arena.hits, arena.misses), (1, 1))
+        self.assertTrue(np.allclose(y.data, np.exp(x.data)))
+
+    def test_data_still_referenced(self):
+        arena = Arena()
+        x = Variable(np.random.rand(100))
+        with using_config('array_arena', arena):
+            data = F.exp(x).data
+            y = F.exp(x)
+        self.assertIsNot(y.data, data)
+        self.assertTrue(np.allclose(data, np.exp(x.data))) # 덮어쓰이지 않았습니다.
+        self.assertEqual((arena.hits, arena.misses), (0, 2))
+
+    def test_backward(self):
+        arena = Arena()
+        x = Variable(np.random.rand(10, 10))
+        with using_config('array_arena', arena):
+            for _ in range(3):
+                x.cleargrad()
+                (F.square(F.exp(x)) * x).sum().backward()
+                if _ == 0:
+                    misses = arena.misses
+        self.assertEqual(arena.misses, misses)
+        self.assertEqual(arena.stats()['used_bytes'], 0)
+        self.assertTrue(np.allclose(x.grad, np.exp(2 * x.data) * (2 * x.data + 1)))
+
+    def test_reserve(self):
+        arena = Arena()
+        arena.reserve((100,), np.float64, n=2)
+        x = Variable(np.random.rand(100))
+        with using_config('array_arena', arena):
+            y = F.exp(F.square(x))
+        self.assertEqual((arena.hits, arena.misses), (2, 0))
+        self.assertEqual(arena.peak_bytes, 1600)
+
+    def test_tape(self):
+        arena = Arena()
+        x = np.random.rand(10)
+        with using_config('array_arena', arena):
+            tape = trace(lambda x: F.exp(x) * F.square(x), Variable(x))
+            tape(x)
+            misses = arena.misses
+            for _ in range(3):
+                y = tape(x)
+        self.assertEqual(arena.misses, misses)
+        self.assertTrue(np.allclose(y, np.exp(x) * x ** 2))
+
+def sigmoid(x):
+    return 1 / (1 + F.exp(-x))
+
+def predict(x, W1, b1, W2, b2):
+    h = sigmoid(x @ W1 + b1)
+    return h @ W2 + b2
+
+def step(x, t, params, lr=0.2):
+    y = predict(x, *params)
+    loss = ((y - t) ** 2).sum() / len(x)
+    for p in params:
+        p.cleargrad()
+    loss.backward()
+    for p in params:
+        p.data -= lr * p.grad
+    return loss
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    x = np.random.rand(10000, 1)
+    t = np.sin(2 * np.pi * x)
+    I, H, O = 1, 100, 1
+    arena = Arena()
+    for label, key, value in [('numpy', 'array_arena', None),
+                              ('numpy_pool', 'use_array_pool', True),
+                              ('arena', 'array_arena', arena)]:
+        np.random.seed(0)
+        params = [Variable(0.01 * np.random.randn(I, H)), Variable(np.zeros(H)),
+                  Variable(0.01 * np.random.randn(H, O)), Variable(np.zeros(O))]
+        with using_config(key, value):
+            step(x, t, params)
+            start = time.perf_counter()
+            for _ in range(100):
+                loss = step(x, t, params)
+            elapsed = (time.perf_counter() - start) / 100
+        print('{:10s}: {:.2f} ms/step, loss {:.6f}'.format(label, elapsed * 1e3, float(loss.data)))
+    print(arena.stats())
+
+# python -m unittest steps/step27.py
@@ -0,0 +1,122 @@
+# 기울기를 제자리(in-place)에서 더하기
+
+# 여러 곳에서 쓰인 변수는 역전파에서 x.grad = x.grad + gx로 기울기를 더할 때마다 새 배열을 만듭니다.
+# np.add(x.grad, gx, out=x.grad)로 제자리에서 더하면 되지만, x.grad가 다른 곳과 공유된 배열이면 안 됩니다.
+# - Add.backward는 gy를 두 입력에 그대로 넘기므로, 한 변수의 기울기가 다른 변수의 기울기와 같은 배열일 수 있습니다.
+# - 사용자가 y.grad에 넣은 배열, retain_grad=True로 남겨 둔 기울기, 읽기 전용 브로드캐스트 뷰도 있습니다.
+# 그래서 Variable.backward는 두 번째 기울기를 더할 때 새로 만든 배열만 "소유"(owned)한 것으로 기록하고,
+# 세 번째부터는 그 배열에 제자리에서 더합니다. 소유한 배열이 함수의 backward에 gy로 넘어가면 소유를 해제합니다.
+# Tape의 역전파도 같은 방식을 사용합니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import tracemalloc
+import unittest
+import numpy as np
+from dezero import Variable
+import dezero.functions as F
+from dezero.core import _accumulate_grad
+from dezero.tape import trace
+
+class AccumulateTest(unittest.TestCase):
+    def test_accumulate_grad(self):
+        owned = set()
+        g0, g1 = np.ones(3), np.ones(3)
+        g = _accumulate_grad(g0, g1, owned) # 처음 받은 기울기 g0는 바꾸지 않고 새 배열을 만듭니다.
+        self.assertIsNot(g, g0)
+        self.assertIs(_accumulate_grad(g, g1, owned), g) # 새로 만든 배열에는 제자리에서 더합니다.
+        self.assertTrue(np.array_equal(g, [3, 3, 3]))
+        self.assertTrue(np.array_equal(g0, [1, 1, 1]))
+        self.assertIsNot(_accumulate_grad(g, np.ones(3, np.complex128), owned), g) # dtype이 바뀌면 새 배열
+
+    def test_scalar(self):
+        x = Variable(np.array(2.0))
+        (x * 3.0 + x * 4.0 + x * 5.0).backward() # 0차원 배열의 합은 스칼라이므로 제자리에서 더할 수 없습니다.
+        self.assertEqual(x.grad, 12.0)
+
+    def test_alias_add(self):
+        x = Variable(np.random.rand(3))
+        y = x + x + x + x
+        g = np.random.rand(3)
+        y.grad = g
+        saved = g.copy()
+        y.backward() # Add.backward가 g를 그대로 넘기므로 x.grad의 첫 기울기는 g 자체입니다.
+        self.assertTrue(np.array_equal(g, saved))
+        self.assertTrue(np.allclose(x.grad, 4 * g))
+
+    def test_user_grad(self):
+        x = Variable(np.random.rand(3))
+        y = x * 2 + x * 3 + x * 4
+        g = np.random.rand(3)
+        y.grad = g
+        saved = g.copy()
+        y.backward()
+        self.assertTrue(np.array_equal(g, saved)) # 사용자가 준 배열은 바뀌지 않습니다.
+        self.assertTrue(np.allclose(x.grad, 9 * g))
+
+    def test_retain_grad(self):
+        x = Variable(np.random.rand(3))
+        t = x * 1 + x * 1 + x * 1
+        y = t + t
+        y.backward(retain_grad=True)
+        self.assertTrue(np.allclose(t.grad, 2))
+        self.assertTrue(np.allclose(x.grad, 6))
+
+    def test_leaf_grad_across_calls(self):
+        x = Variable(np.random.rand(3))
+        (x + x + x).backward()
+        first = x.grad
+        saved = first.copy()
+        (x + x + x).backward() # cleargrad 없이 한 번 더: 이전 기울기에 더하지만 이전 배열은 바꾸지 않습니다.
+        self.assertTrue(np.array_equal(first, saved))
+        self.assertTrue(np.allclose(x.grad, 6))
+
+    def test_broadcast(self):
+        x = Variable(np.random.rand(3))
+        y = (x.sum() + x.sum() + x.sum() + (x * np.ones((2, 3))).sum())
+        y.backward() # 첫 기울기는 읽기 전용 브로드캐스트 뷰입니다.
+        self.assertTrue(np.allclose(x.grad, 5))
+
+    def test_tape(self):
+        x = np.random.rand(4)
+        f = lambda x: F.exp(x) + x * x + x
+        tape = trace(f, Variable(x))
+        for _ in range(2):
+            tape(x)
+            self.assertTrue(np.allclose(tape.inputs[0].grad, np.exp(x) + 2 * x + 1))
+
+def f(x, n):
+    y = 0
+    for i in range(n):
+        y = y + F.exp(x * (i + 1)).sum()
+    return y
+
+if __name__ == '__main__':
+    import dezero.core
+
+    def copying_accumulate(grad, gx, owned):
+        return grad + gx
+
+    x = Variable(np.random.rand(1000, 1000) * 0.01)
+    accumulate = dezero.core._accumulate_grad
+    for label, acc in (('copy', copying_accumulate), ('in-place', accumulate)):
+        dezero.core._accumulate_grad = acc
+        x.cleargrad()
+        f(x, 10).backward()
+        tracemalloc.start()
+        x.cleargrad()
+        f(x, 10).backward()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        start = time.perf_counter()
+        for _ in range(20):
+            x.cleargrad()
+            f(x, 10).backward()
+        elapsed = (time.perf_counter() - start) / 20
+        print('{:8s}: {:.2f} ms/step, peak {:.1f} MB'.format(label, elapsed * 1e3, peak / 2 ** 20))
+    dezero.core._accumulate_grad = accumulate
+
+# python -m unittest steps/step28.py
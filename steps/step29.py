@@ -0,0 +1,135 @@
+# 그래디언트 체크포인팅 (재계산)
+
+# 역전파를 하려면 각 함수가 입력/출력을 가지고 있어야 하므로, 층이 깊어질수록 순전파 후에 남는 활성값(메모리)이 늘어납니다.
+# dezero/checkpoint.py의 checkpoint(fn, *inputs)는 fn을 계산 그래프 없이 계산해 구간 안의 중간 결과를 바로 버리고,
+# 역전파가 그 구간에 도착하면 fn을 다시 계산해 기울기를 구합니다.
+# checkpoint_sequential(층 리스트, x)는 N개의 층을 약 sqrt(N)개의 구간으로 나누어 각 구간을 checkpoint로 감쌉니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import tracemalloc
+import unittest
+import numpy as np
+from dezero import Variable, Function
+import dezero.functions as F
+from dezero.checkpoint import checkpoint, checkpoint_sequential
+from dezero.functional import jvp, jacobian
+from dezero.utils import gradient_check
+
+def sigmoid(x):
+    return 1 / (1 + F.exp(-x))
+
+def make_layers(n, size, seed=0):
+    rng = np.random.RandomState(seed)
+    params = [(Variable(rng.randn(size, size) / np.sqrt(size)), Variable(np.zeros(size))) for _ in range(n)]
+    layers = [lambda x, W=W, b=b: sigmoid(x @ W + b) for W, b in params]
+    return layers, params
+
+class CheckpointTest(unittest.TestCase):
+    def test_same_grad(self):
+        layers, params = make_layers(9, 4)
+        x = Variable(np.random.rand(3, 4))
+
+        def run(use_checkpoint):
+            x.cleargrad()
+            for W, b in params:
+                W.cleargrad()
+                b.cleargrad()
+            if use_checkpoint:
+                y = checkpoint_sequential(layers, x)
+            else:
+                y = x
+                for f in layers:
+                    y = f(y)
+            y.sum().backward()
+            return [x.grad] + [p.grad for W, b in params for p in (W, b)]
+
+        for g0, g1 in zip(run(False), run(True)):
+            self.assertTrue(np.allclose(g0, g1))
+
+    def test_recompute(self):
+        calls = []
+        def f(x):
+            calls.append(1)
+            return F.exp(x) * x
+        x = Variable(np.random.rand(3))
+        y = checkpoint(f, x)
+        self.assertIsNone(y.creator.inputs[0].creator)
+        y.backward()
+        self.assertEqual(len(calls), 2) # 순전파 한 번, 역전파에서 재계산 한 번
+        self.assertTrue(np.allclose(x.grad, np.exp(x.data) * (1 + x.data)))
+        self.assertTrue(gradient_check(lambda x: checkpoint(f, x), x))
+
+    def test_drops_intermediates(self):
+        created = []
+        call = Function.__call__
+
+        def recording_call(self, *inputs):
+            created.append(self)
+            return call(self, *inputs)
+
+        Function.__call__ = recording_call
+        try:
+            y = checkpoint(lambda x: F.exp(F.square(x)), Variable(np.random.rand(3)))
+        finally:
+            Function.__call__ = call
+        self.assertEqual([type(f).__name__ for f in created], ['Checkpoint', 'Square', 'Exp'])
+        self.assertFalse(hasattr(created[1], 'inputs')) # 구간 안의 함수는 그래프에 연결되지 않습니다.
+
+    def test_params_and_constant(self):
+        W = Variable(np.random.rand(3, 2))
+        x = np.random.rand(4, 3)
+        y = checkpoint(lambda x: (x @ W).sum(), x) # x는 상수(ndarray)
+        y.backward()
+        self.assertTrue(np.allclose(W.grad, x.sum(axis=0)[:, None] * np.ones((3, 2))))
+
+    def test_forward_and_batched(self):
+        W = np.random.rand(3, 3)
+        f = lambda x: F.exp(x @ W)
+        g = lambda x: checkpoint(f, x)
+        x = np.random.rand(2, 3)
+        v = np.random.rand(2, 3)
+        self.assertTrue(np.allclose(jvp(f, x, v)[1], jvp(g, x, v)[1]))
+        self.assertTrue(np.allclose(jacobian(f, x, mode='reverse'), jacobian(g, x, mode='reverse')))
+
+    def test_sequential_edge_cases(self):
+        x = Variable(np.random.rand(3))
+        self.assertIs(checkpoint_sequential([], x), x) # 층이 없으면 x를 그대로 반환합니다.
+        with self.assertRaises(ValueError):
+            checkpoint_sequential([F.exp], x, segments=0)
+        y = checkpoint_sequential([F.exp, F.exp], x, segments=5) # 층 수보다 많은 구간
+        self.assertTrue(np.allclose(y.data, np.exp(np.exp(x.data))))
+
+def peak_and_time(step):
+    step()
+    tracemalloc.start()
+    step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(5):
+        step()
+    return peak, (time.perf_counter() - start) / 5
+
+if __name__ == '__main__':
+    x = Variable(np.random.rand(256, 256))
+    for n in (16, 64):
+        layers, params = make_layers(n, 256)
+
+        def plain():
+            y = x
+            for f in layers:
+                y = f(y)
+            y.sum().backward()
+
+        def ckpt():
+            checkpoint_sequential(layers, x).sum().backward()
+
+        for label, step in (('plain', plain), ('checkpoint', ckpt)):
+            peak, t = peak_and_time(step)
+            print('N={:3d} {:10s}: peak {:6.1f} MB, {:6.1f} ms/step'.format(n, label, peak / 2 ** 20, t * 1e3))
+
+# python -m unittest steps/step29.py
@@ -0,0 +1,128 @@
+# 역전파에 필요한 것만 남기기 (retain_inputs / retain_outputs)
+
+# Function은 입력 변수들을 self.inputs로 계속 가지고 있으므로, 순전파가 끝나도 모든 중간 결과의 data가 메모리에 남습니다.
+# 하지만 Add의 backward는 입력도 출력도 필요 없고, Exp의 backward는 출력만 필요합니다.
+# 1. 각 Function은 backward에 필요한 입력/출력의 인덱스를 retain_inputs, retain_outputs로 선언합니다. (None은 모두)
+# 2. 함수 g가 중간 변수 y를 입력으로 받을 때, g도 y의 creator도 y.data가 필요 없으면
+#    data가 없는 변수를 만들어 그래프에서 y 대신 사용합니다. (dezero/core.py의 _graph_node)
+#    그러면 사용자가 y를 버리는 즉시 y.data가 해제됩니다.
+# 3. retain_grad=True이면 대신 쓰인 변수의 기울기를 원래 변수에도 남깁니다.
+# Exp.backward는 step20부터 exp(x)를 다시 계산하지 않고 저장된 출력을 사용하므로, Exp는 출력만 남깁니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import tracemalloc
+import unittest
+import weakref
+import numpy as np
+from dezero import Variable, Function
+import dezero.functions as F
+from dezero.functional import hvp
+
+class Twice(Function): # retain_inputs/retain_outputs를 선언하지 않은 함수는 모두 남깁니다.
+    __slots__ = ()
+
+    def forward(self, x):
+        return 2 * x
+
+    def backward(self, gy):
+        return 2 * gy
+
+class RetainTest(unittest.TestCase):
+    def test_add_drops_input(self):
+        x = Variable(np.random.rand(2, 3))
+        W = Variable(np.random.rand(3, 4))
+        y = x @ W
+        ref = weakref.ref(y.data)
+        z = y + 1
+        del y
+        self.assertIsNone(ref()) # MatMul의 출력은 Add도 MatMul도 필요 없으므로 해제됩니다.
+        z.sum().backward()
+        self.assertTrue(np.allclose(W.grad, x.data.sum(axis=0)[:, None] * np.ones((3, 4))))
+
+    def test_exp_keeps_output_only(self):
+        x = Variable(np.random.rand(3))
+        s = x * 2
+        e = F.exp(s)
+        f = e * 3
+        s_ref, e_ref = weakref.ref(s.data), weakref.ref(e.data)
+        del s, e
+        self.assertIsNone(s_ref())
+        self.assertIsNotNone(e_ref()) # Exp.backward가 사용합니다.
+        f.backward()
+        self.assertTrue(np.allclose(x.grad, 6 * np.exp(2 * x.data)))
+
+    def test_default_retains_all(self):
+        x = Variable(np.random.rand(3))
+        y = Twice()(x * 1)
+        self.assertIsNotNone(y.creator.inputs[0].data)
+
+    def test_retain_grad(self):
+        x = Variable(np.random.rand(3))
+        t = x + x
+        y = (t + 1) * 3
+        y.backward(retain_grad=True)
+        self.assertTrue(np.allclose(t.grad, 3))
+        self.assertTrue(np.allclose(x.grad, 6))
+
+    def test_backward_from_used_variable(self):
+        x = Variable(np.random.rand(3))
+        t = x * 2
+        y = t + 1
+        t.backward() # t는 Add의 입력으로 쓰였으므로 그래프에서는 다른 변수가 t를 대신합니다.
+        self.assertTrue(np.allclose(x.grad, 2))
+        self.assertIsNone(t.grad)
+
+    def test_later_consumer_needs_data(self):
+        x = Variable(np.random.rand(3))
+        t = x * 2
+        y = t + 1 # data가 필요 없는 함수가 먼저 t를 받고,
+        z = t * t # 나중에 data가 필요한 함수가 받습니다.
+        (y + z).backward()
+        self.assertTrue(np.allclose(x.grad, 2 + 8 * x.data))
+
+    def test_create_graph(self):
+        f = lambda x: (F.exp(x * 2) + x).sum()
+        x = np.random.rand(3)
+        v = np.random.rand(3)
+        self.assertTrue(np.allclose(hvp(f, x, v), 4 * np.exp(2 * x) * v))
+
+        def g(x): # Add가 먼저 t를 받아 대신하는 변수를 만들고, Mul이 나중에 data를 다시 붙입니다.
+            t = x + 1
+            return ((t + 2.0) + t * t).sum()
+        self.assertTrue(np.allclose(hvp(g, x, v), 2 * v))
+        x = Variable(x)
+        t = x + 1
+        y = (t + 2.0) + t * t
+        y.backward(create_graph=True)
+        self.assertTrue(np.allclose(x.grad.data, 2 * (x.data + 1) + 1))
+
+def sigmoid(x):
+    return 1 / (1 + F.exp(-x))
+
+def forward_peak(x, params):
+    tracemalloc.start()
+    h = x
+    for W, b in params:
+        h = sigmoid(h @ W + b)
+    loss = h.sum()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    loss.backward()
+    return peak
+
+if __name__ == '__main__':
+    import dezero.core
+
+    x = np.random.rand(256, 256)
+    params = [(Variable(np.random.randn(256, 256) / 16), Variable(np.zeros(256))) for _ in range(16)]
+    graph_node = dezero.core._graph_node
+    for label, node in (('keep all', lambda x, retained: x), ('retain', graph_node)):
+        dezero.core._graph_node = node
+        forward_peak(x, params)
+        print('{:8s}: forward peak {:.1f} MB'.format(label, forward_peak(x, params) / 2 ** 20))
+    dezero.core._graph_node = graph_node
+
+# python -m unittest steps/step30.py
@@ -0,0 +1,148 @@
+# 혼합 정밀도 (float16 순전파 + float32 마스터 기울기 + 동적 손실 스케일링)
+
+# 지금까지의 함수는 들어온 배열의 dtype을 그대로 따르므로, 보통 float64로 계산했습니다.
+# dezero/amp.py
+# - autocast(np.float16): Config.compute_dtype을 정해, Function.__call__이 실수형 입력을 그 dtype으로 바꿔 순전파합니다.
+#   활성값(함수의 출력)이 float16이 되므로 메모리가 절반이 됩니다. 파라미터의 data(마스터 가중치)는 그대로 둡니다.
+# - 역전파에서 파라미터(creator가 없는 변수)의 기울기는 파라미터와 같은 dtype(float32)으로 바꿉니다.
+#   Tape(step19)의 재생도 입력을 같은 dtype으로 바꿔 계산하고, 파라미터의 기울기를 같은 dtype으로 바꿉니다.
+# - loss_scaling(DynamicLossScaler()): backward의 시작값에 scale을 곱해 float16 기울기가 0이 되지 않게 하고,
+#   파라미터의 기울기에서 scale로 다시 나눕니다. inf/nan이 생기면 found_inf가 True가 되고 scale을 줄입니다.
+# numerical_grad(gradient_check)는 float64의 정밀도가 필요하므로 autocast 안에서도 원래 dtype으로 계산합니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import tracemalloc
+import unittest
+import numpy as np
+from dezero import Variable
+import dezero.functions as F
+from dezero.amp import autocast, loss_scaling, DynamicLossScaler
+from dezero.checkpoint import checkpoint
+from dezero.tape import trace
+from dezero.utils import numerical_grad
+
+def sigmoid(x):
+    return 1 / (1 + F.exp(-x))
+
+class MixedPrecisionTest(unittest.TestCase):
+    def test_dtypes(self):
+        x = np.random.rand(4, 3).astype(np.float32)
+        W = Variable(np.random.rand(3, 2).astype(np.float32))
+        with autocast(np.float16):
+            h = sigmoid(x @ W)
+            y = h.sum()
+        self.assertEqual(h.dtype, np.float16)
+        self.assertEqual(W.dtype, np.float32) # 마스터 가중치는 그대로
+        y.backward()
+        self.assertEqual(W.grad.dtype, np.float32)
+
+        W32 = Variable(W.data.copy())
+        sigmoid(x @ W32).sum().backward()
+        self.assertTrue(np.allclose(W.grad, W32.grad, rtol=1e-2, atol=1e-2))
+
+    def test_loss_scaling(self):
+        W = Variable(np.random.rand(3, 2).astype(np.float32))
+        x = np.random.rand(4, 3).astype(np.float32)
+        scaler = DynamicLossScaler(init_scale=1024.0, growth_interval=2)
+        for _ in range(2):
+            W.cleargrad()
+            with autocast(np.float16):
+                y = (x @ W).sum()
+            with loss_scaling(scaler):
+                y.backward()
+            self.assertFalse(scaler.found_inf)
+            self.assertTrue(np.allclose(W.grad, x.sum(axis=0)[:, None] * np.ones((3, 2)), rtol=1e-3))
+        self.assertEqual(scaler.scale, 2048.0) # 두 번 연속 오버플로가 없으면 scale을 키웁니다.
+
+    def test_small_grad(self):
+        # float16으로는 0이 되는 작은 기울기(6e-8 미만)도 손실 스케일링을 하면 남습니다.
+        W = Variable(np.ones(3, np.float32))
+        with autocast(np.float16):
+            y = (W * 1e-4 * 1e-4).sum()
+        with loss_scaling(DynamicLossScaler()):
+            y.backward()
+        self.assertTrue(np.allclose(W.grad, 1e-8, rtol=1e-2))
+
+    def test_overflow(self):
+        W = Variable(np.ones(3, np.float32))
+        scaler = DynamicLossScaler(init_scale=2.0 ** 15)
+        with autocast(np.float16):
+            h = W * 1.0 # float16 활성값
+            y = (h * 1000.0).sum() # 상수 1000.0도 h와 같은 float16
+        with loss_scaling(scaler):
+            y.backward() # 32768 * 1000은 float16의 최댓값(65504)을 넘습니다.
+        self.assertTrue(scaler.found_inf)
+        self.assertEqual(scaler.scale, 2.0 ** 14)
+        self.assertEqual(scaler.overflows, 1)
+
+    def test_checkpoint(self):
+        # Checkpoint 구간 안의 역전파는 scale을 다시 곱하거나 update를 호출하지 않고, 구간 안의 파라미터(W)의 기울기만 되돌립니다.
+        x = Variable(np.full(3, 3.0, np.float32))
+        W = Variable(np.full(3, 2.0, np.float32))
+        scaler = DynamicLossScaler(init_scale=8.0)
+        y = checkpoint(lambda h: h * W, x * 1.0).sum()
+        with loss_scaling(scaler):
+            y.backward()
+        self.assertTrue(np.allclose(W.grad, 3.0))
+        self.assertTrue(np.allclose(x.grad, 2.0))
+        self.assertEqual(scaler._good_steps, 1)
+        self.assertEqual(scaler.scale, 8.0)
+
+    def test_tape(self):
+        # 테이프의 재생도 Function.__call__과 같이 입력을 compute_dtype으로 바꿔 계산합니다.
+        x = np.random.rand(4, 3).astype(np.float32)
+        W = Variable(np.random.rand(3, 2).astype(np.float32))
+        f = lambda x: sigmoid(x @ W).sum()
+        with autocast(np.float16):
+            y = f(Variable(x))
+            y.backward()
+            expected = W.grad
+            W.cleargrad()
+            tape = trace(f, Variable(x))
+            out = tape(x)
+        self.assertEqual(out.dtype, np.float16)
+        self.assertEqual(out, y.data)
+        self.assertEqual(W.grad.dtype, np.float32)
+        self.assertTrue(np.array_equal(W.grad, expected))
+
+    def test_numerical_grad(self):
+        x = Variable(np.random.rand(3))
+        with autocast(np.float16):
+            num = numerical_grad(lambda x: F.exp(x), [x], 0)
+        self.assertTrue(np.allclose(num, np.exp(x.data)))
+
+def forward(x, params):
+    h = x
+    for W, b in params[:-1]:
+        h = sigmoid(h @ W + b)
+    W, b = params[-1]
+    return h @ W + b
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    x = np.random.rand(256, 256)
+    params64 = [(Variable(np.random.randn(256, 256) / 16), Variable(np.zeros(256))) for _ in range(8)]
+    for dtype in (np.float64, np.float32, np.float16):
+        params = [(Variable(W.data.astype(np.float32)), Variable(b.data.astype(np.float32))) for W, b in params64] \
+            if dtype != np.float64 else params64
+        with autocast(dtype):
+            forward(x, params)
+            tracemalloc.start()
+            y = forward(x, params)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            start = time.perf_counter()
+            for _ in range(5):
+                forward(x, params)
+            elapsed = (time.perf_counter() - start) / 5
+        scaler = DynamicLossScaler()
+        with loss_scaling(scaler), np.errstate(over='ignore', invalid='ignore'):
+            y.sum().backward()
+        print('{:8s}: forward peak {:5.1f} MB, {:6.1f} ms/forward, grad dtype {}, overflow {}'.format(
+            np.dtype(dtype).name, peak / 2 ** 20, elapsed * 1e3, params[0][0].grad.dtype, scaler.found_inf))
+
+# python -m unittest steps/step31.py
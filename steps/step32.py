@@ -0,0 +1,145 @@
+# 독립된 가지의 역전파를 여러 스레드로 계산하기 (dezero/scheduler.py)
+
+# Variable.backward는 함수를 하나씩 처리합니다. 하지만 step12의 Add처럼 입력이 여러 개인 함수로 만든 그래프에는
+# 서로 독립된 가지가 많고, NumPy의 계산(행렬 곱 등)은 GIL을 놓으므로 동시에 계산할 수 있습니다.
+# y.backward(workers=4)
+# 1. 그래프를 한 번 따라가며 각 함수가 받아야 할 출력 기울기의 수(의존 수)를 셉니다.
+# 2. 의존 수가 0이 된 함수의 backward를 스레드 풀에서 계산합니다.
+# 3. 기울기의 덧셈은 메인 스레드가 합니다. 한 변수로 모이는 기울기를 모두 받은 뒤 (함수의 순서, 입력의 위치) 순으로 더하므로
+#    스레드 수나 끝나는 순서와 관계없이 결과가 비트 단위로 같습니다.
+# Arena/numpy_pool(step26, step27)은 스레드에 안전하지 않으므로 사용 중이면 하나의 스레드로 계산합니다.
+# create_graph=True도 하나의 스레드로 계산합니다.
+# Config는 프로세스 전체에서 공유되므로, backward에서 Config를 바꾸는 함수(thread_safe = False, step29의 Checkpoint)가
+# 그래프에 있으면 하나의 스레드로 계산합니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import unittest
+import numpy as np
+from dezero import Variable, using_config
+import dezero.functions as F
+from dezero.backend import Arena
+from dezero.amp import loss_scaling, DynamicLossScaler
+from dezero.checkpoint import checkpoint
+
+def wide(x, Ws):
+    y = F.exp(x @ Ws[0] / 16)
+    for W in Ws[1:]:
+        y = y + F.exp(x @ W / 16)
+    return y.sum()
+
+def make(seed, k=6, n=32):
+    rng = np.random.RandomState(seed)
+    x = Variable(rng.rand(n, n))
+    Ws = [Variable(rng.rand(n, n)) for _ in range(k)]
+    return x, Ws
+
+class ParallelBackwardTest(unittest.TestCase):
+    def test_matches_serial(self):
+        x, Ws = make(0)
+        wide(x, Ws).backward()
+        expected = [x.grad] + [W.grad for W in Ws]
+        x, Ws = make(0)
+        wide(x, Ws).backward(workers=4)
+        for a, b in zip(expected, [x.grad] + [W.grad for W in Ws]):
+            self.assertTrue(np.allclose(a, b))
+
+    def test_deterministic(self):
+        results = []
+        for workers in (1, 2, 4, 4, 4):
+            x, Ws = make(1)
+            wide(x, Ws).backward(workers=workers)
+            results.append(x.grad)
+        for g in results[1:]:
+            self.assertTrue(np.array_equal(results[0], g)) # 비트 단위로 같습니다.
+
+    def test_shared_variable(self):
+        x = Variable(np.array(3.0))
+        y = F.square(x) + F.square(x) + x * x
+        y.backward(workers=3)
+        self.assertEqual(x.grad, 18.0)
+        x.cleargrad()
+        a = x * 2
+        (a * a + a).backward(workers=2)
+        self.assertEqual(x.grad, 4 * 2 * 3.0 + 2)
+
+    def test_retain_grad(self):
+        x = Variable(np.random.rand(3))
+        t = x + x
+        y = (t + 1) * 3
+        y.backward(retain_grad=True, workers=2)
+        self.assertTrue(np.allclose(t.grad, 3))
+        self.assertTrue(np.allclose(x.grad, 6))
+        self.assertTrue(np.allclose(y.grad, 1))
+
+    def test_intermediate_grads_cleared(self):
+        x = Variable(np.random.rand(3))
+        t = x * 2
+        y = F.exp(t)
+        y.backward(workers=2)
+        self.assertIsNone(t.grad)
+
+    def test_backward_from_used_variable(self):
+        x = Variable(np.random.rand(3))
+        t = x * 2
+        y = t + 1
+        t.backward(workers=2)
+        self.assertTrue(np.allclose(x.grad, 2))
+
+    def test_loss_scaling(self):
+        x, Ws = make(2)
+        wide(x, Ws).backward()
+        expected = Ws[0].grad
+        x, Ws = make(2)
+        scaler = DynamicLossScaler(init_scale=1024.0)
+        with loss_scaling(scaler):
+            wide(x, Ws).backward(workers=4)
+        self.assertFalse(scaler.found_inf)
+        self.assertTrue(np.allclose(Ws[0].grad, expected))
+
+    def test_arena_fallback(self):
+        x, Ws = make(3)
+        with using_config('array_arena', Arena()):
+            wide(x, Ws).backward(workers=4)
+            self.assertEqual(x.grad.shape, x.shape)
+
+    def test_checkpoint(self):
+        # Checkpoint.backward는 enable_backprop을 바꾸므로 여러 스레드에서 동시에 실행하면 안 됩니다.
+        def branches(x, Ws):
+            ys = [checkpoint(lambda x, W=W: F.exp(x @ W / 16), x) for W in Ws]
+            y = ys[0]
+            for t in ys[1:]:
+                y = y + t
+            return y.sum()
+        x, Ws = make(4, k=8)
+        branches(x, Ws).backward()
+        expected = [x.grad] + [W.grad for W in Ws]
+        for _ in range(5):
+            x, Ws = make(4, k=8)
+            branches(x, Ws).backward(workers=8)
+            for a, b in zip(expected, [x.grad] + [W.grad for W in Ws]):
+                self.assertTrue(np.array_equal(a, b))
+
+if __name__ == '__main__':
+    import os
+    np.random.seed(0)
+    k, n = 16, 512
+    x = Variable(np.random.rand(n, n))
+    Ws = [Variable(np.random.rand(n, n)) for _ in range(k)]
+    print('cpu count:', os.cpu_count())
+    for workers in (None, 1, 2, 4):
+        times = []
+        for _ in range(3):
+            x.cleargrad()
+            for W in Ws:
+                W.cleargrad()
+            y = wide(x, Ws)
+            start = time.perf_counter()
+            y.backward(workers=workers)
+            times.append(time.perf_counter() - start)
+        print('workers={}: {:.1f} ms'.format(workers, min(times) * 1e3))
+
+# python -m unittest steps/step32.py
@@ -0,0 +1,116 @@
+# 여러 프로세스로 데이터 병렬 학습하기 (dezero/parallel.py)
+
+# 한 프로세스의 파이썬 코드는 GIL 때문에 코어 하나만 씁니다. 외부 서비스 없이 여러 코어로 학습하기 위해
+# DataParallel은 워커 프로세스를 fork하고, 미니배치를 나눠 각자 순전파/Variable.backward를 계산합니다.
+# 1. 파라미터의 data를 multiprocessing.shared_memory 위의 뷰로 바꿉니다. 부모가 제자리로 갱신하면 워커들에게 복사 없이 전달됩니다.
+# 2. 각 워커는 자기 기울기를 공유 메모리의 자기 행에 쓰고, 링 all-reduce로 평균을 구합니다.
+#    (기울기를 워커 수만큼의 조각으로 나눠, 각 단계에서 왼쪽 워커의 조각 하나를 더합니다. 워커마다 n - 1번 더합니다.)
+# 3. step() 뒤의 p.grad는 평균 기울기입니다. 조각의 크기가 같으면 전체 미니배치로 계산한 기울기와 같습니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import unittest
+import numpy as np
+from dezero import Variable
+import dezero.functions as F
+from dezero.parallel import DataParallel
+
+def sigmoid(x):
+    return 1 / (1 + F.exp(-x))
+
+def make_params(seed, n_in=4, n_hidden=8):
+    rng = np.random.RandomState(seed)
+    return [Variable(rng.randn(n_in, n_hidden)), Variable(np.zeros(n_hidden)),
+            Variable(rng.randn(n_hidden, 1)), Variable(np.zeros(1))]
+
+def make_loss(params):
+    W1, b1, W2, b2 = params
+    def loss_fn(x, t):
+        y = sigmoid(x @ W1 + b1) @ W2 + b2
+        return ((y - t) ** 2).sum() / len(x)
+    return loss_fn
+
+class DataParallelTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.x = rng.rand(12, 4)
+        self.t = rng.rand(12, 1)
+
+    def test_grads_match_full_batch(self):
+        params = make_params(0)
+        loss = make_loss(params)(self.x, self.t)
+        loss.backward()
+        expected = [p.grad for p in params]
+
+        params = make_params(0)
+        with DataParallel(make_loss(params), params, workers=3) as runner: # 파라미터 수(49)가 3으로 나눠지지 않습니다.
+            self.assertAlmostEqual(runner.step(self.x, self.t), float(loss.data))
+            for p, g in zip(params, expected):
+                self.assertTrue(np.allclose(p.grad, g))
+
+    def test_training_matches_serial(self):
+        serial = make_params(1)
+        loss_fn = make_loss(serial)
+        for _ in range(3):
+            for p in serial:
+                p.cleargrad()
+            loss_fn(self.x, self.t).backward()
+            for p in serial:
+                p.data -= 0.1 * p.grad
+
+        params = make_params(1)
+        with DataParallel(make_loss(params), params, workers=2) as runner:
+            for _ in range(3):
+                runner.step(self.x, self.t)
+                for p in params:
+                    p.data -= 0.1 * p.grad # 워커들은 갱신된 파라미터를 복사 없이 봅니다.
+        for p, q in zip(params, serial):
+            self.assertTrue(np.allclose(p.data, q.data))
+
+    def test_close_restores_params(self):
+        params = make_params(2)
+        runner = DataParallel(make_loss(params), params, workers=2)
+        runner.step(self.x, self.t)
+        runner.close()
+        params[0].data[0, 0] = 1.0 # 공유 메모리를 해제한 뒤에도 쓸 수 있습니다.
+        with self.assertRaises(RuntimeError):
+            runner.step(self.x, self.t)
+
+    def test_worker_error(self):
+        params = make_params(3)
+        def loss_fn(x, t):
+            if len(x) == 5:
+                raise ValueError('bad shard')
+            return make_loss(params)(x, t)
+        runner = DataParallel(loss_fn, params, workers=2)
+        with self.assertRaises(ValueError):
+            runner.step(self.x[:11], self.t[:11]) # 6개와 5개로 나뉩니다.
+
+if __name__ == '__main__':
+    import os
+    np.random.seed(0)
+    x = np.random.rand(8192, 256)
+    t = np.random.rand(8192, 1)
+    params = make_params(0, 256, 512)
+    for p in params:
+        p.data /= 16
+    loss_fn = make_loss(params)
+    print('cpu count:', os.cpu_count())
+    base = None
+    for workers in sorted({1, 2, 4, os.cpu_count()}):
+        with DataParallel(loss_fn, params, workers=workers) as runner:
+            runner.step(x, t)
+            start = time.perf_counter()
+            for _ in range(5):
+                runner.step(x, t)
+                for p in params:
+                    p.data -= 0.01 * p.grad
+            elapsed = (time.perf_counter() - start) / 5
+        base = base or elapsed
+        print('workers={:2d}: {:6.1f} ms/step, speedup {:.2f}, efficiency {:.0%}'.format(
+            workers, elapsed * 1e3, base / elapsed, base / elapsed / workers))
+
+# python -m unittest steps/step33.py
@@ -0,0 +1,125 @@
+# 배치를 미리 준비하는 데이터 로더 (dezero/datasets.py, dezero/dataloaders.py)
+
+# 지금까지의 학습 코드는 배치를 준비하는 동안 계산을 하지 못하고, 계산하는 동안 다음 배치를 준비하지 못했습니다.
+# Dataset: 같은 길이의 배열들을 묶습니다. dataset[i]는 (x[i], t[i])입니다.
+# DataLoader: 인덱스만 섞어서(데이터는 복사하지 않고) 미니배치를 꺼냅니다.
+# 1. 배치는 미리 만든 prefetch + 1개의 버퍼를 돌아가며 채우므로, 배치마다 새 배열을 만들지 않습니다.
+#    (반환된 배치는 다음 배치를 꺼낼 때 다시 채워질 수 있습니다.)
+# 2. workers개의 스레드가 다음 prefetch개의 배치를 미리 채워 둡니다. 배치는 항상 순서대로 나옵니다.
+#    스텝의 시간이 (계산 + 배치 준비)에서 max(계산, 배치 준비)가 됩니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import threading
+import time
+import unittest
+import numpy as np
+from dezero import Variable
+from dezero.datasets import Dataset
+from dezero.dataloaders import DataLoader
+
+class ListDataset: # get_batch가 없는 데이터셋은 dataset[i]를 하나씩 씁니다.
+    def __init__(self, n):
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if i < 0:
+            raise IndexError(i)
+        return np.full(2, i, np.float32)
+
+class DataLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.x = np.arange(50, dtype=np.float64).reshape(25, 2)
+        self.t = np.arange(25)
+
+    def test_shuffle_covers_all(self):
+        loader = DataLoader(Dataset(self.x, self.t), batch_size=4)
+        seen = []
+        for x, t in loader:
+            self.assertTrue(np.array_equal(x, self.x[t]))
+            seen.extend(t.tolist())
+        self.assertEqual(sorted(seen), list(range(25)))
+        self.assertEqual(len(loader), 7)
+
+    def test_same_batches(self):
+        results = []
+        for prefetch, workers in ((0, 1), (2, 1), (3, 3)):
+            np.random.seed(0)
+            loader = DataLoader(Dataset(self.x, self.t), batch_size=4, prefetch=prefetch, workers=workers)
+            results.append([t.copy() for _, t in loader])
+        for r in results[1:]:
+            self.assertEqual(len(r), 7)
+            for a, b in zip(results[0], r):
+                self.assertTrue(np.array_equal(a, b))
+        self.assertEqual(len(results[0][-1]), 1) # 마지막 배치는 작습니다.
+
+    def test_reuse_buffers(self):
+        loader = DataLoader(Dataset(self.x, self.t), batch_size=5, shuffle=False, prefetch=1)
+        first = [x for x, _ in loader]
+        self.assertTrue(np.shares_memory(first[0], first[2])) # 버퍼 두 개를 번갈아 씁니다.
+        second = [x for x, _ in loader]
+        self.assertTrue(np.shares_memory(first[0], second[0]))
+
+    def test_transform_and_getitem(self):
+        dataset = Dataset(self.x, self.t, transform=lambda x, t: (x * 2, t))
+        x, t = next(iter(DataLoader(dataset, batch_size=25, shuffle=False)))
+        self.assertTrue(np.array_equal(x, self.x * 2))
+        x = next(iter(DataLoader(ListDataset(6), batch_size=6, shuffle=False)))
+        self.assertEqual(x.dtype, np.float32)
+        self.assertTrue(np.array_equal(x[:, 0], np.arange(6)))
+
+    def test_error(self):
+        dataset = Dataset(self.x, transform=lambda x: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            for x in DataLoader(dataset, batch_size=4, workers=2):
+                pass
+
+    def test_bad_indices(self):
+        dataset = Dataset(self.x, self.t)
+        outs = [np.empty((2, 2)), np.empty(2, np.int64)]
+        for indices in ([0, 25], [-1, 3]): # 마지막/첫 샘플로 바꾸지 않고 오류를 냅니다.
+            with self.assertRaises(IndexError):
+                dataset.get_batch(np.array(indices), outs)
+        dataset.get_batch(np.array([24, 0]), outs)
+        self.assertTrue(np.array_equal(outs[1], [24, 0]))
+
+    def test_break_stops_threads(self):
+        n_threads = threading.active_count()
+        for x in DataLoader(ListDataset(100), batch_size=4, workers=2):
+            break
+        self.assertEqual(threading.active_count(), n_threads)
+
+    def test_training(self):
+        W = Variable(np.zeros((2, 1)))
+        for x, t in DataLoader(Dataset(self.x, self.t[:, None] * 1.0), batch_size=8):
+            loss = ((x @ W - t) ** 2).sum()
+            W.cleargrad()
+            loss.backward()
+        self.assertEqual(W.grad.shape, (2, 1))
+
+class SlowDataset(Dataset): # 디스크에서 읽는 것처럼 배치마다 시간이 걸리는 데이터셋
+    def get_batch(self, indices, outs):
+        time.sleep(0.02)
+        super().get_batch(indices, outs)
+
+if __name__ == '__main__':
+    x = np.random.rand(64 * 20, 256)
+    t = np.random.rand(64 * 20, 1)
+    W = Variable(np.random.rand(256, 256) / 16)
+    for prefetch in (0, 2):
+        loader = DataLoader(SlowDataset(x, t), batch_size=64, prefetch=prefetch)
+        start = time.perf_counter()
+        for xb, tb in loader:
+            for _ in range(4): # 약 20ms의 계산
+                y = Variable(xb)
+                for _ in range(8):
+                    y = y @ W
+                y.sum().backward()
+        print('prefetch={}: {:.1f} ms/step'.format(prefetch, (time.perf_counter() - start) / len(loader) * 1e3))
+
+# python -m unittest steps/step34.py
@@ -0,0 +1,118 @@
+# 메모리 맵 파일로 파라미터와 데이터셋 저장하기 (dezero/storage.py)
+
+# 파라미터(Variable.data)를 저장하고, 메모리보다 큰 데이터셋으로 학습하기 위한 파일 형식입니다.
+# 파일의 앞부분(헤더)에 각 배열의 이름, dtype, shape, 위치(offset)를 적고, 그 뒤에 배열의 데이터를 이어서 씁니다.
+# - save_arrays(path, {'W1': W1, ...}): 배열(또는 Variable)들을 저장합니다.
+# - load_arrays(path): 헤더만 읽고 각 배열을 np.memmap으로 엽니다. 원소에 처음 접근할 때 그 페이지만 읽으므로,
+#   모델이 커도 불러오는 시간과 메모리(RSS)가 거의 들지 않습니다.
+# - create_arrays(path, specs): 빈 파일을 만들어 조금씩 채울 수 있습니다. (메모리보다 큰 데이터셋)
+# - MemmapDataset(path, names): 배치에 필요한 샘플만 디스크에서 읽는 데이터셋입니다. (step34의 DataLoader와 함께 사용)
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+from dezero import Variable
+from dezero.storage import save_arrays, load_arrays, create_arrays
+from dezero.datasets import MemmapDataset
+from dezero.dataloaders import DataLoader
+
+class StorageTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'arrays.bin')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_roundtrip(self):
+        arrays = {'W': Variable(np.random.rand(3, 4)), 'b': np.zeros(4, np.float32),
+                  'step': np.array(7), 'empty': np.zeros((0, 3)), 'T': np.random.rand(4, 3).T}
+        save_arrays(self.path, arrays)
+        loaded = load_arrays(self.path)
+        self.assertEqual(list(loaded), list(arrays))
+        for name, a in arrays.items():
+            a = a.data if isinstance(a, Variable) else a
+            self.assertEqual(loaded[name].dtype, a.dtype)
+            self.assertTrue(np.array_equal(loaded[name], a))
+        self.assertIsInstance(loaded['W'], np.memmap)
+
+    def test_save_over_loaded(self):
+        # 불러온 배열을 같은 파일에 다시 저장해도 데이터가 사라지지 않습니다.
+        W = np.random.rand(3, 4)
+        save_arrays(self.path, {'W': W})
+        loaded = load_arrays(self.path)
+        loaded['W'] += 1
+        save_arrays(self.path, {'W': loaded['W'], 'b': np.ones(4)})
+        reloaded = load_arrays(self.path)
+        self.assertTrue(np.allclose(reloaded['W'], W + 1))
+        self.assertTrue(np.allclose(reloaded['b'], 1))
+        self.assertEqual(os.listdir(self.dir.name), ['arrays.bin'])
+
+    def test_copy_on_write(self):
+        save_arrays(self.path, {'W': np.ones((2, 2))})
+        W = Variable(load_arrays(self.path)['W'])
+        y = (W * 2).sum()
+        y.backward()
+        W.data -= 0.5 * W.grad # 기본값 mode='c'는 파일을 바꾸지 않습니다.
+        self.assertTrue(np.allclose(W.data, 0))
+        self.assertTrue(np.allclose(load_arrays(self.path, mode='r')['W'], 1))
+        with self.assertRaises(ValueError):
+            load_arrays(self.path, mode='r')['W'][0, 0] = 2
+
+    def test_create_and_stream(self):
+        out = create_arrays(self.path, {'x': ((100, 3), np.float32), 't': ((100,), np.int64)})
+        for i in range(0, 100, 25): # 조금씩 채웁니다.
+            out['x'][i:i + 25] = np.arange(i, i + 25)[:, None]
+            out['t'][i:i + 25] = np.arange(i, i + 25)
+        for a in out.values():
+            a.flush()
+        del out
+
+        dataset = MemmapDataset(self.path, ['x', 't'])
+        self.assertEqual(len(dataset), 100)
+        seen = []
+        for x, t in DataLoader(dataset, batch_size=16):
+            self.assertEqual(x.dtype, np.float32)
+            self.assertTrue(np.array_equal(x[:, 0], t))
+            seen.extend(t.tolist())
+        self.assertEqual(sorted(seen), list(range(100)))
+
+    def test_bad_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not an array file')
+        with self.assertRaises(ValueError):
+            load_arrays(self.path)
+
+def rss():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS'):
+                return int(line.split()[1]) * 1024
+
+if __name__ == '__main__':
+    # 64MB의 파라미터 8개(512MB)를 저장하고 불러옵니다.
+    with tempfile.TemporaryDirectory() as d:
+        params = {'W{}'.format(i): np.random.rand(2048, 4096) for i in range(8)}
+        npz, bin_ = os.path.join(d, 'params.npz'), os.path.join(d, 'params.bin')
+        np.savez(npz, **params)
+        save_arrays(bin_, params)
+        del params
+
+        for label, load in (('np.load(npz)', lambda: dict(np.load(npz))), ('load_arrays', lambda: load_arrays(bin_))):
+            before = rss()
+            start = time.perf_counter()
+            loaded = load()
+            elapsed = time.perf_counter() - start
+            print('{:13s}: load {:7.1f} ms, RSS +{:5.1f} MB'.format(label, elapsed * 1e3, (rss() - before) / 2 ** 20))
+            before = rss()
+            loaded['W0'][:16].sum() # 일부만 사용하면 그 페이지만 읽습니다.
+            print('{:13s}  partial use: RSS +{:5.1f} MB'.format('', (rss() - before) / 2 ** 20))
+            del loaded
+
+# python -m unittest steps/step35.py
@@ -0,0 +1,133 @@
+# 함수별 시간과 메모리 측정하기 (dezero/profiler.py)
+
+# 한 스텝이 느릴 때 어떤 Function의 forward/backward 때문인지 알 수 있도록 훅(hook)을 둡니다.
+# 1. FunctionHook: Function.__call__의 forward와 Variable.backward의 함수별 backward(Tape의 재생도) 앞뒤에 호출됩니다.
+#    with hook: 안에서만 사용되며, Config.function_hooks가 빈 tuple이면 그 값을 확인하는 비용만 듭니다.
+# 2. Profiler: 함수의 종류별로 호출 수, 시간, 출력 배열의 바이트 수를 모으고, report()로 표를 만들고,
+#    export_chrome_trace()로 chrome://tracing(또는 Perfetto)에서 볼 수 있는 JSON 파일을 만듭니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+from dezero import Variable, Config
+import dezero.functions as F
+from dezero.tape import Tape
+from dezero.checkpoint import checkpoint
+from dezero.profiler import FunctionHook, Profiler
+
+class RecordHook(FunctionHook):
+    def __init__(self):
+        self.calls = []
+
+    def forward_preprocess(self, function, xs):
+        self.calls.append(('pre', type(function).__name__))
+
+    def forward_postprocess(self, function, xs, ys):
+        self.calls.append(('post', type(function).__name__))
+
+    def backward_preprocess(self, function, gys):
+        self.calls.append(('bpre', type(function).__name__))
+
+def sigmoid(x):
+    return 1 / (1 + F.exp(-x))
+
+class ProfilerTest(unittest.TestCase):
+    def test_hook_calls(self):
+        x = Variable(np.random.rand(3))
+        with RecordHook() as hook:
+            y = F.exp(x) * 2
+            y.backward()
+        self.assertEqual(hook.calls, [('pre', 'Exp'), ('post', 'Exp'), ('pre', 'Mul'), ('post', 'Mul'),
+                                      ('bpre', 'Mul'), ('bpre', 'Exp')])
+        self.assertEqual(Config.function_hooks, ())
+        F.exp(x) # with 밖에서는 호출되지 않습니다.
+        self.assertEqual(len(hook.calls), 6)
+
+    def test_profiler_records(self):
+        x = Variable(np.random.rand(10, 4))
+        W = Variable(np.random.rand(4, 5))
+        with Profiler() as prof:
+            y = sigmoid(x @ W).sum()
+            y.backward()
+        calls, seconds, nbytes = prof.records[('MatMul', 'forward')]
+        self.assertEqual((calls, nbytes), (1, 10 * 5 * 8))
+        self.assertEqual(prof.records[('MatMul', 'backward')][2], (10 * 4 + 4 * 5) * 8) # x, W의 기울기
+        self.assertEqual(prof.records[('Exp', 'forward')][0], 1)
+        self.assertIn('MatMul', prof.report())
+
+    def test_nested_time(self):
+        x = Variable(np.random.rand(1000))
+        def slow(x):
+            time.sleep(0.01)
+            return F.exp(x)
+        with Profiler() as prof:
+            checkpoint(lambda x: slow(x) * 2, x)
+        self.assertGreater(prof.records[('Checkpoint', 'forward')][1], 0.009)
+        self.assertLess(prof.records[('Exp', 'forward')][1], 0.005) # 안쪽 함수의 시간은 따로 셉니다.
+
+    def test_error(self):
+        # forward가 예외를 일으켜도 Profiler의 스택에 남지 않으므로 바깥 함수의 시간이 틀어지지 않습니다.
+        x = Variable(np.random.rand(3))
+        def fail(x):
+            raise RuntimeError('fail')
+        with Profiler() as prof:
+            with self.assertRaises(RuntimeError):
+                checkpoint(fail, x)
+            self.assertEqual(prof._local.stack, [])
+            F.exp(x)
+        self.assertNotIn(('Checkpoint', 'forward'), prof.records)
+        self.assertEqual(prof.records[('Exp', 'forward')][0], 1)
+
+    def test_tape_and_threads(self):
+        x = Variable(np.random.rand(8, 8))
+        tape = Tape(lambda x: (F.exp(x) + F.square(x)).sum(), x)
+        with Profiler() as prof:
+            tape(x.data)
+            (F.exp(x) + F.square(x)).sum().backward(workers=2)
+        self.assertEqual(prof.records[('Exp', 'backward')][0], 2)
+
+    def test_chrome_trace(self):
+        x = Variable(np.random.rand(3))
+        with Profiler() as prof:
+            F.exp(x).sum().backward()
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'trace.json')
+            prof.export_chrome_trace(path)
+            with open(path) as f:
+                events = json.load(f)['traceEvents']
+        self.assertEqual([(e['name'], e['cat']) for e in events],
+                         [('Exp', 'forward'), ('Sum', 'forward'), ('Sum', 'backward'), ('Exp', 'backward')])
+        self.assertTrue(all(e['ph'] == 'X' and e['dur'] >= 0 for e in events))
+
+def per_call(x, n=20000):
+    start = time.perf_counter()
+    for _ in range(n):
+        x + x
+    return (time.perf_counter() - start) / n
+
+if __name__ == '__main__':
+    x = Variable(np.array(1.0))
+    per_call(x)
+    print('no hooks      : {:.2f} us/call'.format(min(per_call(x) for _ in range(5)) * 1e6))
+    with FunctionHook():
+        print('empty hook    : {:.2f} us/call'.format(min(per_call(x) for _ in range(5)) * 1e6))
+    with Profiler(trace=False):
+        print('Profiler      : {:.2f} us/call'.format(min(per_call(x) for _ in range(5)) * 1e6))
+
+    x = Variable(np.random.rand(256, 256))
+    params = [(Variable(np.random.randn(256, 256) / 16), Variable(np.zeros(256))) for _ in range(4)]
+    with Profiler() as prof:
+        h = x
+        for W, b in params:
+            h = sigmoid(h @ W + b)
+        h.sum().backward()
+    print(prof.report())
+
+# python -m unittest steps/step36.py
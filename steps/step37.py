@@ -0,0 +1,84 @@
+# 계산 그래프를 DOT 언어로 내보내기 (dezero/utils.py의 get_dot_graph)
+
+# 메모리가 갑자기 늘어날 때는 Variable.creator와 Function.inputs/outputs로 이어진 그래프를 직접 보는 것이 도움이 됩니다.
+# get_dot_graph(output)는 Graphviz의 DOT 문자열을 반환합니다. (plot_dot_graph는 dot 명령으로 이미지까지 만듭니다.)
+# - 변수에는 shape, dtype, 바이트 수를 적습니다. 그래프가 data를 붙잡지 않는 변수(step30)는 점선으로 그립니다.
+# - 그래프가 붙잡고 있는 가장 큰 변수들은 빨간색, 가장 긴 경로는 파란 굵은 선으로 표시합니다.
+# - 재귀 없이 각 노드를 한 번씩만 방문하므로 노드가 매우 많은 그래프도 내보낼 수 있습니다.
+
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import re
+import time
+import unittest
+import numpy as np
+from dezero import Variable
+import dezero.functions as F
+from dezero.utils import get_dot_graph
+
+class DotGraphTest(unittest.TestCase):
+    def test_nodes_once(self):
+        x = Variable(np.random.rand(2, 3), name='x')
+        W = Variable(np.random.rand(3, 4).astype(np.float32), name='W')
+        h = x @ W
+        y = (h * h + h).sum()
+        y.name = 'y'
+        txt = get_dot_graph(y)
+        self.assertTrue(txt.startswith('digraph g {') and txt.endswith('}'))
+        self.assertIn('W: (3, 4) float32 48 B', txt)
+        self.assertIn('y: () float64 8 B', txt)
+        nodes = re.findall(r'^(\d+) \[', txt, re.M)
+        self.assertEqual(len(nodes), len(set(nodes))) # 각 노드는 한 번만 나옵니다.
+        self.assertEqual(txt.count('label="Mul"'), 1)
+        self.assertEqual(txt.count('{} -> {}'.format(id(x), id(h.creator))), 1)
+
+    def test_not_retained_and_freed(self):
+        x = Variable(np.random.rand(3))
+        t = x * 2
+        y = t + 1 # Add도 Mul도 t의 data가 필요 없습니다.
+        del t
+        txt = get_dot_graph(y)
+        self.assertIn('not retained', txt)
+        z = F.exp(x) # Exp는 출력을 남기므로 그래프가 data를 붙잡습니다.
+        self.assertNotIn('not retained', get_dot_graph(F.exp(z) + 1))
+
+    def test_largest_and_longest(self):
+        x = Variable(np.random.rand(3), name='x')
+        big = Variable(np.random.rand(1000), name='big')
+        a = F.exp(F.exp(F.exp(x))) # 긴 가지
+        b = F.exp(big).sum() # 짧은 가지
+        y = a + b
+        txt = get_dot_graph(y, top=2)
+        self.assertRegex(txt, r'label="big: \(1000,\) float64 7.8 KB", color=red')
+        self.assertEqual(txt.count('color=red'), 2) # big과 Exp가 남기는 exp(big)
+        self.assertIn('longest path: 4 functions', txt)
+        self.assertIn('{} -> {} [color=blue, penwidth=2]'.format(id(y.creator), id(y)), txt)
+        exp1 = a.creator.inputs[0].creator.inputs[0].creator
+        self.assertIn('{} -> {} [color=blue, penwidth=2]'.format(id(x), id(exp1)), txt)
+        self.assertNotIn('{} -> {} [color=blue'.format(id(big), id(b.creator.inputs[0].creator)), txt)
+
+    def test_deep_graph(self):
+        x = Variable(np.array(1.0))
+        y = x
+        for _ in range(5000): # 재귀로 방문하면 재귀 한도를 넘습니다.
+            y = y + 1
+        txt = get_dot_graph(y)
+        self.assertEqual(txt.count('label="Add"'), 5000)
+        self.assertIn('longest path: 5000 functions', txt)
+
+if __name__ == '__main__':
+    for n in (10 ** 4, 10 ** 5, 10 ** 6):
+        x = Variable(np.random.rand(4), name='x')
+        y = x
+        for i in range(n // 5): # 반복마다 함수와 변수가 평균 2개씩 생깁니다. (x가 가지로 계속 합쳐집니다)
+            y = F.exp(-y) + x if i % 2 else y * 0.5
+        start = time.perf_counter()
+        txt = get_dot_graph(y)
+        elapsed = time.perf_counter() - start
+        nodes = txt.count('[label=')
+        print('{:7d} nodes: {:7.1f} ms, {:5.1f} MB of DOT'.format(nodes, elapsed * 1e3, len(txt) / 2 ** 20))
+        del y, txt
+
+# python -m unittest steps/step37.py